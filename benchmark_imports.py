@@ -0,0 +1,43 @@
+import re
+import subprocess
+import sys
+
+# Cold-import cost per usage pattern, measured with `python -X importtime` (fresh interpreter each run)
+SCENARIOS = [
+    ("import iagent_pay", "import iagent_pay"),
+    ("AgentPay class (any chain)", "from iagent_pay import AgentPay"),
+    ("EVM stack (first EVM connect)", "from iagent_pay import AgentPay; import web3, iagent_pay.rpc_pool"),
+    ("Solana stack (first Solana agent)", "from iagent_pay import AgentPay; import iagent_pay.solana_driver"),
+    ("Everything (old eager import)", "import iagent_pay.agent_pay, iagent_pay.async_agent_pay, iagent_pay.yield_protocols, "
+                                      "iagent_pay.marketplace_bridge, iagent_pay.social_resolver, iagent_pay.rpc_pool, "
+                                      "iagent_pay.solana_driver"),
+]
+STACKS = ("web3", "solana", "solders", "spl")
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+def measure(statement: str, runs: int = 5):
+    """Median total import time (ms) of `statement` and the heavy stacks it pulled in."""
+    totals, loaded = [], set()
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True)
+        total = 0
+        for match in LINE.finditer(result.stderr):
+            _, cumulative, indent, name = match.groups()
+            if not indent: # Top-level entries: their cumulative time includes everything they imported
+                total += int(cumulative)
+            root = name.split(".")[0]
+            if root in STACKS:
+                loaded.add(root)
+        totals.append(total / 1000)
+    totals.sort()
+    return totals[len(totals) // 2], sorted(loaded)
+
+def benchmark_imports():
+    print("📦 iagent_pay Cold-Import Benchmark (python -X importtime, median of 5, interpreter start-up subtracted)")
+    baseline, _ = measure("pass")
+    for label, statement in SCENARIOS:
+        ms, stacks = measure(statement)
+        print(f"   {label:<36} {ms - baseline:8.1f} ms   loads: {', '.join(stacks) or '-'}")
+
+if __name__ == "__main__":
+    benchmark_imports()
@@ -0,0 +1,37 @@
+import sys
+import time
+import statistics
+from eth_account import Account
+from iagent_pay.agent_pay import AgentPay
+
+# Everything AgentPay.__init__ used to build eagerly (plus the treasury lookup = 3 price APIs)
+SUBSYSTEMS = ["pricing", "social", "swap_engine", "invoices", "yield_manager", "reputation", "marketplace", "treasury_address"]
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def benchmark_startup(chain_name: str = "BASE", runs: int = 10):
+    print(f"⏱️ AgentPay Startup Benchmark ({chain_name}, median of {runs})")
+    key = Account.create().key.hex()
+
+    def lazy():
+        AgentPay(chain_name=chain_name, private_key=key)
+
+    def eager():
+        agent = AgentPay(chain_name=chain_name, private_key=key)
+        for name in SUBSYSTEMS:
+            getattr(agent, name)
+
+    lazy_ms = timed(lazy, runs)
+    eager_ms = timed(eager, runs)
+    print(f"   Lazy start (what a worker pays):         {lazy_ms:8.1f} ms")
+    print(f"   Every subsystem built + treasury lookup: {eager_ms:8.1f} ms (previous __init__ cost)")
+    print(f"✅ {eager_ms / lazy_ms:.1f}x faster startup")
+
+if __name__ == "__main__":
+    benchmark_startup(*sys.argv[1:2])
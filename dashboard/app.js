@@ -25,6 +25,13 @@ const ERC20_ABI = [
     "function decimals() view returns (uint8)"
 ];
 
+// Multicall3 (same address on every chain): all balances in one eth_call
+const MULTICALL3_ADDR = "0xcA11bde05977b3631167028862bE2a173976CA11";
+const MULTICALL3_ABI = [
+    "function aggregate3((address target, bool allowFailure, bytes callData)[] calls) payable returns ((bool success, bytes returnData)[])",
+    "function getEthBalance(address addr) view returns (uint256)"
+];
+
 const TREASURY_ADDRESS = "0xF29E7b5BC7fdd6C4d9B4DE9f68De31739FBB1526";
 
 let currentChain = "BASE";
@@ -49,8 +56,7 @@ async function inspectAgent() {
     document.getElementById('dashboardView').classList.remove('hidden');
 
     // Fetch Data
-    await fetchNativeBalance(address);
-    await fetchUSDCBalance(address);
+    await fetchBalances(address);
     // await fetchHistory(address); // Hard without indexer, skipping for MVP
 
     // Check License (Mock Logic for MVP Presentation)
@@ -75,8 +81,7 @@ async function switchChain(chain) {
     // Refresh if address exists
     const address = document.getElementById('agentAddress').value;
     if (address && ethers.utils.isAddress(address)) {
-        await fetchNativeBalance(address);
-        await fetchUSDCBalance(address);
+        await fetchBalances(address);
     }
 
     // Update Symbol
@@ -84,6 +89,33 @@ async function switchChain(chain) {
     document.getElementById('nativeSymbol').innerText = symbol;
 }
 
+async function fetchBalances(address) {
+    const tokenAddress = USDC_ADDR[currentChain];
+    if (!tokenAddress) {
+        await fetchNativeBalance(address);
+        document.getElementById('usdcBalance').innerText = "N/A";
+        return;
+    }
+    try {
+        const multicall = new ethers.Contract(MULTICALL3_ADDR, MULTICALL3_ABI, provider);
+        const erc20 = new ethers.utils.Interface(ERC20_ABI);
+        const [native, balance, decimals] = await multicall.callStatic.aggregate3([
+            { target: MULTICALL3_ADDR, allowFailure: false, callData: multicall.interface.encodeFunctionData("getEthBalance", [address]) },
+            { target: tokenAddress, allowFailure: false, callData: erc20.encodeFunctionData("balanceOf", [address]) },
+            { target: tokenAddress, allowFailure: false, callData: erc20.encodeFunctionData("decimals") }
+        ]);
+        const wei = ethers.BigNumber.from(native.returnData);
+        document.getElementById('nativeBalance').innerText = parseFloat(ethers.utils.formatEther(wei)).toFixed(4);
+        const units = erc20.decodeFunctionResult("balanceOf", balance.returnData)[0];
+        const dec = erc20.decodeFunctionResult("decimals", decimals.returnData)[0];
+        document.getElementById('usdcBalance').innerText = parseFloat(ethers.utils.formatUnits(units, dec)).toFixed(2);
+    } catch (e) {
+        console.warn("Multicall3 unavailable, reading balances one by one:", e);
+        await fetchNativeBalance(address);
+        await fetchUSDCBalance(address);
+    }
+}
+
 async function fetchNativeBalance(address) {
     try {
         const balance = await provider.getBalance(address);
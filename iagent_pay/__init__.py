@@ -1,9 +1,38 @@
-from .agent_pay import AgentPay
-from .wallet_manager import WalletManager
-from .config import ChainConfig
-from .pricing import PricingManager
-from .yield_protocols import YieldManager
-from .reputation_manager import ReputationManager
-from .marketplace_bridge import MarketplaceBridge
-
-__all__ = ["AgentPay", "WalletManager", "ChainConfig", "PricingManager", "YieldManager", "ReputationManager", "MarketplaceBridge"]
+from typing import TYPE_CHECKING
+
+# Lazy exports (PEP 562): `import iagent_pay` loads nothing heavy. Each name imports its module
+# on first access, so EVM users never load solana/solders and Solana users skip the web3 contract stack.
+_EXPORTS = {
+    "AgentPay": ".agent_pay",
+    "AsyncAgentPay": ".async_agent_pay",
+    "WalletManager": ".wallet_manager",
+    "ChainConfig": ".config",
+    "PricingManager": ".pricing",
+    "YieldManager": ".yield_protocols",
+    "ReputationManager": ".reputation_manager",
+    "MarketplaceBridge": ".marketplace_bridge",
+}
+
+__all__ = ["AgentPay", "AsyncAgentPay", "WalletManager", "ChainConfig", "PricingManager", "YieldManager", "ReputationManager", "MarketplaceBridge"]
+
+if TYPE_CHECKING:
+    from .agent_pay import AgentPay
+    from .async_agent_pay import AsyncAgentPay
+    from .wallet_manager import WalletManager
+    from .config import ChainConfig
+    from .pricing import PricingManager
+    from .yield_protocols import YieldManager
+    from .reputation_manager import ReputationManager
+    from .marketplace_bridge import MarketplaceBridge
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value # Next access skips __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
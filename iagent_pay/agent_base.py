@@ -0,0 +1,157 @@
+import time
+import json
+import sqlite3
+from pathlib import Path
+from .audit_store import AuditStore
+from .spend_ledger import SpendLedger
+from .schema import migrate
+
+class AgentBase:
+    """
+    Chain-independent state shared by AgentPay and AsyncAgentPay.
+    Features:
+    - Audit Log: One row per tx_hash plus an append-only event trail (agent_history.db).
+    - Capital Control: Rolling 24h daily limit on native assets.
+    - Replay Guard: Paid invoice IDs.
+    - Trial Clock: Business-model enforcement from the first recorded transaction.
+    Nothing here touches the network, so both the sync and asyncio agents call it directly.
+    """
+    # Assets covered by the daily spending limit
+    NATIVE_SYMBOLS = ["ETH", "SOL", "MATIC", "BNB"]
+
+    def _open_audit_log(self, db_path: str = "agent_history.db"):
+        """Opens (and migrates) the audit log and builds the in-memory spend window."""
+        self.db_path = db_path
+        self.store = AuditStore(self.db_path)
+        self._init_db()
+        self.spend_ledger = SpendLedger(self.store, symbols=self.NATIVE_SYMBOLS)
+
+    def _init_db(self):
+        """Initializes (or migrates) the local SQLite database for audit logs."""
+        # Versioned, chunked migrations (see schema.py)
+        migrate(self.store)
+
+    def _is_invoice_paid(self, invoice_id: str) -> bool:
+        """Checks if an invoice ID has already been processed."""
+        return self.store.fetchone("SELECT 1 FROM paid_invoices WHERE invoice_id = ?", (invoice_id,)) is not None
+
+    def _mark_invoice_paid(self, invoice_id: str, recipient: str, amount: float):
+        """Records a paid invoice to prevent replay attacks."""
+        try:
+            self.store.execute("INSERT INTO paid_invoices VALUES (?, ?, ?, ?)",
+                               (invoice_id, time.time(), recipient, float(amount)))
+        except sqlite3.IntegrityError:
+            pass # Already exists
+
+    def _check_daily_limit(self, amount: float, symbol: str):
+        """Ensures daily spending does not exceed the limit."""
+        if not self.daily_limit or self.daily_limit <= 0:
+            return  # No limit set
+
+        # Only enforce on native assets for now (ETH, SOL, MATIC, BNB)
+        if symbol not in self.NATIVE_SYMBOLS:
+            return
+
+        # Rolling 24h Window (in-memory, kept in sync with the audit log)
+        spent_today = self.spend_ledger.spent(symbol)
+
+        if spent_today + amount > self.daily_limit:
+            raise ValueError(f"🚨 Security Alert: Daily Spending Limit Exceeded! Attempted: {amount} {symbol}, Spent 24h: {spent_today:.4f}, Limit: {self.daily_limit}")
+
+    def set_daily_limit(self, limit: float):
+        """Updates the daily spending limit (Native Tokens). Set to 0 to disable."""
+        self.daily_limit = limit
+        print(f"🛡️ Security Update: Daily Spending Limit set to {self.daily_limit} units.")
+
+    def _log_transaction(self, tx_hash, recipient, amount, status="PENDING", symbol="ETH"):
+        """Saves transaction details to the local audit log."""
+        self._log_transactions([(tx_hash, recipient, amount, status, symbol)])
+
+    def _log_transactions(self, entries):
+        """Bulk audit log: (tx_hash, recipient, amount, status, symbol) tuples in a single commit."""
+        ts = time.time()
+        events = []
+        # One row per tx_hash (status updated in place) + an append-only event trail
+        with self.store.transaction() as c:
+            for tx_hash, recipient, amount, status, symbol in entries:
+                c.execute("""INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)
+                             ON CONFLICT(tx_hash) DO UPDATE SET status = excluded.status""",
+                          (ts, tx_hash, recipient, amount, status, symbol))
+                cur = c.execute("INSERT INTO transaction_events (tx_hash, status, timestamp) VALUES (?, ?, ?)",
+                                (tx_hash, status, ts))
+                events.append((cur.lastrowid, tx_hash, amount, symbol, status))
+        for event_id, tx_hash, amount, symbol, status in events:
+            self.spend_ledger.record(event_id, tx_hash, ts, amount, symbol, status)
+
+    def _log_fee(self, tx_hash, fee):
+        """SolanaDriver.on_fee hook: records the compute budget / priority fee a tx was sent with."""
+        self.store.execute("INSERT OR REPLACE INTO priority_fees VALUES (?, ?, ?, ?, ?, ?)",
+                           (tx_hash, time.time(), fee["urgency"], fee["compute_unit_limit"], fee["compute_unit_price"], fee["priority_fee_lamports"]))
+
+    def _native_symbol(self) -> str:
+        """Symbol the daily limit tracks for this chain's gas token."""
+        if self.is_solana: return "SOL"
+        if self.chain_name == "POLYGON": return "MATIC"
+        if self.chain_name == "BNB": return "BNB"
+        return "ETH" # Default for EVM
+
+    def _treasury_from_config(self, cfg) -> str:
+        """Treasury address for this chain family from a pricing config."""
+        treas_data = cfg.get("treasury", {})
+        if isinstance(treas_data, dict):
+            return treas_data.get("SOLANA") if self.is_solana else treas_data.get("EVM")
+        return cfg.get("treasury_address")
+
+    def _first_transaction_time(self):
+        """Trial start: the global registry record, else the oldest audit-log row (None for a new user)."""
+        # Check Global Registry
+        home_dir = Path.home()
+        # Obfuscated path to prevent easy deletion
+        global_registry_dir = home_dir / ".cache" / "system_provider_bins"
+        registry_file = global_registry_dir / "meta_data.bin"
+
+        first_tx = None
+
+        # A) Try to read existing global record
+        if registry_file.exists():
+            try:
+                with open(registry_file, 'r') as f:
+                    data = json.load(f)
+                    first_tx = data.get("first_run_timestamp")
+            except Exception:
+                pass
+
+        # B) If no global record, look at local DB
+        if not first_tx:
+            row = self.store.fetchone("SELECT MIN(timestamp) FROM transactions")
+
+            if row and row[0]:
+                first_tx = float(row[0])
+                try:
+                    global_registry_dir.mkdir(parents=True, exist_ok=True)
+                    with open(registry_file, 'w') as f:
+                        json.dump({"first_run_timestamp": first_tx, "note": "DO NOT DELETE - License Integrity"}, f)
+                except Exception as e:
+                    print(f"⚠️ License System Warning: Could not write to global registry: {e}")
+            else:
+                return None # Truly new user
+        return float(first_tx)
+
+    def _enforce_license(self, status, amount_eth: float):
+        """Applies the trial / pay-as-you-go rules to a LicenseManager status (no I/O)."""
+        if not status or not status.get("trial_start"):
+            return # Truly new user
+
+        days_active = status["days_active"]
+        days_remaining = status["days_remaining"]
+
+        # 🔔 WARNING SYSTEM (5 Days Before)
+        if 0 < days_remaining <= 5:
+            print(f"\n⚠️  IMPORTANT: Free Trial ends in {int(days_remaining)} days.")
+            print(f"   Subscribe now (~$26/mo) to avoid per-transaction fees.")
+            print(f"   Treasury: {self.treasury_address}\n")
+
+        if days_active > status["trial_days"] and not status.get("pro"):
+            price_eth = status.get("fee_eth")
+            print(f"ℹ️ Trial Expired. Fee: {price_eth:.6f} ETH")
+            # Logic to verify or charge fee would go here
@@ -1,39 +1,66 @@
 ﻿import time
 import sqlite3
+import weakref
 import os
 import json
-from web3 import Web3
-from eth_account.signers.local import LocalAccount
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from decimal import Decimal
 from .config import ChainConfig
 from .pricing import PricingManager
-from .tokens import TOKEN_ADDRESSES, ERC20_ABI
-
-class AgentPay:
+from .agent_base import AgentBase
+from .nonce_manager import NonceManager, is_already_known
+from .confirmation_tracker import ConfirmationTracker, evm_receipt_statuses
+from .chain_metadata import ChainMetadata
+from .gas_oracle import GasOracle, BLOCK_TIMES
+from .gas_limits import GasLimitCache
+from .replacement_manager import ReplacementManager
+from .multicall import MULTICALL3_ADDRESS
+from .license_manager import LicenseManager
+
+if TYPE_CHECKING:
+    from web3 import Web3
+
+# web3 / RpcPool are imported where the EVM path needs them: Solana agents never load the web3 stack
+
+class AgentPay(AgentBase):
     """
     The main SDK class for AI Agents to interact with the blockchain.
     âœ… Professional Grade: Includes Nonce Management, Smart Gas, and Audit Logs.
     âœ… Multi-Chain: Supports Sepolia, Base, Polygon, BNB, and Solana.
     """
-    
-    def __init__(self, treasury_address: str = None, chain_name: str = "BASE", private_key: str = None, daily_limit: float = 10.0):
+    # Hedged reads: a read not answered within this many seconds is also sent to the next-best RPC
+    RPC_HEDGE_AFTER = 1.0
+    # get_portfolio() reads every balance through Multicall3 here (override for chains / testnets without it)
+    MULTICALL3_ADDRESS = MULTICALL3_ADDRESS
+
+    def __init__(self, treasury_address: str = None, chain_name: str = "BASE", private_key: str = None, daily_limit: float = 10.0,
+                 rpc_batch_window: float = None):
         """
         :param treasury_address: Where subscription fees go (EVM or SOL address).
         :param chain_name: "BASE", "POLYGON", "ETH", "BNB", "SEPOLIA" or "SOLANA".
         :param private_key: Optional manual override.
         :param daily_limit: Max amount of native tokens (ETH/SOL) to spend in 24h. Default: 10.0
+        :param rpc_batch_window: (Optional, opt-in) Concurrent reads issued within this many seconds share one JSON-RPC batch.
         """
         self.chain_name = chain_name.upper()
         self.daily_limit = daily_limit
+        self.rpc_batch_window = rpc_batch_window
         self.is_solana = self.chain_name in ["SOLANA", "SOL_DEVNET", "SOL_TESTNET", "SOL_MAINNET"]
 
         # --- DUAL DRIVER SELECTOR ---
         if self.is_solana:
             from iagent_pay.solana_driver import SolanaDriver
             network_map = {"SOLANA": "mainnet", "SOL_DEVNET": "devnet", "SOL_TESTNET": "testnet", "SOL_MAINNET": "mainnet"}
-            self.solana = SolanaDriver(network=network_map.get(self.chain_name, "devnet"))
+            self.solana = SolanaDriver(network=network_map.get(self.chain_name, "devnet"), batch_window=rpc_batch_window)
             self.my_address = self.solana.get_address()
+            self.nonce_manager = None
+            self.gas = None
+            self.gas_limits = None
+            self.replacements = None
+            self.confirmations = self.solana.confirmations
+            self.solana.on_fee = self._log_fee # Priority fee of every send goes to the audit log
             print(f"â˜€ï¸ [AgentPay] Initialized on SOLANA ({self.solana.network})")
             
         else:
@@ -45,6 +72,8 @@ class AgentPay:
             
             self.rpc_pool = rpc_list
             self.current_rpc_index = 0
+            self.rpc = None
+            self._chain = None
             self.w3 = self._connect_to_best_rpc()
             
             from .wallet_manager import WalletManager
@@ -58,134 +87,122 @@ class AgentPay:
             self.wallet = self.account 
             self.my_address = self.account.address
 
+            # Nonce Management (EVM): shared per (chain, address) across the process.
+            # The process-wide registry only gets a weak proxy: it must not keep this agent (w3, AuditStore) alive.
+            agent, address = weakref.proxy(self), self.my_address
+            network = dict(
+                fetch_mined_count=lambda: agent.w3.eth.get_transaction_count(address, 'latest'),
+                tx_known=lambda tx_hash: agent._tx_known(tx_hash)
+            )
+            fetch_pending_count = lambda: agent.w3.eth.get_transaction_count(address, 'pending')
+            if self.rpc_pool:
+                self.nonce_manager = NonceManager.for_account(self.chain_name, address, fetch_pending_count, **network)
+            else:
+                self.nonce_manager = NonceManager(fetch_pending_count, **network) # Each tester chain is its own network
+            # Fees: EIP-1559 estimates sampled about once per block
+            self.gas = GasOracle(lambda: self.w3, ttl=BLOCK_TIMES.get(self.chain_name, 2.0))
+            # Token transfer gas limits learned from receipts (skips estimate_gas once confident)
+            self.gas_limits = GasLimitCache()
+            # Receipt Waiting: one batched poller for every in-flight tx of this agent
+            self.confirmations = ConfirmationTracker(evm_receipt_statuses(lambda: self.w3), on_settled=self._log_confirmations)
+            # Stuck txs: speed-up / cancel with fee escalation
+            self.replacements = ReplacementManager(self)
+
         # --- COMMON MANAGERS (v3.0) ---
-        self.pricing = PricingManager()
+        # Pricing, social, swap, invoices, yield, reputation and marketplace are built on first use (see below).
+        # Treasury: resolved from the pricing config on first use unless given here
+        self.treasury_address = treasury_address
+        
+        self._open_audit_log("agent_history.db")
+        # License / trial state: refreshed in the background (from the first payment on), read from memory by every payment
+        self.license = LicenseManager(lambda: self.pricing.get_config(), self._first_transaction_time, self._verify_pro_subscription)
+
+    # --- LAZY SUBSYSTEMS: built on first attribute access, so short-lived workers only pay for what they use ---
+    @cached_property
+    def pricing(self) -> PricingManager:
+        return PricingManager()
+
+    @cached_property
+    def social(self):
         from .social_resolver import SocialResolver
-        self.social = SocialResolver()
+        return SocialResolver()
+
+    @cached_property
+    def swap_engine(self):
         from .swap_engine import SwapEngine
-        self.swap_engine = SwapEngine(self)
+        return SwapEngine(self)
+
+    @cached_property
+    def invoices(self):
         from .invoice_manager import InvoiceManager
-        self.invoices = InvoiceManager(self)
+        return InvoiceManager(self)
+
+    @cached_property
+    def yield_manager(self):
         from .yield_protocols import YieldManager
-        self.yield_manager = YieldManager(self)
-        from .reputation_manager import ReputationManager
-        self.reputation = ReputationManager(self)
-        from .marketplace_bridge import MarketplaceBridge
-        self.marketplace = MarketplaceBridge(self)
+        return YieldManager(self)
 
-        # Resolve Treasury
-        self.treasury_address = treasury_address
-        if not self.treasury_address:
-            cfg = self.pricing.get_config()
-            treas_data = cfg.get("treasury", {})
-            if isinstance(treas_data, dict):
-                self.treasury_address = treas_data.get("SOLANA") if self.is_solana else treas_data.get("EVM")
-            else:
-                self.treasury_address = cfg.get("treasury_address")
-        
-        self.db_path = "agent_history.db"
-        self._init_db()
-        self._local_nonce = {}
+    @cached_property
+    def reputation(self):
+        from .reputation_manager import ReputationManager
+        return ReputationManager(self)
 
-    def _connect_to_best_rpc(self) -> Web3:
-        """Attempts to connect to RPCs in the pool until one works."""
+    @cached_property
+    def marketplace(self):
+        from .marketplace_bridge import MarketplaceBridge
+        return MarketplaceBridge(self)
+
+    @property
+    def treasury_address(self) -> Optional[str]:
+        """Where subscription fees go: the constructor value, else the pricing config's (read on first use)."""
+        if not self._treasury_address:
+            self._treasury_address = self._treasury_from_config(self.pricing.get_config())
+        return self._treasury_address
+
+    @treasury_address.setter
+    def treasury_address(self, value: Optional[str]):
+        self._treasury_address = value
+
+    def _connect_to_best_rpc(self) -> "Web3":
+        """Builds the latency-scored RPC pool over the configured endpoints (see rpc_pool.py)."""
+        from web3 import Web3
+        from .rpc_pool import RpcPool
         if not self.rpc_pool:
             return Web3(Web3.EthereumTesterProvider())
-        for url in self.rpc_pool:
-            try:
-                w3 = Web3(Web3.HTTPProvider(url))
-                if w3.is_connected(): return w3
-            except: continue
-        return Web3(Web3.HTTPProvider(self.rpc_pool[0]))
+        self.rpc = RpcPool(self.rpc_pool, hedge_after=self.RPC_HEDGE_AFTER)
+        self.rpc.probe() # Concurrent health check seeds the latency scores
+        self.current_rpc_index = self.rpc_pool.index(self.rpc.best_url)
+        if self.rpc_batch_window:
+            from .rpc_batch import BatchingProvider
+            return Web3(BatchingProvider(self.rpc, window=self.rpc_batch_window))
+        return Web3(self.rpc)
 
     def rotate_rpc(self):
-        """Switches to the next healthy RPC in the pool."""
-        self.current_rpc_index = (self.current_rpc_index + 1) % len(self.rpc_pool)
-        self.w3 = self._connect_to_best_rpc()
-        self._init_db()
-
-        # Nonce Management (EVM)
-        self._local_nonce = {}
-
-    def _init_db(self):
-        """Initializes the local SQLite database for audit logs."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        # Initial Schema
-        c.execute('''CREATE TABLE IF NOT EXISTS transactions
-                     (timestamp REAL, tx_hash TEXT, recipient TEXT, amount REAL, status TEXT, symbol TEXT)''')
-        c.execute('''CREATE TABLE IF NOT EXISTS paid_invoices
-                     (invoice_id TEXT PRIMARY KEY, timestamp REAL, recipient TEXT, amount REAL)''')
-        
-        # Migration: Add 'symbol' if missing (for existing users)
-        try:
-            c.execute("ALTER TABLE transactions ADD COLUMN symbol TEXT")
-        except sqlite3.OperationalError:
-            pass # Column already exists
-            
-        conn.commit()
-        conn.close()
-
-    def _is_invoice_paid(self, invoice_id: str) -> bool:
-        """Checks if an invoice ID has already been processed."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("SELECT 1 FROM paid_invoices WHERE invoice_id = ?", (invoice_id,))
-        exists = c.fetchone() is not None
-        conn.close()
-        return exists
-
-    def _mark_invoice_paid(self, invoice_id: str, recipient: str, amount: float):
-        """Records a paid invoice to prevent replay attacks."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        try:
-            c.execute("INSERT INTO paid_invoices VALUES (?, ?, ?, ?)",
-                      (invoice_id, time.time(), recipient, float(amount)))
-            conn.commit()
-        except sqlite3.IntegrityError:
-            pass # Already exists
-        conn.close()
-
-    def _check_daily_limit(self, amount: float, symbol: str):
-        """Ensures daily spending does not exceed the limit."""
-        if not self.daily_limit or self.daily_limit <= 0:
-            return  # No limit set
-        
-        # Only enforce on native assets for now (ETH, SOL, MATIC, BNB)
-        if symbol not in ["ETH", "SOL", "MATIC", "BNB"]:
-            return 
-
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        # Rolling 24h Window
-        start_of_day = time.time() - 86400 
-        c.execute("""
-            SELECT SUM(amount) FROM transactions 
-            WHERE timestamp > ? AND symbol = ? AND status != 'FAILED'
-        """, (start_of_day, symbol))
-        
-        result = c.fetchone()
-        spent_today = result[0] if result and result[0] else 0.0
-        conn.close()
-        
-        if spent_today + amount > self.daily_limit:
-            raise ValueError(f"ðŸš¨ Security Alert: Daily Spending Limit Exceeded! Attempted: {amount} {symbol}, Spent 24h: {spent_today:.4f}, Limit: {self.daily_limit}")
-
-    def set_daily_limit(self, limit: float):
-        """Updates the daily spending limit (Native Tokens). Set to 0 to disable."""
-        self.daily_limit = limit
-        print(f"ðŸ›¡ï¸ Security Update: Daily Spending Limit set to {self.daily_limit} units.")
-
-    def _log_transaction(self, tx_hash, recipient, amount, status="PENDING", symbol="ETH"):
-        """Saves transaction details to the local audit log."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)",
-                  (time.time(), tx_hash, recipient, amount, status, symbol))
-        conn.commit()
-        conn.close()
+        """
+        Takes the current RPC out of rotation (with backoff) and moves to the next best one.
+        The pool already fails over per call; this only re-ranks. No reconnect, no DB work.
+        """
+        if not self.rpc_pool:
+            return
+        self._chain = None # Re-read chain metadata from the next node
+        self.gas.invalidate()
+        if self.rpc is None or self.rpc.urls != list(self.rpc_pool):
+            # Endpoint list was replaced: build a new pool for it
+            self.w3 = self._connect_to_best_rpc()
+            return
+        old_url = self.rpc_pool[self.current_rpc_index]
+        self.rpc.demote(old_url)
+        new_url = self.rpc.best_url
+        if new_url == old_url and len(self.rpc_pool) > 1:
+            new_url = self.rpc_pool[(self.current_rpc_index + 1) % len(self.rpc_pool)]
+        self.current_rpc_index = self.rpc_pool.index(new_url)
+
+    @property
+    def chain(self) -> ChainMetadata:
+        """Chain id / token map / decimals for the current connection (one eth_chainId per connection)."""
+        if self._chain is None:
+            self._chain = ChainMetadata(self.w3.eth.chain_id, self._native_symbol())
+        return self._chain
 
     def get_balance(self) -> float:
         """Returns balance in ETH or SOL."""
@@ -196,76 +213,124 @@ class AgentPay:
         wei = self.w3.eth.get_balance(self.my_address)
         return float(self.w3.from_wei(wei, 'ether'))
 
+    def get_portfolio(self, include_yield: bool = True) -> Dict[str, float]:
+        """
+        Every balance of this agent on the current chain: native coin, each supported token
+        and (with include_yield) Aave aTokens as "aUSDC".
+        EVM: One Multicall3 aggregate3 eth_call; decimals not yet in the TokenRegistry ride along
+        in the same call. Falls back to one call per balance where Multicall3 is not deployed.
+        """
+        if self.is_solana:
+            mints = {"USDC": self.solana.usdc_mint, "USDT": self.solana.usdt_mint}
+            return {"SOL": self.get_balance(), **{s: self.solana.get_token_balance(m) for s, m in mints.items() if m}}
+
+        from .multicall import Multicall, address_call, decode_uint, BALANCE_OF, DECIMALS, GET_ETH_BALANCE
+        chain = self.chain
+        holdings = dict(chain.tokens)
+        if include_yield:
+            for symbol, atoken in self.yield_manager.atoken_map.get(self.chain_name, {}).items():
+                holdings[f"a{symbol}"] = atoken
+
+        multicall = Multicall(self.w3, self.MULTICALL3_ADDRESS)
+        calls = [(multicall.address, address_call(GET_ETH_BALANCE, self.my_address))]
+        calls += [(address, address_call(BALANCE_OF, self.my_address)) for address in holdings.values()]
+        unknown = [address for address in holdings.values() if chain.registry.get_decimals(chain.chain_id, address) is None]
+        calls += [(address, DECIMALS) for address in unknown]
+        try:
+            results = [decode_uint(data) for data in multicall.aggregate3(calls)]
+        except Exception as e:
+            print(f"⚠️ [Portfolio] Multicall3 unavailable ({e}). Reading balances one by one...")
+            return self._get_portfolio_sequential(holdings)
+
+        for address, decimals in zip(unknown, results[1 + len(holdings):]):
+            if decimals is not None:
+                chain.registry.set_decimals(chain.chain_id, address, decimals)
+        portfolio = {chain.native_symbol: float(self.w3.from_wei(results[0] or 0, 'ether'))}
+        for (symbol, address), units in zip(holdings.items(), results[1:]):
+            decimals = chain.registry.get_decimals(chain.chain_id, address)
+            if units is None or decimals is None:
+                print(f"⚠️ [Portfolio] Could not read {symbol} balance ({address})")
+                continue
+            portfolio[symbol] = units / (10 ** decimals)
+        return portfolio
+
+    def _get_portfolio_sequential(self, holdings: Dict[str, str]) -> Dict[str, float]:
+        portfolio = {self.chain.native_symbol: self.get_balance()}
+        for symbol, address in holdings.items():
+            try:
+                contract = self.chain.token_contract(self.w3, address)
+                portfolio[symbol] = contract.functions.balanceOf(self.my_address).call() / (10 ** self.chain.token_decimals(contract))
+            except Exception as e:
+                print(f"⚠️ [Portfolio] Could not read {symbol} balance ({address}): {e}")
+        return portfolio
+
+    def _tx_known(self, tx_hash: str) -> bool:
+        """True if the node still has `tx_hash` (pending or mined). NonceManager checks this before re-using a nonce."""
+        from web3.exceptions import TransactionNotFound
+        try:
+            return self.w3.eth.get_transaction(tx_hash) is not None
+        except TransactionNotFound:
+            return False
+
     def _get_nonce(self):
         """
         Reliability Engine: seamless nonce management.
-        Gets the higher value between local counter and network count.
+        Returns the next nonce the NonceManager will hand out (does not reserve it).
+        Use self.nonce_manager.reserve() when actually building a transaction.
         """
         if self.is_solana: return 0 
         
-        network_nonce = self.w3.eth.get_transaction_count(self.my_address, 'pending')
-        
-        # Initialize if not set for this session
-        if self.my_address not in self._local_nonce:
-            self._local_nonce[self.my_address] = network_nonce
-            
-        # If network has a higher nonce (e.g. tx confirmed), update local
-        if network_nonce > self._local_nonce[self.my_address]:
-            self._local_nonce[self.my_address] = network_nonce
-            
-        return self._local_nonce[self.my_address]
+        return self.nonce_manager.peek()
 
-    def _get_smart_gas_price(self):
+    def _get_smart_gas_price(self, urgency: str = "normal") -> int:
         """
-        Smart Gas Station: Auto-calculates optimal fee.
+        Smart Gas Station: expected per-gas price (base fee + tip) from the cached GasOracle sample.
         """
-        base_price = self.w3.eth.gas_price
-        # Add 10% premium for speed/reliability
-        premium_price = int(base_price * 1.10)
-        return premium_price
+        return self.gas.expected_price(self.gas.fee_fields(urgency))
+
+    def _check_gas_guardrail(self, fees: Dict[str, int], max_gas_gwei: Optional[float], action: str = "Transaction aborted."):
+        """Raises ValueError if the expected gas price is above the caller's limit."""
+        if max_gas_gwei:
+            current_gwei = self.w3.from_wei(self.gas.expected_price(fees), 'gwei')
+            if current_gwei > max_gas_gwei:
+                raise ValueError(f"⛽ Gas Price ({current_gwei:.2f} Gwei) exceeds limit ({max_gas_gwei} Gwei). {action}")
 
     def _send_evm_transaction(self, tx: Dict[str, Any], wait: bool = True, log_recipient: str = "", log_amount: float = 0.0, log_symbol: str = "ETH") -> str:
         """Internal helper to sign, send, and log an EVM transaction."""
-        # Ensure nonce and gas are set if not provided
-        if 'nonce' not in tx:
-            tx['nonce'] = self._get_nonce()
-        if 'gasPrice' not in tx:
-            tx['gasPrice'] = self._get_smart_gas_price()
+        # Ensure gas and nonce are set if not provided (nonce last: nothing can fail between reserve and try)
+        if 'gasPrice' not in tx and 'maxFeePerGas' not in tx:
+            tx.update(self.gas.fee_fields())
         if 'chainId' not in tx:
-            tx['chainId'] = self.w3.eth.chain_id
+            tx['chainId'] = self.chain.chain_id
+        if 'nonce' not in tx:
+            tx['nonce'] = self.nonce_manager.reserve()
 
-        signed_tx = self.w3.eth.account.sign_transaction(tx, self.wallet.key)
-        
         try:
-            tx_hash_bytes = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            tx_hash = self.w3.to_hex(tx_hash_bytes)
-            
-            # Audit Log
-            print(f"âœ… Tx Sent: {tx_hash} (Gas: {tx['gasPrice']/1e9:.2f} Gwei)")
-            self._local_nonce[self.my_address] += 1
-            self._log_transaction(tx_hash, log_recipient, log_amount, "SENT", symbol=log_symbol)
-            
-            if wait:
-                print("â³ Waiting for confirmation...")
-                self.w3.eth.wait_for_transaction_receipt(tx_hash)
-                print("âœ… Confirmed!")
-                self._log_transaction(tx_hash, log_recipient, log_amount, "CONFIRMED", symbol=log_symbol)
-            
-            return tx_hash
+            # Escalates the fee itself if the node already holds a tx at this nonce
+            tx_hash = self.replacements.send(tx)
         except Exception as e:
-            # Handle "replacement transaction underpriced" specifically
-            if 'replacement transaction underpriced' in str(e):
-                print("âš ï¸  Transaction underpriced. Retrying with HIGHER gas...")
-                tx['gasPrice'] = int(tx['gasPrice'] * 1.20) # 20% bump
-                # Recurse once
-                return self._send_evm_transaction(tx, wait=wait, log_recipient=log_recipient, log_amount=log_amount, log_symbol=log_symbol)
-            
-            print(f"âŒ Transaction Failed: {e}")
+            self.nonce_manager.fail(tx['nonce'], e)
+            print(f"❌ Transaction Failed: {e}")
             raise e
 
-    def pay_agent(self, recipient_address: str, amount: float, wait: bool = True, max_gas_gwei: float = None) -> str:
+        # Audit Log
+        print(f"✅ Tx Sent: {tx_hash} (Gas: {self.gas.expected_price(tx)/1e9:.2f} Gwei)")
+        self.nonce_manager.mark_broadcast(tx['nonce'], tx_hash)
+        self._log_transaction(tx_hash, log_recipient, log_amount, "SENT", symbol=log_symbol)
+        self.replacements.watch(tx, tx_hash, recipient=log_recipient, amount=log_amount, symbol=log_symbol)
+
+        if wait:
+            print("⏳ Waiting for confirmation...")
+            # Logged as CONFIRMED / FAILED by the tracker (_log_confirmations)
+            status = self.confirmations.track(tx_hash, recipient=log_recipient, amount=log_amount, symbol=log_symbol).result()
+            print("✅ Confirmed!" if status == "CONFIRMED" else "❌ Reverted on-chain!")
+
+        return tx_hash
+
+    def pay_agent(self, recipient_address: str, amount: float, wait: bool = True, max_gas_gwei: float = None, urgency: str = "normal") -> str:
         """
         :param max_gas_gwei: (Optional) Max price to pay. If exceeded, raises ValueError.
+        :param urgency: "slow", "normal" or "fast" (priority-fee tier).
         """
         # 0. Social Resolution (ENS/SNS)
         resolved_address = self.social.resolve(recipient_address)
@@ -279,7 +344,7 @@ class AgentPay:
             self._check_daily_limit(amount, "SOL")
             try:
                 print(f"â˜€ï¸ Sending {amount:.6f} SOL...")
-                sig = self.solana.transfer(recipient_address, amount)
+                sig = self.solana.transfer(recipient_address, amount, urgency=urgency)
                 print(f"âœ… Solana Tx Sent: {sig}")
                 self._log_transaction(sig, recipient_address, amount, "SENT_SOL", symbol="SOL")
                 return sig
@@ -295,40 +360,32 @@ class AgentPay:
         self._check_license(amount)
         
         # Capital Control: Daily Limit Check
-        native_symbol = "ETH" # Default for EVM
-        if self.chain_name == "POLYGON": native_symbol = "MATIC"
-        if self.chain_name == "BNB": native_symbol = "BNB"
+        native_symbol = self._native_symbol()
         
         self._check_daily_limit(amount, native_symbol)
 
         amount_wei = self.w3.to_wei(amount, 'ether')
         
-        # 1. Get Reliable Nonce
-        current_nonce = self._get_nonce()
-        
-        # 2. Get Smart Gas
-        gas_price = self._get_smart_gas_price()
+        # 1. Get Smart Gas (cached; the nonce is reserved at send time)
+        fees = self.gas.fee_fields(urgency)
         
-        # 3. Gas Guardrail (User Choice)
-        if max_gas_gwei:
-            current_gwei = self.w3.from_wei(gas_price, 'gwei')
-            if current_gwei > max_gas_gwei:
-                raise ValueError(f"â›½ Gas Price ({current_gwei:.2f} Gwei) exceeds limit ({max_gas_gwei} Gwei). Transaction aborted.")
+        # 2. Gas Guardrail (User Choice)
+        self._check_gas_guardrail(fees, max_gas_gwei)
 
         tx = {
-            'nonce': current_nonce,
             'to': recipient_address,
             'value': amount_wei,
             'gas': 21000,
-            'gasPrice': gas_price,
-            'chainId': self.w3.eth.chain_id
+            'chainId': self.chain.chain_id,
+            **fees
         }
 
         return self._send_evm_transaction(tx, wait=wait, log_recipient=recipient_address, log_amount=amount, log_symbol=native_symbol)
 
-    def pay_token(self, recipient_address: str, amount: float, token: str = "USDC", wait: bool = True, max_gas_gwei: float = None) -> str:
+    def pay_token(self, recipient_address: str, amount: float, token: str = "USDC", wait: bool = True, max_gas_gwei: float = None, urgency: str = "normal") -> str:
         """
         Sends an ERC-20 (EVM) or SPL (Solana) Token payment.
+        :param urgency: "slow", "normal" or "fast" (priority-fee tier).
         """
         # 0. Social Resolution
         resolved_address = self.social.resolve(recipient_address)
@@ -344,27 +401,9 @@ class AgentPay:
                 print(f"â˜€ï¸ Sending {amount} {token} (SPL)...")
                 
                 # Resolve Mint
-                mint = None
-                if token == "USDC":
-                    mint = self.solana.usdc_mint
-                elif token == "USDT":
-                    mint = self.solana.usdt_mint
-                # --- MEME COINS ---
-                elif token == "BONK":
-                    mint = self.solana.bonk_mint
-                elif token == "WIF":
-                    mint = self.solana.wif_mint
-                elif token == "POPCAT":
-                    mint = self.solana.popcat_mint
-                else:
-                     # Allow custom mints if user passes full address? 
-                     # For now, restrict to known safe tokens or raw base58 check
-                     if len(token) > 10: # Assume it's a mint address
-                         mint = token
-                     else:
-                         raise NotImplementedError(f"Token '{token}' not auto-configured on Solana yet.")
+                mint = self.solana.resolve_mint(token)
                 
-                sig = self.solana.transfer_token(recipient_address, amount, mint_address=mint)
+                sig = self.solana.transfer_token(recipient_address, amount, mint_address=mint, urgency=urgency)
                 print(f"âœ… Solana Token Tx: {sig}")
                 self._log_transaction(sig, recipient_address, amount, f"SENT_{token}_SOL", symbol=token)
                 return sig
@@ -377,58 +416,63 @@ class AgentPay:
             raise ValueError(f"Invalid recipient address: {recipient_address}")
 
         # 1. Resolve Token Address
-        chain_id = self.w3.eth.chain_id
+        chain_id = self.chain.chain_id
         token_address = self._resolve_token_address(token)
         if not token_address:
             raise ValueError(f"Token {token} not supported on this chain.")
 
         # 2. Check Gas Guardrail (Early Fail)
-        if max_gas_gwei:
-             current_price = self._get_smart_gas_price() # This is wei
-             current_gwei = self.w3.from_wei(current_price, 'gwei')
-             if current_gwei > max_gas_gwei:
-                  raise ValueError(f"â›½ Gas Price ({current_gwei:.2f} Gwei) exceeds limit ({max_gas_gwei} Gwei). Aborting Token Tx.")
+        fees = self.gas.fee_fields(urgency)
+        self._check_gas_guardrail(fees, max_gas_gwei, "Aborting Token Tx.")
 
         # 3. Create Contract
-        contract = self.w3.eth.contract(address=token_address, abi=ERC20_ABI)
+        contract = self.chain.token_contract(self.w3, token_address)
         
         # 4. Get Decimals (Crucial! USDC has 6, ETH has 18)
-        decimals = contract.functions.decimals().call()
+        decimals = self.chain.token_decimals(contract)
         amount_units = int(amount * (10 ** decimals))
         
         # 5. Build Tx
-        nonce = self._get_nonce()
-        gas_price = self._get_smart_gas_price()
-        
-        # Estimate Gas (Tokens are complex)
-        try:
-             est_gas = contract.functions.transfer(recipient_address, amount_units).estimate_gas({'from': self.my_address})
-             limit_gas = int(est_gas * 1.2) # +20% buffer
-        except:
-             limit_gas = 100000 # Fallback safe limit
+        # Gas Limit: learned from earlier receipts, else estimated (Tokens are complex)
+        gas_key = self.gas_limits.key(chain_id, token_address, "transfer", recipient_address)
+        limit_gas = self.gas_limits.limit(gas_key)
+        if limit_gas is None:
+            try:
+                 est_gas = contract.functions.transfer(recipient_address, amount_units).estimate_gas({'from': self.my_address})
+                 limit_gas = int(est_gas * 1.2) # +20% buffer
+            except:
+                 limit_gas = 100000 # Fallback safe limit
              
-        tx = contract.functions.transfer(recipient_address, amount_units).build_transaction({
-            'chainId': chain_id,
-            'gas': limit_gas,
-            'gasPrice': gas_price,
-            'nonce': nonce
-        })
+        nonce = self.nonce_manager.reserve()
+        try:
+            tx = contract.functions.transfer(recipient_address, amount_units).build_transaction({
+                'chainId': chain_id,
+                'gas': limit_gas,
+                'nonce': nonce,
+                **fees
+            })
+        except Exception:
+            self.nonce_manager.release(nonce) # Never broadcast: hand it to the next payment
+            raise
 
         # 5. Sign & Send
-        signed_tx = self.w3.eth.account.sign_transaction(tx, private_key=self.account.key)
-        
         try:
-            tx_hash_bytes = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            tx_hash = self.w3.to_hex(tx_hash_bytes)
+            try:
+                tx_hash = self.replacements.send(tx)
+            except Exception as e:
+                self.nonce_manager.fail(nonce, e)
+                raise
+            self.nonce_manager.mark_broadcast(nonce, tx_hash)
+            self.replacements.watch(tx, tx_hash, recipient=recipient_address, amount=amount, symbol=token)
             
             print(f"ðŸ’µ Stablecoin Sent: {amount} {token} -> {tx_hash}")
-            self._log_transaction(tx_hash, recipient_address, amount, f"SENT_{token}")
+            self._log_transaction(tx_hash, recipient_address, amount, f"SENT_{token}", symbol=token)
             
             if wait:
                 print("â³ Waiting for stablecoin confirmation...")
-                self.w3.eth.wait_for_transaction_receipt(tx_hash)
-                print("âœ… Confirmed!")
-                self._log_transaction(tx_hash, recipient_address, amount, f"CONFIRMED_{token}")
+                status = self.confirmations.track(tx_hash, recipient=recipient_address, amount=amount, symbol=token, suffix=f"_{token}",
+                                                  gas_key=gas_key, gas_limit=limit_gas).result()
+                print("âœ… Confirmed!" if status == "CONFIRMED" else "❌ Reverted on-chain!")
                 
             return tx_hash
             
@@ -436,31 +480,217 @@ class AgentPay:
             print(f"âŒ Token Transfer Failed: {e}")
             raise e
 
+    def pay_many(self, payments: List[Dict[str, Any]], wait: bool = True, max_gas_gwei: float = None, max_workers: int = 16, urgency: str = "normal") -> List[Dict[str, Any]]:
+        """
+        Batch payouts (payroll-style fan-out).
+        :param payments: [{"recipient": "0x..", "amount": 0.1, "token": "ETH"}, ...] ('token' defaults to the native coin).
+        :param max_workers: Concurrent broadcasts.
+        :param urgency: "slow", "normal" or "fast" (priority-fee tier).
+        Shared lookups (license, daily limit, gas, chain id, token decimals) run once per batch,
+        nonces are consecutive, every tx is signed up-front, then broadcast concurrently.
+        Returns one dict per payment: recipient, amount, token, nonce, tx_hash, status ('CONFIRMED', 'SENT', 'FAILED', 'REJECTED'), error.
+        """
+        native_symbol = self._native_symbol()
+        results = []
+        for p in payments:
+            token = (p.get("token") or native_symbol).upper()
+            results.append({"recipient": p.get("recipient"), "amount": float(p.get("amount", 0)), "token": token,
+                            "nonce": None, "tx_hash": None, "status": "PENDING", "error": None})
+
+        # 0. Social Resolution (uncached handles looked up in parallel) + address validation (per item: a bad row must not sink the batch)
+        resolved_map = self.social.resolve_many(r["recipient"] for r in results if r["recipient"])
+        for r in results:
+            resolved = resolved_map.get(r["recipient"]) if r["recipient"] else None
+            if not resolved:
+                r["status"], r["error"] = "REJECTED", f"Could not resolve social handle: {r['recipient']}"
+            elif not self.is_solana and not self.w3.is_address(resolved):
+                r["status"], r["error"] = "REJECTED", f"Invalid recipient address: {resolved}"
+            else:
+                r["recipient"] = resolved
+        live = [r for r in results if r["status"] == "PENDING"]
+
+        # --- ROUTING: SOLANA (many transfers per transaction) ---
+        if self.is_solana:
+            self._pay_many_solana(live, native_symbol, wait, urgency)
+            return results
+
+        # 1. Batch-wide checks (same rules as pay_agent, applied to the total)
+        native_total = sum(r["amount"] for r in live if r["token"] == native_symbol)
+        if native_total:
+            self._check_license(native_total)
+            self._check_daily_limit(native_total, native_symbol)
+
+        # 2. Shared lookups, once per batch
+        fees = self.gas.fee_fields(urgency)
+        self._check_gas_guardrail(fees, max_gas_gwei, "Batch aborted.")
+        chain_id = self.chain.chain_id
+
+        tokens = {}
+        for r in live:
+            token = r["token"]
+            if token == native_symbol or token in tokens:
+                continue
+            token_address = self._resolve_token_address(token)
+            if not token_address:
+                tokens[token] = None
+                continue
+            contract = self.chain.token_contract(self.w3, token_address)
+            tokens[token] = (contract, token_address, self.chain.token_decimals(contract))
+
+        estimates = {}
+        def estimated_limit(token, contract, r, units):
+            # One estimate per token (only if some row has no learned limit); +20% buffer plus headroom for cold recipients
+            if token not in estimates:
+                try:
+                    estimates[token] = int(contract.functions.transfer(r["recipient"], units).estimate_gas({'from': self.my_address}) * 1.2) + 25000
+                except Exception:
+                    estimates[token] = 100000 # Fallback safe limit
+            return estimates[token]
+
+        # 3. Build unsigned txs
+        unsigned = []
+        for r in live:
+            token, gas_key = r["token"], None
+            if token == native_symbol:
+                tx = {'to': r["recipient"], 'value': self.w3.to_wei(r["amount"], 'ether'), 'gas': 21000}
+            elif tokens.get(token):
+                contract, token_address, decimals = tokens[token]
+                units = int(r["amount"] * (10 ** decimals))
+                gas_key = self.gas_limits.key(chain_id, token_address, "transfer", r["recipient"])
+                limit_gas = self.gas_limits.limit(gas_key) or estimated_limit(token, contract, r, units)
+                tx = contract.functions.transfer(r["recipient"], units).build_transaction({
+                    'chainId': chain_id, 'gas': limit_gas, 'nonce': 0, **fees
+                })
+            else:
+                r["status"], r["error"] = "REJECTED", f"Token {token} not supported on this chain."
+                continue
+            tx.update({**fees, 'chainId': chain_id})
+            unsigned.append((r, tx, gas_key))
+
+        if not unsigned:
+            return results
+
+        # 4. Consecutive nonces + sign everything before touching the network
+        nonces = self.nonce_manager.reserve_many(len(unsigned))
+        signed, batch = [], {}
+        try:
+            for (r, tx, gas_key), nonce in zip(unsigned, nonces):
+                tx['nonce'] = nonce
+                r["nonce"] = nonce
+                batch[nonce] = (tx, gas_key)
+                signed.append((r, self.w3.eth.account.sign_transaction(tx, self.wallet.key).raw_transaction))
+        except Exception:
+            for nonce in reversed(nonces): # Nothing was broadcast yet: hand every nonce back
+                self.nonce_manager.release(nonce)
+            for r, _, _ in unsigned:
+                r.pop("nonce", None)
+            raise
+
+        # 5. Concurrent broadcast. The in-process tester only accepts the next nonce, so it gets one lane.
+        def broadcast(item):
+            r, raw = item
+            try:
+                try:
+                    r["tx_hash"] = self.w3.to_hex(self.w3.eth.send_raw_transaction(raw))
+                except Exception as e:
+                    if not is_already_known(e):
+                        raise
+                    r["tx_hash"] = self.w3.to_hex(self.w3.keccak(raw)) # Already in the pool: that is our tx
+                r["status"] = "SENT"
+                self.nonce_manager.mark_broadcast(r["nonce"], r["tx_hash"])
+                self.replacements.watch(batch[r["nonce"]][0], r["tx_hash"], recipient=r["recipient"], amount=r["amount"], symbol=r["token"])
+            except Exception as e:
+                r["status"], r["error"] = "FAILED", str(e)
+                self.nonce_manager.fail(r["nonce"], e)
+
+        workers = max_workers if self.rpc_pool else 1
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(signed)))) as pool:
+            list(pool.map(broadcast, signed))
+
+        sent = [r for r, _ in signed if r["status"] == "SENT"]
+        self._log_transactions([(r["tx_hash"], r["recipient"], r["amount"], "SENT", r["token"]) for r in sent])
+        print(f"📦 Batch: {len(sent)}/{len(payments)} payments broadcast.")
+
+        # 6. Wait for all receipts together: one batched poll per round for the whole batch
+        if wait and sent:
+            futures = [(r, self.confirmations.track(r["tx_hash"], recipient=r["recipient"], amount=r["amount"], symbol=r["token"],
+                                                    gas_key=batch[r["nonce"]][1], gas_limit=batch[r["nonce"]][0]['gas'])) for r in sent]
+            for r, future in futures:
+                try:
+                    r["status"] = future.result()
+                except Exception as e:
+                    r["error"] = f"Not confirmed yet: {e}" # Stays 'SENT'
+                    continue
+                if r["status"] == "FAILED": r["error"] = "Reverted on-chain"
+            print(f"✅ Batch confirmed: {sum(r['status'] == 'CONFIRMED' for r in sent)}/{len(sent)}")
+
+        return results
+
+    def _pay_many_solana(self, live: List[Dict[str, Any]], native_symbol: str, wait: bool, urgency: str):
+        """pay_many() on Solana: SolanaDriver.transfer_batch packs the rows into as few transactions as fit."""
+        items = []
+        for r in live:
+            try:
+                mint = None if r["token"] == native_symbol else self.solana.resolve_mint(r["token"])
+                if r["token"] != native_symbol and not mint:
+                    raise NotImplementedError(f"Token '{r['token']}' not available on Solana {self.solana.network}.")
+            except Exception as e:
+                r["status"], r["error"] = "REJECTED", str(e)
+                continue
+            items.append((r, {"recipient": r["recipient"], "amount": r["amount"], "mint": mint}))
+
+        native_total = sum(r["amount"] for r, p in items if p["mint"] is None)
+        if native_total:
+            self._check_daily_limit(native_total, native_symbol)
+
+        outcomes = self.solana.transfer_batch([p for _, p in items], wait=wait, urgency=urgency)
+        for (r, _), outcome in zip(items, outcomes):
+            r.update(tx_hash=outcome["tx_hash"], status=outcome["status"], error=outcome["error"])
+
+        # Audit log: one row per payment. Payments sharing a signature are logged as "<signature>#<n>".
+        sent = [r for r, _ in items if r["tx_hash"]]
+        shared = {}
+        for r in sent:
+            shared[r["tx_hash"]] = shared.get(r["tx_hash"], 0) + 1
+        entries, position = [], {}
+        for r in sent:
+            sig = r["tx_hash"]
+            key = sig
+            if shared[sig] > 1:
+                position[sig] = position.get(sig, 0) + 1
+                key = f"{sig}#{position[sig]}"
+            status = "FAILED" if r["status"] == "FAILED" else ("SENT_SOL" if r["token"] == native_symbol else f"SENT_{r['token']}_SOL")
+            entries.append((key, r["recipient"], r["amount"], status, r["token"]))
+        self._log_transactions(entries)
+        print(f"📦 Batch: {len(sent)}/{len(live)} payments broadcast in {len(shared)} Solana txs.")
+
+    def payment_queue(self, **kwargs):
+        """
+        Opens a pre-signing PaymentQueue (EVM): submit() many payments, signing runs in worker
+        processes while a broadcaster ships them. Use as a context manager to drain and close it.
+        kwargs: workers, chunk_size, linger, use_processes, broadcasters.
+        """
+        from .payment_queue import PaymentQueue
+        return PaymentQueue(self, **kwargs)
+
+    def _log_confirmations(self, settled):
+        """ConfirmationTracker hook: final statuses of one polling round, in a single commit."""
+        self._log_transactions([(tx_hash, meta.get("recipient", ""), meta.get("amount", 0.0), status + meta.get("suffix", ""), meta.get("symbol", "ETH"))
+                                for tx_hash, status, meta in settled])
+        # Teach the gas-limit cache from token transfer receipts
+        for tx_hash, status, meta in settled:
+            if meta.get("gas_key") and "gas_used" in meta:
+                self.gas_limits.observe(meta["gas_key"], meta["recipient"], meta["gas_used"], meta["gas_limit"], ok=status == "CONFIRMED")
+
     def _resolve_token_address(self, token_symbol: str) -> Optional[str]:
         """Finds the token address for the current connected chain."""
-        chain_id = self.w3.eth.chain_id
-        
-        # Map Chain IDs to Names (Simple lookup)
-        chain_map = {
-            1: "ETH",
-            8453: "BASE",
-            137: "POLYGON",
-            42161: "ARBITRUM",
-            56: "BNB",
-            11155111: "SEPOLIA"
-        }
-        
-        chain_name = chain_map.get(chain_id)
-        if not chain_name:
-            return None
-            
-        return TOKEN_ADDRESSES.get(chain_name, {}).get(token_symbol)
+        return self.chain.token_address(token_symbol)
 
     def _verify_pro_subscription(self, config) -> bool:
         """Verifies if a valid Subscription TxHash exists in env."""
         sub_hash = os.getenv("IAGENT_LICENSE_KEY")
-        if not sub_hash:
-            return False
+        if not sub_hash or self.is_solana or getattr(self, "w3", None) is None:
+            return False # Subscriptions are EVM txs: nothing to look up on Solana
             
         try:
             # Verify on-chain
@@ -493,62 +723,15 @@ class AgentPay:
         3. If Expired: Checked for PRO Subscription.
         4. If No PRO: Enforces 'Pay-As-You-Go' Fee.
         """
-        # 1. Get Config (Now Dynamic)
-        config = self.pricing.get_config()
-        trial_days = config.get("trial_days", 60)
-        
-        # 2. Check Global Registry
-        from pathlib import Path
-        import json
-        
-        home_dir = Path.home()
-        # Obfuscated path to prevent easy deletion
-        global_registry_dir = home_dir / ".cache" / "system_provider_bins"
-        registry_file = global_registry_dir / "meta_data.bin"
-        
-        first_tx = None
-        
-        # A) Try to read existing global record
-        if registry_file.exists():
-            try:
-                with open(registry_file, 'r') as f:
-                    data = json.load(f)
-                    first_tx = data.get("first_run_timestamp")
-            except Exception:
-                pass 
-        
-        # B) If no global record, look at local DB
-        if not first_tx:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            c.execute("SELECT MIN(timestamp) FROM transactions")
-            row = c.fetchone()
-            conn.close()
-            
-            if row and row[0]:
-                first_tx = float(row[0])
-                try:
-                    global_registry_dir.mkdir(parents=True, exist_ok=True)
-                    with open(registry_file, 'w') as f:
-                        json.dump({"first_run_timestamp": first_tx, "note": "DO NOT DELETE - License Integrity"}, f)
-                except Exception as e:
-                    print(f"âš ï¸ License System Warning: Could not write to global registry: {e}")
-            else:
-                return # Truly new user
-        
-        days_active = (time.time() - first_tx) / 86400
-        days_remaining = trial_days - days_active
-        
-        # ðŸ”” WARNING SYSTEM (5 Days Before)
-        if 0 < days_remaining <= 5:
-            print(f"\nâš ï¸  IMPORTANT: Free Trial ends in {int(days_remaining)} days.")
-            print(f"   Subscribe now (~$26/mo) to avoid per-transaction fees.")
-            print(f"   Treasury: {self.treasury_address}\n")
+        # Cached snapshot (LicenseManager refreshes prices / trial / subscription in the background)
+        self.license.start() # Idempotent: the refresher starts with the first payment, not at construction
+        self._enforce_license(self.license.status(), amount_eth)
 
-        if days_active > trial_days:
-            price_eth = config.get("pay_per_use_price_eth")
-            print(f"â„¹ï¸ Trial Expired. Fee: {price_eth:.6f} ETH")
-            # Logic to verify or charge fee would go here
+    def close(self):
+        """Stops background work owned by this agent (license refresher, stuck-tx watcher). The agent stays usable."""
+        self.license.stop()
+        if self.replacements:
+            self.replacements.stop()
 
     def swap(self, input_token: str, output_token: str, amount: float):
         """
@@ -643,28 +826,16 @@ class AgentPay:
     def export_state(self, export_path: str = "agent_state_bundle.json"):
         """Exports all local databases to a single JSON file for migration."""
         print(f"ðŸ“¦ [PortableState] Exporting agent state to {export_path}...")
-        import sqlite3
         bundle = {}
         
-        db_map = {
-            "history": self.db_path,
-            "reputation": "agent_reputation.db",
-            "marketplace": "agent_marketplace.db"
+        store_map = {
+            "history": self.store,
+            "reputation": self.reputation.store,
+            "marketplace": self.marketplace.store
         }
         
-        for key, path in db_map.items():
-            if os.path.exists(path):
-                conn = sqlite3.connect(path)
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                tables = [row[0] for row in cursor.fetchall()]
-                db_data = {}
-                for table in tables:
-                    cursor.execute(f"SELECT * FROM {table}")
-                    db_data[table] = [dict(row) for row in cursor.fetchall()]
-                bundle[key] = db_data
-                conn.close()
+        for key, store in store_map.items():
+            bundle[key] = store.dump()
         
         with open(export_path, 'w') as f:
             json.dump(bundle, f, indent=2)
@@ -676,27 +847,16 @@ class AgentPay:
         if not os.path.exists(import_path):
             raise FileNotFoundError(f"State bundle not found at {import_path}")
         print(f"ðŸ“¦ [PortableState] Importing agent state from {import_path}...")
-        import sqlite3
         with open(import_path, 'r') as f:
             bundle = json.load(f)
-        db_map = {
-            "history": self.db_path,
-            "reputation": "agent_reputation.db",
-            "marketplace": "agent_marketplace.db"
+        store_map = {
+            "history": self.store,
+            "reputation": self.reputation.store,
+            "marketplace": self.marketplace.store
         }
         for key, db_data in bundle.items():
-            path = db_map.get(key)
-            if not path: continue
-            conn = sqlite3.connect(path)
-            cursor = conn.cursor()
-            for table_name, rows in db_data.items():
-                if not rows: continue
-                columns = list(rows[0].keys())
-                placeholders = ", ".join(["?"] * len(columns))
-                col_names = ", ".join(columns)
-                cmd = f"INSERT OR REPLACE INTO {table_name} ({col_names}) VALUES ({placeholders})"
-                cursor.executemany(cmd, [tuple(row.values()) for row in rows])
-            conn.commit()
-            conn.close()
+            store = store_map.get(key)
+            if not store: continue
+            store.load(db_data)
         print("âœ… Import Complete. Agent state restored.")
 
@@ -0,0 +1,377 @@
+import asyncio
+from functools import cached_property
+from typing import Optional, Dict, Any
+from .agent_base import AgentBase
+from .config import ChainConfig
+from .pricing import PricingManager
+from .nonce_manager import NonceManager, is_already_known
+from .chain_metadata import ChainMetadata
+from .gas_oracle import GasOracle, BLOCK_TIMES
+from .gas_limits import GasLimitCache
+from .license_manager import LicenseManager
+
+class AsyncAgentPay(AgentBase):
+    """
+    asyncio flavour of AgentPay for agents that run inside an event loop.
+    Features:
+    - EVM: AsyncWeb3 + AsyncHTTPProvider (AsyncEthereumTesterProvider on LOCAL).
+    - Solana: solana.rpc.async_api.AsyncClient through SolanaDriver's *_async methods.
+    - Prices: PricingManager.get_config_async() queries every source concurrently (aiohttp).
+    - Non-Blocking Confirmation: Receipts / signature statuses are polled with asyncio.sleep,
+      so other tasks keep running while a payment settles.
+    - Shared State: Same audit log, daily limit and per-account NonceManager as the sync AgentPay.
+    Usage:
+        async with AsyncAgentPay(chain_name="BASE") as agent:
+            tx_hash = await agent.pay_agent("0x...", 0.01)
+    """
+
+    def __init__(self, treasury_address: str = None, chain_name: str = "BASE", private_key: str = None, daily_limit: float = 10.0):
+        """
+        Same parameters as AgentPay. No network I/O happens here: the RPC is picked
+        on `await agent.connect()` (or `async with`, or the first call that needs it).
+        """
+        self.chain_name = chain_name.upper()
+        self.daily_limit = daily_limit
+        self.is_solana = self.chain_name in ["SOLANA", "SOL_DEVNET", "SOL_TESTNET", "SOL_MAINNET"]
+        self.treasury_address = treasury_address
+        self.w3 = None
+        self.solana = None
+        self.nonce_manager = None
+        self.chain = None
+        self.gas = None
+        self.gas_limits = None
+        self._connected = False
+        self._connect_lock = asyncio.Lock()
+
+        if self.is_solana:
+            from iagent_pay.solana_driver import SolanaDriver
+            network_map = {"SOLANA": "mainnet", "SOL_DEVNET": "devnet", "SOL_TESTNET": "testnet", "SOL_MAINNET": "mainnet"}
+            self.solana = SolanaDriver(network=network_map.get(self.chain_name, "devnet"))
+            self.my_address = self.solana.get_address()
+            self.solana.on_fee = self._log_fee # Priority fee of every send goes to the audit log (off the loop: see *_async sends)
+            print(f"☀️ [AsyncAgentPay] Initialized on SOLANA ({self.solana.network})")
+        else:
+            self.config = ChainConfig.get_network(chain_name)
+            rpc_list = self.config.get("rpc")
+            if isinstance(rpc_list, str): rpc_list = [rpc_list]
+            elif not rpc_list: rpc_list = []
+            self.rpc_pool = rpc_list
+            self.current_rpc_index = 0
+            self.gas_limits = GasLimitCache()
+
+            if private_key:
+                from eth_account import Account
+                self.account = Account.from_key(private_key)
+            else:
+                from .wallet_manager import WalletManager
+                self.account = WalletManager().get_or_create_wallet()
+            self.wallet = self.account
+            self.my_address = self.account.address
+
+        self._open_audit_log("agent_history.db")
+        # License / trial state: refresher thread starts on connect()
+        self.license = LicenseManager(lambda: self.pricing.get_config(), self._first_transaction_time)
+
+    # --- Lazy subsystems (built on first use) ---
+    @cached_property
+    def pricing(self) -> PricingManager:
+        return PricingManager()
+
+    @cached_property
+    def social(self):
+        from .social_resolver import SocialResolver
+        return SocialResolver()
+
+    # --- Connection ---
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def connect(self):
+        """Picks the first RPC in the pool that answers and resolves the treasury (idempotent)."""
+        if self._connected:
+            return
+        async with self._connect_lock:
+            if self._connected:
+                return
+            if not self.is_solana:
+                self.w3 = await self._connect_to_best_rpc()
+                # Nonce Management: shared with any sync AgentPay on the same (chain, address).
+                # No fetch callable: counts are awaited here and fed to observe().
+                if self.rpc_pool:
+                    self.nonce_manager = NonceManager.for_account(self.chain_name, self.my_address, None)
+                else:
+                    self.nonce_manager = NonceManager(None) # Each tester chain is its own network
+                # Chain metadata: one eth_chainId per connection
+                self.chain = ChainMetadata(await self.w3.eth.chain_id, self._native_symbol())
+                # Fees: EIP-1559 estimates sampled about once per block
+                self.gas = GasOracle(lambda: self.w3, ttl=BLOCK_TIMES.get(self.chain_name, 2.0))
+
+            # Resolve Treasury
+            if not self.treasury_address:
+                self.treasury_address = self._treasury_from_config(await self.pricing.get_config_async())
+            self.license.start()
+            self._connected = True
+
+    async def _connect_to_best_rpc(self):
+        """Attempts to connect to RPCs in the pool until one works."""
+        from web3 import AsyncWeb3
+        if not self.rpc_pool:
+            from web3.providers.eth_tester import AsyncEthereumTesterProvider
+            return AsyncWeb3(AsyncEthereumTesterProvider())
+        for url in self.rpc_pool[self.current_rpc_index:] + self.rpc_pool[:self.current_rpc_index]:
+            try:
+                w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(url))
+                if await w3.is_connected(): return w3
+            except Exception:
+                continue
+        return AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(self.rpc_pool[0]))
+
+    async def rotate_rpc(self):
+        """Switches to the next RPC in the pool (no-op on Solana and the local tester: nothing to switch to)."""
+        if self.is_solana or not self.rpc_pool:
+            return
+        self.current_rpc_index = (self.current_rpc_index + 1) % len(self.rpc_pool)
+        old, self.w3 = self.w3, None
+        self._connected = False
+        if old is not None:
+            await self._disconnect(old)
+        await self.connect()
+
+    async def close(self):
+        """Closes HTTP sessions held by the async clients (the audit log stays usable)."""
+        if self.solana is not None:
+            await self.solana.close_async()
+        if self.w3 is not None:
+            await self._disconnect(self.w3)
+            self.w3 = None
+        self._connected = False
+
+    @staticmethod
+    async def _disconnect(w3):
+        disconnect = getattr(w3.provider, "disconnect", None)
+        if disconnect is not None:
+            try:
+                await disconnect()
+            except Exception:
+                pass
+
+    # --- Helpers ---
+    async def _resolve(self, recipient: str) -> str:
+        """Social Resolution (ENS/SNS). Handles are looked up in a worker thread; raw addresses return immediately."""
+        if recipient.strip().lower().endswith((".eth", ".sol")):
+            resolved = await asyncio.to_thread(self.social.resolve, recipient)
+        else:
+            resolved = self.social.resolve(recipient)
+        if not resolved:
+            raise ValueError(f"Could not resolve social handle: {recipient}")
+        return resolved
+
+    async def _check_license(self, amount_eth: float):
+        """Same business rules as AgentPay._check_license (cached snapshot; only a cold start waits, off the loop)."""
+        if not self.license.ready:
+            await asyncio.to_thread(self.license.current)
+        self._enforce_license(self.license.status(), amount_eth)
+
+    async def _get_smart_gas_price(self, urgency: str = "normal") -> int:
+        """Smart Gas Station: expected per-gas price (base fee + tip) from the cached GasOracle sample."""
+        return self.gas.expected_price(await self.gas.fee_fields_async(urgency))
+
+    def _check_gas_guardrail(self, fees: Dict[str, int], max_gas_gwei: Optional[float]):
+        if max_gas_gwei:
+            current_gwei = self.w3.from_wei(self.gas.expected_price(fees), 'gwei')
+            if current_gwei > max_gas_gwei:
+                raise ValueError(f"⛽ Gas Price ({current_gwei:.2f} Gwei) exceeds limit ({max_gas_gwei} Gwei). Transaction aborted.")
+
+    async def _log_transaction_async(self, *args, **kwargs):
+        """_log_transaction() in a worker thread: SQLite commits must not stall the event loop."""
+        await asyncio.to_thread(self._log_transaction, *args, **kwargs)
+
+    async def _reserve_nonce(self) -> int:
+        if not self.nonce_manager.synced:
+            self.nonce_manager.observe(await self.w3.eth.get_transaction_count(self.my_address, 'pending'))
+        return self.nonce_manager.reserve()
+
+    async def _resync_nonces(self):
+        """Awaited NonceManager.resync(): pending count, then lost nonces checked by mined count and tx hash."""
+        from web3.exceptions import TransactionNotFound
+        self.nonce_manager.observe(await self.w3.eth.get_transaction_count(self.my_address, 'pending'))
+        candidates = self.nonce_manager.lost_candidates()
+        if not candidates:
+            return
+        mined = await self.w3.eth.get_transaction_count(self.my_address, 'latest')
+        for nonce, tx_hash in candidates:
+            found = nonce < mined or tx_hash is None
+            if not found:
+                try:
+                    await self.w3.eth.get_transaction(tx_hash)
+                    found = True
+                except TransactionNotFound:
+                    pass
+            self.nonce_manager.confirm_lost(nonce, mined, found)
+
+    async def get_balance(self) -> float:
+        """Returns balance in ETH or SOL."""
+        if self.is_solana:
+            return await self.solana.get_balance_async()
+        await self.connect()
+        wei = await self.w3.eth.get_balance(self.my_address)
+        return float(self.w3.from_wei(wei, 'ether'))
+
+    async def wait_for_confirmation(self, tx_hash: str, timeout: float = 120, poll_interval: float = 0.5) -> Dict[str, Any]:
+        """Awaits an EVM receipt without blocking the event loop."""
+        return await self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout, poll_latency=poll_interval)
+
+    async def _send_evm_transaction(self, tx: Dict[str, Any], wait: bool = True, log_recipient: str = "", log_amount: float = 0.0, log_symbol: str = "ETH", gas_key: tuple = None, status_suffix: str = "") -> str:
+        """
+        Internal helper to sign, send, and log an EVM transaction. `gas_key`: teach GasLimitCache from the receipt.
+        `status_suffix` is appended to the logged statuses (token payments log SENT_USDC / CONFIRMED_USDC, as AgentPay does).
+        """
+        if 'gasPrice' not in tx and 'maxFeePerGas' not in tx:
+            tx.update(await self.gas.fee_fields_async())
+        if 'chainId' not in tx:
+            tx['chainId'] = self.chain.chain_id
+        if 'nonce' not in tx:
+            tx['nonce'] = await self._reserve_nonce()
+
+        try:
+            signed_tx = self.account.sign_transaction(tx)
+        except Exception:
+            self.nonce_manager.release(tx['nonce']) # Never broadcast: hand it to the next payment
+            raise
+        try:
+            tx_hash = self.w3.to_hex(await self.w3.eth.send_raw_transaction(signed_tx.raw_transaction))
+        except Exception as e:
+            if not is_already_known(e):
+                if self.nonce_manager.fail(tx['nonce'], e):
+                    # Stale nonce: re-read the network count so the next reserve() is correct
+                    await self._resync_nonces()
+                print(f"❌ Transaction Failed: {e}")
+                raise
+            tx_hash = self.w3.to_hex(signed_tx.hash) # This exact tx is already in the pool
+
+        print(f"✅ Tx Sent: {tx_hash} (Gas: {self.gas.expected_price(tx)/1e9:.2f} Gwei)")
+        self.nonce_manager.mark_broadcast(tx['nonce'], tx_hash)
+        await self._log_transaction_async(tx_hash, log_recipient, log_amount, f"SENT{status_suffix}", symbol=log_symbol)
+
+        if wait:
+            print("⏳ Waiting for confirmation...")
+            receipt = await self.wait_for_confirmation(tx_hash)
+            status = "CONFIRMED" if receipt.get("status", 1) == 1 else "FAILED"
+            print("✅ Confirmed!" if status == "CONFIRMED" else "❌ Reverted on-chain!")
+            await self._log_transaction_async(tx_hash, log_recipient, log_amount, f"{status}{status_suffix}", symbol=log_symbol)
+            if gas_key:
+                self.gas_limits.observe(gas_key, log_recipient, receipt["gasUsed"], tx['gas'], ok=status == "CONFIRMED")
+
+        return tx_hash
+
+    # --- Payments ---
+    async def pay_agent(self, recipient_address: str, amount: float, wait: bool = True, max_gas_gwei: float = None, urgency: str = "normal") -> str:
+        """
+        Sends native currency (ETH/MATIC/BNB or SOL).
+        :param max_gas_gwei: (Optional) Max price to pay. If exceeded, raises ValueError.
+        :param urgency: "slow", "normal" or "fast" (priority-fee tier).
+        """
+        recipient_address = await self._resolve(recipient_address)
+
+        # --- ROUTING: SOLANA ---
+        if self.is_solana:
+            await self.connect()
+            self._check_daily_limit(amount, "SOL")
+            try:
+                print(f"☀️ Sending {amount:.6f} SOL...")
+                sig = await self.solana.transfer_async(recipient_address, amount, wait=wait, urgency=urgency)
+                print(f"✅ Solana Tx Sent: {sig}")
+                await self._log_transaction_async(sig, recipient_address, amount, "SENT_SOL", symbol="SOL")
+                return sig
+            except Exception as e:
+                print(f"❌ Solana Tx Failed: {e}")
+                raise
+
+        # --- ROUTING: EVM ---
+        await self.connect()
+        if not self.w3.is_address(recipient_address):
+            raise ValueError(f"Invalid recipient address: {recipient_address}")
+
+        await self._check_license(amount)
+        native_symbol = self._native_symbol()
+        self._check_daily_limit(amount, native_symbol)
+
+        fees = await self.gas.fee_fields_async(urgency)
+        self._check_gas_guardrail(fees, max_gas_gwei)
+
+        tx = {
+            'to': recipient_address,
+            'value': self.w3.to_wei(amount, 'ether'),
+            'gas': 21000,
+            'chainId': self.chain.chain_id,
+            **fees
+        }
+        return await self._send_evm_transaction(tx, wait=wait, log_recipient=recipient_address, log_amount=amount, log_symbol=native_symbol)
+
+    async def pay_token(self, recipient_address: str, amount: float, token: str = "USDC", wait: bool = True, max_gas_gwei: float = None, urgency: str = "normal") -> str:
+        """Sends an ERC-20 (EVM) or SPL (Solana) Token payment."""
+        recipient_address = await self._resolve(recipient_address)
+
+        # --- ROUTING: SOLANA ---
+        if self.is_solana:
+            try:
+                print(f"☀️ Sending {amount} {token} (SPL)...")
+                mint = self.solana.resolve_mint(token)
+                sig = await self.solana.transfer_token_async(recipient_address, amount, mint_address=mint, wait=wait, urgency=urgency)
+                print(f"✅ Solana Token Tx: {sig}")
+                await self._log_transaction_async(sig, recipient_address, amount, f"SENT_{token}_SOL", symbol=token)
+                return sig
+            except Exception as e:
+                print(f"❌ Solana Token Tx Failed: {e}")
+                raise
+
+        # --- ROUTING: EVM ---
+        await self.connect()
+        if not self.w3.is_address(recipient_address):
+            raise ValueError(f"Invalid recipient address: {recipient_address}")
+
+        token_address = self._resolve_token_address(token)
+        if not token_address:
+            raise ValueError(f"Token {token} not supported on this chain.")
+
+        fees = await self.gas.fee_fields_async(urgency)
+        self._check_gas_guardrail(fees, max_gas_gwei)
+
+        contract = self.chain.token_contract(self.w3, token_address)
+        decimals = self.chain.registry.get_decimals(self.chain.chain_id, token_address)
+        if decimals is None:
+            decimals = await contract.functions.decimals().call()
+            self.chain.registry.set_decimals(self.chain.chain_id, token_address, decimals)
+        amount_units = int(amount * (10 ** decimals))
+        transfer_fn = contract.functions.transfer(recipient_address, amount_units)
+
+        chain_id = self.chain.chain_id
+        gas_key = self.gas_limits.key(chain_id, token_address, "transfer", recipient_address)
+        limit_gas = self.gas_limits.limit(gas_key)
+        if limit_gas is None:
+            try:
+                limit_gas = int(await transfer_fn.estimate_gas({'from': self.my_address}) * 1.2) # +20% buffer
+            except Exception:
+                limit_gas = 100000 # Fallback safe limit
+
+        nonce = await self._reserve_nonce()
+        try:
+            tx = await transfer_fn.build_transaction({
+                'chainId': chain_id,
+                'gas': limit_gas,
+                'nonce': nonce,
+                **fees
+            })
+        except Exception:
+            self.nonce_manager.release(nonce)
+            raise
+        return await self._send_evm_transaction(tx, wait=wait, log_recipient=recipient_address, log_amount=amount, log_symbol=token,
+                                               gas_key=gas_key, status_suffix=f"_{token}")
+
+    def _resolve_token_address(self, token_symbol: str) -> Optional[str]:
+        """Finds the token address for the current connected chain."""
+        return self.chain.token_address(token_symbol)
@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+class _Connection(sqlite3.Connection):
+    """sqlite3.Connection does not support weak references; subclasses do."""
+
+class AuditStore:
+    """
+    Shared SQLite backend for the local audit databases (history, reputation, marketplace).
+    Features:
+    - Long-Lived Connections: One connection per thread, opened once and re-used.
+    - WAL Journal: Readers never block the writer; commits append to the log.
+    - synchronous=NORMAL: No fsync per commit (only at checkpoints), still crash-safe in WAL mode.
+    - Prepared Statements: sqlite3 keeps a per-connection statement cache keyed by SQL text.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 5.0, cached_statements: int = 256):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = weakref.WeakSet()
+
+    def _open(self) -> sqlite3.Connection:
+        # A WAL/SHM pair without its database belongs to a deleted file.
+        # Re-using it would replay foreign pages into the new database.
+        if not os.path.exists(self.db_path):
+            for suffix in ("-wal", "-shm"):
+                try:
+                    os.remove(self.db_path + suffix)
+                except OSError:
+                    pass
+
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            isolation_level=None, # Autocommit; multi-statement work goes through transaction()
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            factory=_Connection,
+        )
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.OperationalError:
+            pass # Locked by another writer; keep the current journal mode
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._lock:
+            self._connections.add(conn)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """Runs a single statement in its own (autocommit) transaction."""
+        return self.connection().execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> sqlite3.Cursor:
+        """Runs a statement for every parameter set inside one transaction (one commit)."""
+        with self.transaction() as conn:
+            return conn.executemany(sql, seq_of_params)
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        return self.connection().execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return self.connection().execute(sql, params).fetchall()
+
+    @contextmanager
+    def transaction(self, immediate: bool = True):
+        """
+        Groups several statements into one commit.
+        BEGIN IMMEDIATE takes the write lock up-front so read-then-write blocks don't deadlock.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            # Nested use: join the outer transaction
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def dump(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Returns every table as a list of row dicts (used by State Portability)."""
+        conn = self.connection()
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")]
+        data = {}
+        for table in tables:
+            cursor = conn.execute(f"SELECT * FROM {table}")
+            columns = [d[0] for d in cursor.description]
+            data[table] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return data
+
+    def load(self, db_data: Dict[str, List[Dict[str, Any]]]):
+        """Upserts rows produced by dump() back into their tables."""
+        with self.transaction() as conn:
+            for table_name, rows in db_data.items():
+                if not rows: continue
+                columns = list(rows[0].keys())
+                placeholders = ", ".join(["?"] * len(columns))
+                col_names = ", ".join(columns)
+                cmd = f"INSERT OR REPLACE INTO {table_name} ({col_names}) VALUES ({placeholders})"
+                conn.executemany(cmd, [tuple(row.values()) for row in rows])
+
+    def close(self):
+        """Closes every connection opened by this store (all threads)."""
+        with self._lock:
+            conns = list(self._connections)
+            self._connections = weakref.WeakSet()
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
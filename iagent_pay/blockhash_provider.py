@@ -0,0 +1,141 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+class BlockhashProvider:
+    """
+    Recent Solana blockhash, shared by every transfer in the process.
+    Features:
+    - Shared: One provider per RPC URL (for_rpc()), so all drivers and threads sign with the same hash.
+    - Prefetch: While transfers are flowing, a daemon thread re-reads the blockhash every `refresh_interval`
+      seconds, well before it expires (~150 slots, ~60s). Sends skip the get_latest_blockhash round-trip.
+    - Max Age: A hash older than `max_age` is never handed out; the caller fetches one inline.
+    - Idle Stop: The prefetch thread exits after `idle_timeout` seconds without a send.
+    - Expiry: invalidate() after a "Blockhash not found" error forces a fresh hash.
+    - Duplicate Guard: claim() remembers the messages signed under each recent hash. Two identical
+      payments under one hash would be byte-identical (same signature), and the cluster drops the second.
+    """
+
+    SENT_HASHES = 4 # Blockhashes whose sent messages are remembered (older ones have been replaced long ago)
+
+    _shared: Dict[str, "BlockhashProvider"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, get_client: Callable[[], Any], refresh_interval: float = 20.0, max_age: float = 45.0, idle_timeout: float = 120.0):
+        """
+        :param get_client: Returns the solana.rpc.api.Client to read blockhashes from.
+        :param refresh_interval: Seconds between background refreshes.
+        :param max_age: Older hashes are not served (a hash lives ~60s; leave time for the tx to land).
+        :param idle_timeout: The prefetch thread stops after this long without a get().
+        """
+        self.get_client = get_client
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+        self._entry: Optional[Tuple[Any, Optional[int], float]] = None # (blockhash, last_valid_block_height, fetched_at)
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._last_used = 0.0
+        self._sent: "OrderedDict[str, Set[bytes]]" = OrderedDict() # blockhash -> digests of messages signed with it
+        self._sent_lock = threading.Lock()
+        self.fetches = 0 # RPC reads actually made
+
+    @classmethod
+    def for_rpc(cls, rpc_url: str, get_client: Callable[[], Any]) -> "BlockhashProvider":
+        """Process-wide provider for `rpc_url`, created on first use."""
+        with cls._shared_lock:
+            provider = cls._shared.get(rpc_url)
+            if provider is None:
+                provider = cls._shared[rpc_url] = cls(get_client)
+            return provider
+
+    def put(self, blockhash, last_valid_block_height: Optional[int] = None):
+        """Stores a blockhash read elsewhere (e.g. by an async client)."""
+        self._entry = (blockhash, last_valid_block_height, time.monotonic())
+
+    def cached(self):
+        """The current blockhash if it is younger than max_age, else None."""
+        entry = self._entry
+        if entry is None or time.monotonic() - entry[2] > self.max_age:
+            return None
+        return entry[0]
+
+    def refresh(self):
+        """Reads the latest blockhash from the chain now."""
+        value = self.get_client().get_latest_blockhash().value
+        self.fetches += 1
+        self.put(value.blockhash, value.last_valid_block_height)
+        return value.blockhash
+
+    def get(self):
+        """Blockhash to sign with: the prefetched one, or an inline read when none is fresh."""
+        self._last_used = time.monotonic()
+        self._ensure_prefetch()
+        blockhash = self.cached()
+        if blockhash is not None:
+            return blockhash
+        with self._fetch_lock: # A burst on a cold provider costs one read, not one per thread
+            blockhash = self.cached()
+            if blockhash is None:
+                blockhash = self.refresh()
+            return blockhash
+
+    async def get_async(self, async_client):
+        """get() for asyncio callers: a missing hash is read with `async_client` (no thread involved)."""
+        blockhash = self.cached()
+        if blockhash is None:
+            value = (await async_client.get_latest_blockhash()).value
+            self.fetches += 1
+            self.put(value.blockhash, value.last_valid_block_height)
+            blockhash = value.blockhash
+        return blockhash
+
+    def claim(self, blockhash, message) -> bool:
+        """
+        Registers `message` as sent under `blockhash`.
+        Returns False when an identical message was already claimed: the caller must change it before signing.
+        """
+        key, digest = str(blockhash), hashlib.sha256(bytes(message)).digest()
+        with self._sent_lock:
+            sent = self._sent.get(key)
+            if sent is None:
+                sent = self._sent[key] = set()
+                while len(self._sent) > self.SENT_HASHES:
+                    self._sent.popitem(last=False)
+            if digest in sent:
+                return False
+            sent.add(digest)
+            return True
+
+    def invalidate(self):
+        """Drops the stored hash (e.g. the RPC answered "Blockhash not found")."""
+        self._entry = None
+
+    # --- Prefetch ---
+    def _ensure_prefetch(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def _age(self) -> float:
+        entry = self._entry
+        return time.monotonic() - entry[2] if entry else float("inf")
+
+    def _loop(self):
+        while time.monotonic() - self._last_used < self.idle_timeout:
+            wait = self.refresh_interval - self._age()
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            try:
+                with self._fetch_lock:
+                    if self._age() >= self.refresh_interval: # An inline get() may have just read one
+                        self.refresh()
+            except Exception as e:
+                print(f"⚠️ [BlockhashProvider] Background refresh failed: {e}")
+                time.sleep(min(2.0, self.refresh_interval))
@@ -0,0 +1,39 @@
+from typing import Dict, Optional
+from .tokens import TOKEN_ADDRESSES
+from .token_registry import TokenRegistry
+
+# Chain ID -> TOKEN_ADDRESSES key
+CHAIN_NAMES = {
+    1: "ETH",
+    8453: "BASE",
+    137: "POLYGON",
+    42161: "ARBITRUM",
+    56: "BNB",
+    11155111: "SEPOLIA"
+}
+
+class ChainMetadata:
+    """
+    Per-connection chain constants, read once instead of on every payment.
+    Features:
+    - Chain ID: One eth_chainId per connection (read again only after rotate_rpc()).
+    - Derived Locally: Native symbol and the token address map come from the chain id, no RPC.
+    - Tokens: Contracts and decimals come from the shared TokenRegistry (persisted across restarts).
+    """
+
+    def __init__(self, chain_id: int, native_symbol: str, registry: TokenRegistry = None):
+        self.chain_id = chain_id
+        self.chain_name = CHAIN_NAMES.get(chain_id)
+        self.native_symbol = native_symbol
+        self.tokens: Dict[str, str] = TOKEN_ADDRESSES.get(self.chain_name, {}) if self.chain_name else {}
+        self.registry = registry or TokenRegistry.shared()
+
+    def token_address(self, token_symbol: str) -> Optional[str]:
+        return self.tokens.get(token_symbol)
+
+    def token_contract(self, w3, address: str):
+        return self.registry.contract(w3, self.chain_id, address)
+
+    def token_decimals(self, contract) -> int:
+        """Returns decimals() for a web3 contract, calling the chain only the first time."""
+        return self.registry.decimals(contract, self.chain_id)
@@ -0,0 +1,196 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# fetch_statuses(ids) -> {id: True (landed), False (failed on-chain)}; ids still pending are left out.
+# A value may also be (landed, details): details (e.g. gas_used) are merged into the id's meta.
+StatusFetcher = Callable[[List[str]], Dict[str, Any]]
+
+class _Pending:
+    __slots__ = ("future", "callbacks", "meta", "deadline", "ids")
+
+    def __init__(self, tx_id: str, timeout: float, meta: Dict[str, Any]):
+        self.ids = [tx_id] # More than one after replace()
+        self.future = Future()
+        self.callbacks = []
+        self.meta = meta
+        self.deadline = time.time() + timeout
+
+class ConfirmationTracker:
+    """
+    One polling loop for every in-flight payment, instead of one blocking loop per tx.
+    Features:
+    - Batched Polling: All pending ids are checked per round, `max_batch` per RPC call
+      (EVM: JSON-RPC batch of eth_getTransactionReceipt, Solana: get_signature_statuses(list)).
+    - Futures & Callbacks: track() returns a Future resolving to 'CONFIRMED' or 'FAILED';
+      callbacks fire as each one lands. Timeouts raise TimeoutError (the tx may still land later).
+    - Bulk Audit Log: `on_settled` gets every id settled in a round at once (one commit).
+    - On-Demand Thread: The poller starts with the first tracked id and exits when nothing is pending.
+    """
+
+    def __init__(self, fetch_statuses: StatusFetcher, on_settled: Callable[[List[Tuple[str, str, Dict[str, Any]]]], None] = None,
+                 poll_interval: float = 0.5, timeout: float = 120.0, max_batch: int = 256):
+        self.fetch_statuses = fetch_statuses
+        self.on_settled = on_settled
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self._pending: Dict[str, _Pending] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def track(self, tx_id: str, callback: Callable[[str, str], None] = None, timeout: float = None, **meta) -> Future:
+        """
+        Starts watching `tx_id`. `meta` is handed back to on_settled (e.g. recipient/amount/symbol for the audit log).
+        :param callback: Called as callback(tx_id, status) from the poller thread.
+        """
+        with self._lock:
+            entry = self._pending.get(tx_id)
+            if entry is None:
+                entry = _Pending(tx_id, timeout or self.timeout, meta)
+                self._pending[tx_id] = entry
+            if callback:
+                entry.callbacks.append(callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="confirmation-tracker", daemon=True)
+                self._thread.start()
+        return entry.future
+
+    def wait(self, tx_ids: List[str], timeout: float = None) -> Dict[str, str]:
+        """Blocks until every id settles or times out. Returns {id: 'CONFIRMED' | 'FAILED' | 'TIMEOUT'}."""
+        futures = {tx_id: self.track(tx_id, timeout=timeout) for tx_id in tx_ids}
+        statuses = {}
+        for tx_id, future in futures.items():
+            try:
+                statuses[tx_id] = future.result()
+            except TimeoutError:
+                statuses[tx_id] = "TIMEOUT"
+        return statuses
+
+    def replace(self, old_id: str, new_id: str, **meta):
+        """
+        Follows a replacement (same nonce, new hash): the Future of `old_id` resolves when either id lands.
+        `meta` overrides the entry's meta (e.g. a cancel pays 0 to ourselves).
+        """
+        with self._lock:
+            entry = self._pending.get(old_id)
+            if entry is None:
+                return
+            entry.meta.update(meta)
+            entry.ids.append(new_id)
+            self._pending[new_id] = entry
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                ids = list(self._pending)
+            self.poll(ids)
+            time.sleep(self.poll_interval)
+
+    def poll(self, ids: Optional[List[str]] = None):
+        """Runs one polling round (normally called by the background thread)."""
+        if ids is None:
+            with self._lock:
+                ids = list(self._pending)
+        statuses = {}
+        for i in range(0, len(ids), self.max_batch):
+            try:
+                statuses.update(self.fetch_statuses(ids[i:i + self.max_batch]))
+            except Exception:
+                pass # RPC hiccup: retry next round
+
+        now = time.time()
+        settled, expired = [], []
+        with self._lock:
+            for tx_id in ids:
+                entry = self._pending.get(tx_id)
+                if entry is None:
+                    continue
+                tx_id = next((i for i in entry.ids if statuses.get(i) is not None), tx_id) # Whichever version landed
+                ok = statuses.get(tx_id)
+                if isinstance(ok, tuple):
+                    ok, details = ok
+                    entry.meta.update(details)
+                if ok is not None:
+                    settled.append((tx_id, "CONFIRMED" if ok else "FAILED", entry))
+                elif now > entry.deadline:
+                    expired.append((tx_id, entry))
+                else:
+                    continue
+                for alias in entry.ids:
+                    self._pending.pop(alias, None)
+
+        # Log first, so whoever is waiting on a future sees the final status in the DB
+        if settled and self.on_settled:
+            try:
+                self.on_settled([(tx_id, status, entry.meta) for tx_id, status, entry in settled])
+            except Exception as e:
+                print(f"⚠️ [Confirmations] Audit log update failed: {e}")
+        for tx_id, status, entry in settled:
+            entry.future.set_result(status)
+            for callback in entry.callbacks:
+                try:
+                    callback(tx_id, status)
+                except Exception as e:
+                    print(f"⚠️ [Confirmations] Callback error for {tx_id}: {e}")
+        for tx_id, entry in expired:
+            entry.future.set_exception(TimeoutError(f"{tx_id} not confirmed after {self.timeout}s"))
+
+def evm_receipt_statuses(get_w3: Callable[[], Any]) -> StatusFetcher:
+    """
+    Status fetcher for EVM chains. One JSON-RPC batch per call when the provider supports it
+    (HTTPProvider), one eth_getTransactionReceipt per hash otherwise (e.g. the in-process tester).
+    `get_w3` is a callable so RPC rotation is followed. Each receipt's gasUsed is reported as meta["gas_used"].
+    """
+    def fetch(hashes: List[str]) -> Dict[str, Any]:
+        w3 = get_w3()
+        make_batch_request = getattr(w3.provider, "make_batch_request", None)
+        if make_batch_request is not None:
+            try:
+                responses = make_batch_request([("eth_getTransactionReceipt", [h]) for h in hashes])
+            except (NotImplementedError, TypeError, AttributeError):
+                responses = None
+            if isinstance(responses, list):
+                statuses = {}
+                for h, resp in zip(hashes, responses):
+                    receipt = resp.get("result") if isinstance(resp, dict) else None
+                    if receipt:
+                        statuses[h] = (int(receipt.get("status", "0x1"), 16) == 1, {"gas_used": int(receipt.get("gasUsed", "0x0"), 16)})
+                return statuses
+
+        from web3.exceptions import TransactionNotFound
+        statuses = {}
+        for h in hashes:
+            try:
+                receipt = w3.eth.get_transaction_receipt(h)
+            except TransactionNotFound:
+                continue
+            statuses[h] = (receipt.get("status", 1) == 1, {"gas_used": receipt.get("gasUsed", 0)})
+        return statuses
+    return fetch
+
+def solana_signature_statuses(get_client: Callable[[], Any]) -> StatusFetcher:
+    """Status fetcher for Solana: one get_signature_statuses call for the whole batch (max 256)."""
+    def fetch(signatures: List[str]) -> Dict[str, bool]:
+        from solders.signature import Signature
+        from solders.transaction_status import TransactionConfirmationStatus
+        landed = (TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized)
+        resp = get_client().get_signature_statuses([Signature.from_string(str(s)) for s in signatures])
+        statuses = {}
+        for sig, status in zip(signatures, resp.value):
+            if status is None:
+                continue
+            if status.err is not None:
+                statuses[sig] = False
+            elif status.confirmation_status in landed or status.confirmations is None:
+                statuses[sig] = True # confirmations=None means rooted (finalized)
+        return statuses
+    return fetch
@@ -0,0 +1,90 @@
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+GasKey = Tuple[int, str, str, str] # (chain_id, contract, method, "warm" | "cold")
+
+class GasLimitCache:
+    """
+    Gas limits learned from our own receipts, so repeated token transfers skip estimate_gas.
+    Features:
+    - Warm/Cold Keys: (chain_id, contract, method, warm|cold). A recipient we have paid before
+      usually has a balance slot; a first payment writes a fresh one (~20k gas more).
+    - Learned Limits: max(recent gasUsed) + `margin`, served only once `min_samples` receipts
+      agree within `max_spread`. Until then the caller estimates as before.
+    - Fresh-Slot Floor: Every limit covers a warm transfer plus COLD_SLOT_GAS, warm keys included:
+      a "warm" recipient who spent their balance down to zero needs a fresh slot again.
+      Unused gas is refunded, an out-of-gas revert is not.
+    - Accuracy Stats: Over-reserved gas and out-of-gas reverts per key. An out-of-gas revert
+      drops the key's samples, so the next call estimates again.
+    """
+
+    COLD_SLOT_GAS = 20000 # New balance slot (SSTORE 0 -> non-zero) vs. updating an existing one
+
+    def __init__(self, margin: float = 0.10, min_samples: int = 3, max_spread: float = 0.10, window: int = 20):
+        self.margin = margin
+        self.min_samples = min_samples
+        self.max_spread = max_spread
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[GasKey, deque] = {}
+        self._stats: Dict[GasKey, Dict[str, int]] = {}
+        self._warm: Dict[Tuple[int, str], Set[str]] = {}
+
+    def key(self, chain_id: int, contract: str, method: str, recipient: str) -> GasKey:
+        contract = contract.lower()
+        warm = recipient.lower() in self._warm.get((chain_id, contract), ())
+        return chain_id, contract, method, "warm" if warm else "cold"
+
+    def _learned(self, key: GasKey) -> Optional[int]:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        high, low = max(samples), min(samples)
+        if (high - low) / high > self.max_spread:
+            return None # Not confident: usage still varies too much
+        return int(high * (1 + self.margin))
+
+    def _served(self, key: GasKey) -> Optional[int]:
+        limit = self._learned(key)
+        if limit is not None:
+            # Never below a warm transfer plus a fresh slot: cold samples may have come from recipients funded
+            # elsewhere, and a warm recipient's slot may have been zeroed since we last paid them
+            warm = self._learned(key[:3] + ("warm",))
+            if warm is not None:
+                limit = max(limit, warm + self.COLD_SLOT_GAS)
+        return limit
+
+    def limit(self, key: GasKey) -> Optional[int]:
+        """Learned gas limit for `key`, or None when the caller should run estimate_gas."""
+        with self._lock:
+            limit = self._served(key)
+            self._stat(key)["hits" if limit is not None else "misses"] += 1
+            return limit
+
+    def _stat(self, key: GasKey) -> Dict[str, int]:
+        stat = self._stats.get(key)
+        if stat is None:
+            stat = self._stats[key] = {"hits": 0, "misses": 0, "receipts": 0, "over_reserved": 0, "out_of_gas": 0}
+        return stat
+
+    def observe(self, key: GasKey, recipient: str, gas_used: int, gas_limit: int, ok: bool = True):
+        """Records a mined tx. Reverts that used their whole limit count as under-estimates."""
+        with self._lock:
+            stat = self._stat(key)
+            stat["receipts"] += 1
+            if not ok:
+                if gas_used >= gas_limit:
+                    stat["out_of_gas"] += 1
+                    self._samples.pop(key, None)
+                return # Reverts for other reasons say nothing about normal usage
+            stat["over_reserved"] += max(gas_limit - gas_used, 0)
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(gas_used)
+            chain_id, contract = key[0], key[1]
+            self._warm.setdefault((chain_id, contract), set()).add(recipient.lower())
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-key counters: hits/misses (estimate_gas skipped or not), over-reserved gas, out-of-gas reverts."""
+        with self._lock:
+            return [{"chain_id": k[0], "contract": k[1], "method": k[2], "recipient": k[3],
+                     "limit": self._served(k), **v} for k, v in self._stats.items()]
@@ -0,0 +1,160 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Seconds per block, used as the default cache TTL
+BLOCK_TIMES = {
+    "ETH": 12.0,
+    "SEPOLIA": 12.0,
+    "BASE": 2.0,
+    "POLYGON": 2.0,
+    "BNB": 3.0,
+    "ARBITRUM": 0.25
+}
+
+class GasOracle:
+    """
+    EIP-1559 fee estimates from eth_feeHistory, cached for about one block.
+    Features:
+    - One RPC per Block: Base fee and priority-fee percentiles are sampled once per TTL, not per payment.
+    - Background Refresh: A stale (but recent) sample is served at once while a thread re-samples.
+    - Urgency Tiers: "slow" / "normal" / "fast" tip at the 10th / 50th / 90th percentile of recent blocks.
+    - Type-2 Txs: fee_fields() returns maxFeePerGas + maxPriorityFeePerGas (gasPrice on pre-London chains).
+    - Legacy Fallback: Nodes without eth_feeHistory (some BNB / legacy endpoints) are priced from eth_gasPrice.
+    """
+
+    TIERS = {"slow": 10, "normal": 50, "fast": 90}
+    # maxFeePerGas = base fee * headroom + tip. 2x survives six full blocks of base-fee growth.
+    BASE_FEE_HEADROOM = {"slow": 1.25, "normal": 2.0, "fast": 2.0}
+    MIN_PRIORITY_FEE = 1_000_000 # 0.001 Gwei: rollups often report zero tips
+    LEGACY_PREMIUM = 1.10 # Pre-London chains: network gasPrice + 10%
+
+    def __init__(self, get_w3: Callable[[], Any], ttl: float = 2.0, max_stale: float = 30.0, blocks: int = 5):
+        """
+        :param get_w3: Returns the current Web3 / AsyncWeb3 (so rotate_rpc() is picked up).
+        :param ttl: Seconds a sample is fresh (about one block).
+        :param max_stale: Older samples are never served; the caller waits for a new one.
+        :param blocks: Blocks of history per sample.
+        """
+        self.get_w3 = get_w3
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.blocks = blocks
+        self._sample: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._default_tip: Optional[int] = None
+
+    def _parse(self, history, latest_base_fee: Optional[int] = None) -> Dict[str, Any]:
+        """Turns an eth_feeHistory answer into {base_fee, tips: {tier: wei}, at}."""
+        base_fees: List[int] = list(history.get("baseFeePerGas") or [])
+        base_fee = base_fees[-1] if base_fees else latest_base_fee # Last entry is the *next* block
+        tips = {}
+        rewards = [r for r in (history.get("reward") or []) if r and any(r)] # Skip empty blocks
+        for i, tier in enumerate(self.TIERS):
+            column = sorted(r[i] for r in rewards)
+            tips[tier] = column[len(column) // 2] if column else None
+        return {"base_fee": base_fee, "tips": tips, "at": time.monotonic()}
+
+    def _legacy(self, gas_price: int) -> Dict[str, Any]:
+        return {"base_fee": None, "tips": dict.fromkeys(self.TIERS), "gas_price": int(gas_price * self.LEGACY_PREMIUM), "at": time.monotonic()}
+
+    def _fetch(self) -> Dict[str, Any]:
+        w3 = self.get_w3()
+        try:
+            history = w3.eth.fee_history(self.blocks, "latest", list(self.TIERS.values()))
+        except Exception as e:
+            print(f"⚠️ [GasOracle] eth_feeHistory unavailable, using gasPrice: {e}")
+            return self._legacy(w3.eth.gas_price)
+        latest_base_fee = None
+        if not history.get("baseFeePerGas"):
+            latest_base_fee = w3.eth.get_block("latest").get("baseFeePerGas")
+        sample = self._parse(history, latest_base_fee)
+        if sample["base_fee"] is None:
+            sample["gas_price"] = int(w3.eth.gas_price * self.LEGACY_PREMIUM)
+        elif not all(sample["tips"].values()) and self._default_tip is None:
+            self._default_tip = w3.eth.max_priority_fee # Once per oracle: idle chains have no tip history
+        return sample
+
+    async def _fetch_async(self) -> Dict[str, Any]:
+        w3 = self.get_w3()
+        try:
+            history = await w3.eth.fee_history(self.blocks, "latest", list(self.TIERS.values()))
+        except Exception as e:
+            print(f"⚠️ [GasOracle] eth_feeHistory unavailable, using gasPrice: {e}")
+            return self._legacy(await w3.eth.gas_price)
+        latest_base_fee = None
+        if not history.get("baseFeePerGas"):
+            latest_base_fee = (await w3.eth.get_block("latest")).get("baseFeePerGas")
+        sample = self._parse(history, latest_base_fee)
+        if sample["base_fee"] is None:
+            sample["gas_price"] = int(await w3.eth.gas_price * self.LEGACY_PREMIUM)
+        elif not all(sample["tips"].values()) and self._default_tip is None:
+            self._default_tip = await w3.eth.max_priority_fee
+        return sample
+
+    def refresh(self) -> Dict[str, Any]:
+        """Samples the chain now."""
+        sample = self._fetch()
+        self._sample = sample
+        return sample
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ [GasOracle] Background refresh failed: {e}")
+            finally:
+                self._refreshing = False
+        threading.Thread(target=run, daemon=True).start()
+
+    def _current(self) -> Dict[str, Any]:
+        sample = self._sample
+        age = time.monotonic() - sample["at"] if sample else None
+        if sample is None or age > self.max_stale:
+            return self.refresh()
+        if age > self.ttl:
+            self._refresh_in_background()
+        return sample
+
+    def invalidate(self):
+        """Drops the sample (e.g. after switching networks)."""
+        self._sample = None
+        self._default_tip = None
+
+    def _fields(self, sample: Dict[str, Any], urgency: str) -> Dict[str, int]:
+        if urgency not in self.TIERS:
+            raise ValueError(f"Unknown urgency '{urgency}'. Use one of: {', '.join(self.TIERS)}")
+        if sample["base_fee"] is None:
+            return {"gasPrice": sample["gas_price"]}
+        tip = max(sample["tips"][urgency] or self._default_tip or 0, self.MIN_PRIORITY_FEE)
+        return {
+            "maxFeePerGas": int(sample["base_fee"] * self.BASE_FEE_HEADROOM[urgency]) + tip,
+            "maxPriorityFeePerGas": tip
+        }
+
+    def fee_fields(self, urgency: str = "normal") -> Dict[str, int]:
+        """Fee fields for a transaction dict (type-2 where the chain supports it)."""
+        return self._fields(self._current(), urgency)
+
+    async def fee_fields_async(self, urgency: str = "normal") -> Dict[str, int]:
+        """fee_fields() for AsyncWeb3: a stale sample is re-read inline (one await per block)."""
+        sample = self._sample
+        if sample is None or time.monotonic() - sample["at"] > self.ttl:
+            sample = self._sample = await self._fetch_async()
+        return self._fields(sample, urgency)
+
+    def expected_price(self, fields: Dict[str, int]) -> int:
+        """Per-gas price the tx is expected to pay (base fee + tip, capped by maxFeePerGas), for guardrails and logs."""
+        if "gasPrice" in fields:
+            return fields["gasPrice"]
+        base_fee = self._sample["base_fee"] if self._sample else None
+        if base_fee is None:
+            return fields["maxFeePerGas"]
+        return min(fields["maxFeePerGas"], base_fee + fields["maxPriorityFeePerGas"])
@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+class LicenseManager:
+    """
+    Trial / subscription state, computed in the background and read from memory on every payment.
+    Features:
+    - Snapshot: Trial start, trial length, PRO subscription result and the current fees, computed together.
+    - Background Refresher: A daemon thread recomputes the snapshot every `refresh_interval` seconds
+      (price APIs, trial registry, audit-log scan, subscription lookup). Payments never wait on it.
+    - Trial Start Once: The first-transaction timestamp is looked up until found, then kept.
+    - Fail Soft: A failed refresh keeps the previous snapshot. Without one, reads retry inline.
+    """
+
+    def __init__(self, get_config: Callable[[], Dict[str, Any]], first_tx_time: Callable[[], Optional[float]],
+                 verify_subscription: Callable[[Dict[str, Any]], bool] = None, refresh_interval: float = 300.0):
+        """
+        :param get_config: Pricing config source (PricingManager.get_config).
+        :param first_tx_time: Trial start lookup (None for a new user).
+        :param verify_subscription: PRO check against the config (None: no subscriptions on this agent).
+        """
+        self.get_config = get_config
+        self.first_tx_time = first_tx_time
+        self.verify_subscription = verify_subscription
+        self.refresh_interval = refresh_interval
+        self._state: Optional[Dict[str, Any]] = None
+        self._trial_start: Optional[float] = None
+        self._lock = threading.Lock() # One refresh at a time
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Computes the first snapshot and keeps it fresh, on a daemon thread (idempotent; no-op after stop())."""
+        if self._thread is not None or self._stop.is_set():
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="license-refresh", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Ends the refresher. Later reads keep the last snapshot (or compute one inline)."""
+        self._stop.set()
+
+    def _loop(self):
+        while True:
+            self.refresh()
+            if self._stop.wait(self.refresh_interval):
+                return
+
+    def refresh(self) -> Dict[str, Any]:
+        """Recomputes the snapshot now (network / disk / DB). Normally run by the refresher thread."""
+        with self._lock:
+            try:
+                config = self.get_config()
+                if self._trial_start is None:
+                    self._trial_start = self.first_tx_time()
+                pro = bool(self.verify_subscription(config)) if self.verify_subscription and self._trial_start else False
+                self._state = {
+                    "trial_start": self._trial_start,
+                    "trial_days": config.get("trial_days", 60),
+                    "pro": pro,
+                    "fee_eth": config.get("pay_per_use_price_eth"),
+                    "subscription_price_eth": config.get("subscription_price_eth"),
+                    "updated": time.time()
+                }
+            except Exception as e:
+                print(f"⚠️ [License] Refresh failed, keeping the previous state: {e}")
+            finally:
+                self._ready.set()
+            return self._state
+
+    @property
+    def ready(self) -> bool:
+        return self._state is not None
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """
+        The snapshot. Computed inline only while there is none yet: before the refresher has finished once,
+        or after every refresh so far failed (None would read as a brand-new user and skip the license rules).
+        """
+        if self._state is None:
+            if self._thread is not None:
+                self._ready.wait(timeout=30)
+            if self._state is None:
+                return self.refresh()
+        return self._state
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot plus days active / remaining as of now."""
+        state = dict(self.current() or {})
+        if state.get("trial_start"):
+            days_active = (time.time() - state["trial_start"]) / 86400
+            state.update(days_active=days_active, days_remaining=state["trial_days"] - days_active)
+        return state
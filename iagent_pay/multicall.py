@@ -0,0 +1,49 @@
+from typing import List, Optional, Sequence, Tuple
+
+# Multicall3 is deployed at the same address on every major EVM chain (https://www.multicall3.com)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# Function selectors (calldata is encoded by hand: no contract objects per token)
+AGGREGATE3 = bytes.fromhex("82ad56cb")      # aggregate3((address,bool,bytes)[])
+GET_ETH_BALANCE = bytes.fromhex("4d2301cc") # getEthBalance(address)
+BALANCE_OF = bytes.fromhex("70a08231")      # balanceOf(address)
+DECIMALS = bytes.fromhex("313ce567")        # decimals()
+
+Call = Tuple[str, bytes] # (target, calldata)
+
+def address_call(selector: bytes, address: str) -> bytes:
+    from eth_abi import encode
+    return selector + encode(["address"], [address])
+
+def decode_uint(data: Optional[bytes]) -> Optional[int]:
+    """uint256 return value, or None for a failed / empty call."""
+    if not data or len(data) < 32:
+        return None
+    return int.from_bytes(data[:32], "big")
+
+class Multicall:
+    """
+    Multicall3 client: many view calls in a single eth_call.
+    Features:
+    - aggregate3: Every call is allowFailure=True, so one bad token answers None instead of failing the batch.
+    - Chunking: Batches above `max_calls` are split (nodes cap eth_call gas).
+    - Not Deployed: An empty answer (no code at `address`) raises ValueError, so callers can fall back.
+    """
+
+    def __init__(self, w3, address: str = MULTICALL3_ADDRESS, max_calls: int = 500):
+        self.w3 = w3
+        self.address = w3.to_checksum_address(address)
+        self.max_calls = max_calls
+
+    def aggregate3(self, calls: Sequence[Call]) -> List[Optional[bytes]]:
+        """Runs `calls` and returns each call's return data (None where it reverted)."""
+        from eth_abi import decode, encode
+        results: List[Optional[bytes]] = []
+        for start in range(0, len(calls), self.max_calls):
+            chunk = [(target, True, data) for target, data in calls[start:start + self.max_calls]]
+            raw = self.w3.eth.call({"to": self.address, "data": AGGREGATE3 + encode(["(address,bool,bytes)[]"], [chunk])})
+            if not raw:
+                raise ValueError(f"Multicall3 not deployed at {self.address}")
+            (answers,) = decode(["(bool,bytes)[]"], bytes(raw))
+            results.extend(data if ok else None for ok, data in answers)
+        return results
@@ -0,0 +1,235 @@
+import heapq
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+def is_already_known(error: Exception) -> bool:
+    """The node already holds this exact tx (e.g. a hedged send reached it twice): a successful broadcast."""
+    msg = str(error).lower()
+    return "already known" in msg or "already imported" in msg
+
+class NonceManager:
+    """
+    Per-(chain, address) nonce allocator shared by every AgentPay in the process.
+    Features:
+    - Hot Path: reserve() is a counter bump under a tiny lock; the network is only read on first use.
+    - Release: A reserved nonce that was never broadcast goes back to a gap pool and is re-issued first.
+    - Gap Recovery: resync() compares eth_getTransactionCount('pending') with what we issued and
+      refills nonces that were dropped from the mempool, so later txs are not stuck behind a hole.
+      A broadcast nonce is only re-issued once it is neither mined ('latest' count) nor known to the node
+      by tx hash: another node or mempool may still carry it, and re-using it would replace that payment.
+    - Already Known: A send the node answers with "already known" (e.g. a hedged duplicate) counts as broadcast.
+    - Background Resync: A daemon thread reconciles with the network every `resync_interval` seconds.
+      It ends once the agent behind the fetch callables is garbage-collected (they hold weak proxies).
+    """
+
+    _registry: Dict[Tuple[str, str], "NonceManager"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, fetch_pending_count: Optional[Callable[[], int]], resync_interval: float = 30.0, lost_after: float = 60.0,
+                 fetch_mined_count: Optional[Callable[[], int]] = None, tx_known: Optional[Callable[[str], bool]] = None):
+        """
+        :param fetch_pending_count: Returns the network 'pending' transaction count for the address.
+            None for asyncio callers, which await the count themselves and pass it to observe().
+        :param lost_after: Seconds a broadcast nonce may be missing from the node's pool before it is checked as dropped.
+        :param fetch_mined_count: Returns the 'latest' (mined) transaction count for the address.
+        :param tx_known: Returns True if the node still knows a tx hash (pending or mined).
+            Without both, resync() never re-issues a broadcast nonce (asyncio callers use confirm_lost()).
+        """
+        self.fetch_pending_count = fetch_pending_count
+        self.fetch_mined_count = fetch_mined_count
+        self.tx_known = tx_known
+        self.resync_interval = resync_interval
+        self.lost_after = lost_after
+        self._lock = threading.Lock()
+        self._next: Optional[int] = None
+        self._gaps: List[int] = []      # heap (lazy deletion, see _gap_set)
+        self._gap_set = set()
+        self._reserved = set()          # handed out, not broadcast yet
+        self._broadcast: Dict[int, Tuple[float, Optional[str]]] = {} # nonce -> (time it was sent, tx hash)
+        self._mined = 0                 # highest 'latest' count seen (a lagging node's pending count can be lower)
+        self._resync_thread = None
+
+    @classmethod
+    def for_account(cls, chain_key: str, address: str, fetch_pending_count: Optional[Callable[[], int]], **kwargs) -> "NonceManager":
+        """Returns the process-wide manager for (chain, address), creating it on first use."""
+        key = (chain_key, address.lower())
+        with cls._registry_lock:
+            manager = cls._registry.get(key)
+            if manager is None:
+                manager = cls(fetch_pending_count, **kwargs)
+                cls._registry[key] = manager
+            elif fetch_pending_count is not None:
+                manager.fetch_pending_count = fetch_pending_count # Follow the caller's current connection
+                for name in ("fetch_mined_count", "tx_known"):
+                    if kwargs.get(name) is not None:
+                        setattr(manager, name, kwargs[name])
+            return manager
+
+    # --- Allocation ---
+    @property
+    def synced(self) -> bool:
+        """False until the first network count is known."""
+        return self._next is not None
+
+    def _ensure_synced(self):
+        if self._next is None:
+            if self.fetch_pending_count is None:
+                raise RuntimeError("NonceManager has no network count yet: call observe() first.")
+            self._next = self.fetch_pending_count()
+
+    def _pop_gap(self) -> Optional[int]:
+        while self._gaps:
+            n = heapq.heappop(self._gaps)
+            if n in self._gap_set:
+                self._gap_set.discard(n)
+                return n
+        return None
+
+    def peek(self) -> int:
+        """Returns the nonce the next reserve() would hand out (without reserving it)."""
+        with self._lock:
+            self._ensure_synced()
+            while self._gaps and self._gaps[0] not in self._gap_set:
+                heapq.heappop(self._gaps)
+            return self._gaps[0] if self._gaps else self._next
+
+    def reserve(self) -> int:
+        """Atomically reserves a nonce (lowest known gap first)."""
+        with self._lock:
+            self._ensure_synced()
+            n = self._pop_gap()
+            if n is None:
+                n = self._next
+                self._next += 1
+            self._reserved.add(n)
+        self._start_background_resync()
+        return n
+
+    def reserve_many(self, count: int) -> List[int]:
+        """Reserves `count` consecutive nonces (batch sends must not interleave with gaps)."""
+        with self._lock:
+            self._ensure_synced()
+            start = self._next
+            self._next += count
+            nonces = list(range(start, start + count))
+            self._reserved.update(nonces)
+        self._start_background_resync()
+        return nonces
+
+    def mark_broadcast(self, nonce: int, tx_hash: Optional[str] = None):
+        """Records that the tx carrying `nonce` reached the node (again after a replacement: the new hash)."""
+        with self._lock:
+            self._reserved.discard(nonce)
+            self._broadcast[nonce] = (time.time(), tx_hash)
+
+    def release(self, nonce: int):
+        """Returns a nonce that was reserved but never broadcast."""
+        with self._lock:
+            self._reserved.discard(nonce)
+            if nonce in self._broadcast or nonce in self._gap_set:
+                return
+            if nonce == self._next - 1:
+                self._next -= 1
+                # Collapse trailing gaps so the counter doesn't skip ahead of the network
+                while self._next - 1 in self._gap_set:
+                    self._gap_set.discard(self._next - 1)
+                    self._next -= 1
+            else:
+                self._gap_set.add(nonce)
+                heapq.heappush(self._gaps, nonce)
+
+    def fail(self, nonce: int, error: Exception, tx_hash: Optional[str] = None) -> bool:
+        """
+        Handles a send error: stale-nonce errors trigger a resync, anything else releases the nonce.
+        "already known" is not an error: the tx is in the pool, so the nonce is kept as broadcast.
+        Returns True for stale-nonce errors (callers without a fetch callable resync via observe()).
+        """
+        if is_already_known(error):
+            self.mark_broadcast(nonce, tx_hash)
+            return False
+        msg = str(error).lower()
+        if "nonce too low" in msg or "nonce has already been used" in msg:
+            with self._lock:
+                self._reserved.discard(nonce)
+            if self.fetch_pending_count is not None:
+                self.resync()
+            return True
+        self.release(nonce)
+        return False
+
+    # --- Reconciliation ---
+    def resync(self) -> int:
+        """Reconciles local state with the network. Returns the network pending count."""
+        network = self.observe(self.fetch_pending_count()) # Outside the lock: never block reserve() on RPC
+        if self.fetch_mined_count is not None and self.tx_known is not None:
+            candidates = self.lost_candidates()
+            if candidates:
+                mined = self.fetch_mined_count()
+                for nonce, tx_hash in candidates:
+                    self.confirm_lost(nonce, mined, nonce >= mined and tx_hash is not None and self.tx_known(tx_hash))
+        return network
+
+    def observe(self, network: int) -> int:
+        """Reconciles local state with a pending count the caller already fetched."""
+        with self._lock:
+            if self._next is None or network > self._next:
+                self._next = network
+            network = max(network, self._mined)
+            # Mined (or replaced) nonces no longer need tracking
+            self._broadcast = {n: sent for n, sent in self._broadcast.items() if n >= network}
+            self._gap_set = {n for n in self._gap_set if n >= network}
+            # Anything between the network count and our counter that nobody holds is a hole.
+            # Broadcast nonces are not: the pending count of one node does not prove a tx is gone (see confirm_lost()).
+            for n in range(network, self._next):
+                if n in self._reserved or n in self._gap_set or n in self._broadcast:
+                    continue
+                self._gap_set.add(n)
+                heapq.heappush(self._gaps, n)
+        return network
+
+    def lost_candidates(self) -> List[Tuple[int, Optional[str]]]:
+        """Broadcast nonces still unmined `lost_after` seconds after their send: [(nonce, tx_hash)] to check with confirm_lost()."""
+        now = time.time()
+        with self._lock:
+            return sorted((n, tx_hash) for n, (sent_at, tx_hash) in self._broadcast.items() if now - sent_at >= self.lost_after)
+
+    def confirm_lost(self, nonce: int, mined: int, tx_found: bool) -> bool:
+        """
+        Re-issues a broadcast nonce whose tx is gone: not mined (`mined` = 'latest' count) and not found by hash.
+        A nonce whose tx hash was never recorded is kept (it cannot be checked). Returns True if re-issued.
+        """
+        with self._lock:
+            self._mined = max(self._mined, mined)
+            sent = self._broadcast.get(nonce)
+            if sent is None:
+                return False
+            if nonce < mined:
+                del self._broadcast[nonce]
+                return False
+            if tx_found or sent[1] is None:
+                return False
+            del self._broadcast[nonce]
+            self._gap_set.add(nonce)
+            heapq.heappush(self._gaps, nonce)
+            return True
+
+    def _start_background_resync(self):
+        if self._resync_thread is not None or not self.resync_interval or self.fetch_pending_count is None:
+            return
+        with self._lock:
+            if self._resync_thread is not None:
+                return
+            self._resync_thread = threading.Thread(target=self._resync_loop, name="nonce-resync", daemon=True)
+        self._resync_thread.start()
+
+    def _resync_loop(self):
+        while True:
+            time.sleep(self.resync_interval)
+            try:
+                self.resync()
+            except ReferenceError:
+                self._resync_thread = None
+                return # The agent behind the fetch callables is gone
+            except Exception:
+                pass # RPC hiccup: try again next round
@@ -0,0 +1,254 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from typing import Any, Dict, List, Optional, Tuple
+from .nonce_manager import is_already_known
+
+def _sign_chunk(private_key: bytes, txs: List[Dict[str, Any]]) -> List[bytes]:
+    """Worker-process entry point: ECDSA-signs a chunk of txs (module level so it pickles)."""
+    from eth_account import Account
+    return [bytes(Account.sign_transaction(tx, private_key).raw_transaction) for tx in txs]
+
+class _Payment:
+    __slots__ = ("recipient", "amount", "token", "future")
+
+    def __init__(self, recipient: str, amount: float, token: str):
+        self.recipient = recipient
+        self.amount = amount
+        self.token = token
+        self.future = Future()
+
+class PaymentQueue:
+    """
+    Pre-signing pipeline for bursty EVM payment traffic (thousands of micropayments).
+    Features:
+    - Enqueue: submit() validates and returns a Future at once (resolves to the tx hash once broadcast).
+    - Assembler: Groups queued payments into chunks, builds the txs with cached fees and
+      reserves consecutive nonces per chunk.
+    - Signing Pool: Chunks are signed in worker processes (ECDSA is CPU-bound), so signing
+      the next chunk overlaps broadcasting the previous one.
+    - Broadcaster: A separate thread ships raw txs in nonce order as soon as their chunk is signed,
+      then logs the chunk in one commit and hands every tx to the ReplacementManager.
+    """
+
+    def __init__(self, agent, workers: int = None, chunk_size: int = 64, linger: float = 0.005, use_processes: bool = True,
+                 broadcasters: int = 8):
+        """
+        :param workers: Signing workers (default: CPU count).
+        :param broadcasters: Concurrent sends per chunk (the in-process tester only accepts the next nonce, so it gets one).
+        :param chunk_size: Payments per nonce reservation / signing task.
+        :param linger: Seconds the assembler waits for more payments before cutting a partial chunk.
+        :param use_processes: False signs on threads (no worker start-up cost; for small volumes).
+        """
+        if agent.is_solana:
+            raise ValueError("PaymentQueue is EVM-only (Solana transfers are signed by the driver).")
+        self.agent = agent
+        self.chunk_size = chunk_size
+        self.linger = linger
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._signers = pool(max_workers=workers)
+        self._senders = ThreadPoolExecutor(max_workers=broadcasters if agent.rpc_pool else 1)
+        self._intake: "queue.Queue[Optional[_Payment]]" = queue.Queue()
+        self._signed: "queue.Queue[Optional[Tuple[list, list, Future]]]" = queue.Queue(maxsize=max(2, (workers or 4) * 2))
+        self._outstanding = set()
+        self._inflight_native = 0.0 # Submitted but not logged yet: counts against the daily limit
+        self._lock = threading.Lock()
+        self._estimates: Dict[str, int] = {}
+        self._closed = False
+        self._assembler = threading.Thread(target=self._assemble_loop, name="payment-assembler", daemon=True)
+        self._broadcaster = threading.Thread(target=self._broadcast_loop, name="payment-broadcaster", daemon=True)
+        self._assembler.start()
+        self._broadcaster.start()
+
+    # --- Intake ---
+    def submit(self, recipient: str, amount: float, token: str = None) -> Future:
+        """Queues one payment. Raises at once for bad recipients, unknown tokens or limit breaches."""
+        if self._closed:
+            raise RuntimeError("PaymentQueue is closed.")
+        agent = self.agent
+        resolved = agent.social.resolve(recipient)
+        if not resolved:
+            raise ValueError(f"Could not resolve social handle: {recipient}")
+        if not agent.w3.is_address(resolved):
+            raise ValueError(f"Invalid recipient address: {resolved}")
+        native_symbol = agent._native_symbol()
+        token = (token or native_symbol).upper()
+        if token == native_symbol:
+            with self._lock:
+                agent._check_license(amount)
+                agent._check_daily_limit(self._inflight_native + amount, native_symbol)
+                self._inflight_native += amount
+        elif not agent._resolve_token_address(token):
+            raise ValueError(f"Token {token} not supported on this chain.")
+
+        payment = _Payment(resolved, float(amount), token)
+        with self._lock:
+            self._outstanding.add(payment.future)
+        payment.future.add_done_callback(self._discard)
+        self._intake.put(payment)
+        return payment.future
+
+    def _discard(self, future: Future):
+        with self._lock:
+            self._outstanding.discard(future)
+
+    def join(self, timeout: float = None) -> bool:
+        """Waits until every payment submitted so far is broadcast (or failed). False on timeout."""
+        with self._lock:
+            pending = list(self._outstanding)
+        _, not_done = wait_futures(pending, timeout=timeout)
+        return not not_done
+
+    def close(self, wait: bool = True):
+        """Stops accepting payments; with `wait`, drains the queue first."""
+        if self._closed:
+            return
+        self._closed = True
+        self._intake.put(None)
+        if wait:
+            self._assembler.join()
+            self._broadcaster.join()
+        self._signers.shutdown(wait=wait)
+        self._senders.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # --- Assembler ---
+    def _next_chunk(self) -> Tuple[List[_Payment], bool]:
+        """Blocks for the first payment, then lingers briefly to fill the chunk."""
+        first = self._intake.get()
+        if first is None:
+            return [], True
+        chunk = [first]
+        deadline = time.monotonic() + self.linger
+        while len(chunk) < self.chunk_size:
+            try:
+                item = self._intake.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                return chunk, True
+            chunk.append(item)
+        return chunk, False
+
+    def _build(self, payment: _Payment, fees: Dict[str, int], chain_id: int) -> Dict[str, Any]:
+        agent = self.agent
+        if payment.token == agent._native_symbol():
+            return {'to': payment.recipient, 'value': agent.w3.to_wei(payment.amount, 'ether'), 'gas': 21000,
+                    'chainId': chain_id, **fees}
+        token_address = agent._resolve_token_address(payment.token)
+        contract = agent.chain.token_contract(agent.w3, token_address)
+        units = int(payment.amount * (10 ** agent.chain.token_decimals(contract)))
+        transfer = contract.functions.transfer(payment.recipient, units)
+        gas_key = agent.gas_limits.key(chain_id, token_address, "transfer", payment.recipient)
+        limit_gas = agent.gas_limits.limit(gas_key)
+        if limit_gas is None:
+            if payment.token not in self._estimates: # One estimate per token, cold-recipient headroom included
+                try:
+                    self._estimates[payment.token] = int(transfer.estimate_gas({'from': agent.my_address}) * 1.2) + 25000
+                except Exception:
+                    self._estimates[payment.token] = 100000 # Fallback safe limit
+            limit_gas = self._estimates[payment.token]
+        return transfer.build_transaction({'chainId': chain_id, 'gas': limit_gas, 'nonce': 0, **fees})
+
+    def _assemble_loop(self):
+        key = bytes(self.agent.wallet.key)
+        try:
+            while True:
+                chunk, stop = self._next_chunk()
+                if chunk:
+                    self._assemble(chunk, key)
+                if stop:
+                    return
+        finally:
+            self._signed.put(None) # Whatever happened, the broadcaster (and close()) must be able to finish
+
+    def _assemble(self, chunk: List[_Payment], key: bytes):
+        """Builds, reserves nonces for and queues one chunk. Errors fail the chunk, never the assembler thread."""
+        try:
+            fees = self.agent.gas.fee_fields()
+            chain_id = self.agent.chain.chain_id
+        except Exception as e:
+            for payment in chunk:
+                self._fail(payment, e)
+            return
+        built = []
+        for payment in chunk:
+            try:
+                built.append((payment, self._build(payment, fees, chain_id)))
+            except Exception as e:
+                self._fail(payment, e)
+        if not built:
+            return
+        nonces = []
+        try:
+            nonces = self.agent.nonce_manager.reserve_many(len(built)) # May resync over the network
+            txs = []
+            for (_, tx), nonce in zip(built, nonces):
+                tx['nonce'] = nonce
+                txs.append(tx)
+            signing = self._signers.submit(_sign_chunk, key, txs) # BrokenProcessPool / RuntimeError after shutdown
+        except Exception as e:
+            for nonce in reversed(nonces): # Never signed: hand them back (highest first, so the counter rewinds)
+                self.agent.nonce_manager.release(nonce)
+            for payment, _ in built:
+                self._fail(payment, e)
+            return
+        self._signed.put(([p for p, _ in built], txs, signing))
+
+    # --- Broadcaster ---
+    def _fail(self, payment: _Payment, error: Exception):
+        if payment.token == self.agent._native_symbol():
+            with self._lock:
+                self._inflight_native -= payment.amount
+        payment.future.set_exception(error)
+
+    def _broadcast_loop(self):
+        agent = self.agent
+        while True:
+            item = self._signed.get()
+            if item is None:
+                return
+            payments, txs, signing = item
+            try:
+                raws = signing.result()
+            except Exception as e:
+                for tx in reversed(txs): # Never broadcast: hand the nonces back (highest first, so the counter rewinds)
+                    agent.nonce_manager.release(tx['nonce'])
+                for payment in payments:
+                    self._fail(payment, e)
+                continue
+
+            def send(raw):
+                try:
+                    return agent.w3.to_hex(agent.w3.eth.send_raw_transaction(raw))
+                except Exception as e:
+                    if is_already_known(e): # Already in the pool: that is our tx
+                        return agent.w3.to_hex(agent.w3.keccak(raw))
+                    return e
+
+            sent = []
+            for payment, tx, result in zip(payments, txs, self._senders.map(send, raws)):
+                if isinstance(result, Exception):
+                    agent.nonce_manager.fail(tx['nonce'], result)
+                    self._fail(payment, result)
+                    continue
+                agent.nonce_manager.mark_broadcast(tx['nonce'], result)
+                sent.append((payment, tx, result))
+
+            if sent:
+                native = sum(p.amount for p, _, _ in sent if p.token == agent._native_symbol())
+                with self._lock: # Atomic for submit(): the spend ledger takes over what leaves the in-flight total
+                    try:
+                        agent._log_transactions([(h, p.recipient, p.amount, "SENT", p.token) for p, _, h in sent])
+                    except Exception as e:
+                        print(f"⚠️ [PaymentQueue] Audit log write failed: {e}")
+                    self._inflight_native -= native
+                for payment, tx, tx_hash in sent:
+                    agent.replacements.watch(tx, tx_hash, recipient=payment.recipient, amount=payment.amount, symbol=payment.token)
+                    payment.future.set_result(tx_hash)
@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from typing import Callable, Dict, List, Optional, Tuple
+
+# CoinGecko ids for the symbols we price (natives + common stablecoins)
+COINGECKO_IDS = {
+    "ETH": "ethereum", "SOL": "solana", "MATIC": "matic-network", "BNB": "binancecoin",
+    "USDC": "usd-coin", "USDT": "tether", "DAI": "dai"
+}
+
+def price_sources(symbol: str) -> List[Tuple[str, Callable[[dict], float]]]:
+    """USD REST sources for `symbol`: (url, parser)."""
+    symbol = symbol.upper()
+    sources = []
+    gecko_id = COINGECKO_IDS.get(symbol)
+    if gecko_id:
+        sources.append((f"https://api.coingecko.com/api/v3/simple/price?ids={gecko_id}&vs_currencies=usd",
+                        lambda d, i=gecko_id: d[i]['usd']))                                      # 1. CoinGecko
+    sources.append((f"https://api.coinbase.com/v2/prices/{symbol}-USD/spot", lambda d: d['data']['amount'])) # 2. Coinbase
+    sources.append((f"https://api.binance.us/api/v3/ticker/price?symbol={symbol}USD", lambda d: d['price']))  # 3. Binance (US)
+    return sources
+
+class PriceOracle:
+    """
+    USD prices per symbol (ETH, SOL, MATIC, BNB, tokens) from several REST sources.
+    Features:
+    - Concurrent Sources: Every source is queried at once; dead APIs cost one `timeout`, not one each.
+    - Median: The answer is the median of the sources that replied.
+    - TTL Cache: Prices younger than `ttl` come from memory. Between `ttl` and `max_stale` the cached
+      price is returned at once and refreshed in the background.
+    - Max Staleness: Past `max_stale` the caller waits for a fresh fetch. If every source fails,
+      `fallback(symbol)` answers (never cached, so the next call tries the sources again).
+    """
+
+    def __init__(self, fallback: Callable[[str], float] = None, ttl: float = 60.0, max_stale: float = 600.0,
+                 timeout: float = 2.0):
+        self.fallback = fallback
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.timeout = timeout
+        self._prices: Dict[str, Tuple[float, float]] = {} # symbol -> (price, fetched_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="price-oracle")
+        return self._pool
+
+    def _query(self, url: str, parse: Callable[[dict], float]) -> float:
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return float(parse(json.loads(response.read().decode())))
+
+    @staticmethod
+    def median(prices: List[float]) -> float:
+        prices = sorted(prices)
+        return prices[len(prices) // 2]
+
+    def fetch(self, symbol: str) -> Optional[float]:
+        """Live median over every source (cached on success). None if no source answered."""
+        symbol = symbol.upper()
+        pool = self._executor()
+        futures = [pool.submit(self._query, url, parse) for url, parse in price_sources(symbol)]
+        done, _ = wait_futures(futures, timeout=self.timeout)
+        prices = [f.result() for f in done if f.exception() is None]
+        if not prices:
+            return None
+        return self.put(symbol, self.median(prices))
+
+    def put(self, symbol: str, price: float) -> float:
+        """Stores a price fetched elsewhere (e.g. the aiohttp path)."""
+        self._prices[symbol.upper()] = (price, time.time())
+        return price
+
+    def cached(self, symbol: str) -> Optional[float]:
+        """Cached price if within max_stale (a background refresh starts past ttl), else None."""
+        symbol = symbol.upper()
+        entry = self._prices.get(symbol)
+        if entry is None:
+            return None
+        price, fetched_at = entry
+        age = time.time() - fetched_at
+        if age >= self.max_stale:
+            return None
+        if age >= self.ttl:
+            self._refresh_background(symbol)
+        return price
+
+    def _refresh_background(self, symbol: str):
+        with self._lock:
+            if symbol in self._refreshing:
+                return
+            self._refreshing.add(symbol)
+
+        def run():
+            try:
+                self.fetch(symbol)
+            except Exception:
+                pass # Keep serving the cached price until max_stale
+            finally:
+                with self._lock:
+                    self._refreshing.discard(symbol)
+        threading.Thread(target=run, name=f"price-refresh-{symbol}", daemon=True).start()
+
+    def get(self, symbol: str) -> float:
+        """USD price of `symbol`: cached when possible, live otherwise, fallback as a last resort."""
+        price = self.cached(symbol)
+        if price is None:
+            price = self.fetch(symbol)
+        if price is None:
+            if self.fallback is None:
+                raise ValueError(f"No price source answered for {symbol}")
+            price = self.fallback(symbol.upper())
+        return price
+
+    def invalidate(self, symbol: str = None):
+        if symbol is None:
+            self._prices.clear()
+        else:
+            self._prices.pop(symbol.upper(), None)
@@ -1,8 +1,8 @@
 import time
 import json
 import os
-import urllib.request
 from typing import Dict, Any
+from .price_oracle import PriceOracle, price_sources
 
 class PricingManager:
     """
@@ -12,6 +12,7 @@ class PricingManager:
     - Caching (TTL): Caches config locally for X seconds to avoid spamming the server.
     - Auto-Refresh: If cache expires, refetches automatically on next call.
     - Fallback: Uses default/local config if internet fails.
+    - Prices: Cached, concurrently fetched USD prices per symbol (see price_oracle.py).
     """
     
     DEFAULT_CONFIG = {
@@ -21,51 +22,64 @@ class PricingManager:
         "active": True
     }
     
-    def __init__(self, config_url: str = None, cache_ttl_seconds: int = 300):
+    # ETH/USD REST sources: (url, parser)
+    ETH_PRICE_SOURCES = price_sources("ETH")
+
+    def __init__(self, config_url: str = None, cache_ttl_seconds: int = 300, price_ttl: float = 60.0, price_max_stale: float = 600.0):
         self.config_url = config_url
         self.cache_ttl = cache_ttl_seconds
         self.last_updated = 0
         self.cached_config = self.DEFAULT_CONFIG.copy()
+        self.oracle = PriceOracle(fallback=self._fetch_onchain_fallback, ttl=price_ttl, max_stale=price_max_stale)
         
         # For testing purposes, we can override with a local file path
         self.local_override_path = "pricing_config.json"
 
     def get_eth_price(self) -> float:
         """
-        Fetches ETH price from 3 REST sources. 
+        Fetches ETH price live from 3 REST sources, queried concurrently (refreshes the cache).
         If ALL fail, uses an On-Chain fallback (Self-Healing v3.6).
         """
-        prices = []
-        
-        # 1. CoinGecko
-        try:
-            url = "https://api.coingecko.com/api/v3/simple/price?ids=ethereum&vs_currencies=usd"
-            with urllib.request.urlopen(url, timeout=2) as response:
-                data = json.loads(response.read().decode())
-                prices.append(float(data['ethereum']['usd']))
-        except: pass
+        price = self.oracle.fetch("ETH")
+        return price if price is not None else self._fetch_onchain_fallback("ETH")
 
-        # 2. Coinbase
-        try:
-            url = "https://api.coinbase.com/v2/prices/ETH-USD/spot"
-            with urllib.request.urlopen(url, timeout=2) as response:
-                data = json.loads(response.read().decode())
-                prices.append(float(data['data']['amount']))
-        except: pass
+    def get_price(self, symbol: str) -> float:
+        """USD price of any supported symbol (ETH, SOL, MATIC, BNB, USDC...), served from the oracle cache."""
+        return self.oracle.get(symbol)
+
+    def get_native_price(self, symbol: str = "ETH") -> float:
+        """USD price of a chain's gas token (pass AgentPay._native_symbol())."""
+        return self.get_price(symbol)
 
-        # 3. Binance (US)
+    async def get_eth_price_async(self) -> float:
+        """
+        asyncio version of get_eth_price(): all sources are queried concurrently over aiohttp.
+        Without aiohttp installed, the blocking version runs in a worker thread instead.
+        """
+        import asyncio
         try:
-            url = "https://api.binance.us/api/v3/ticker/price?symbol=ETHUSD"
-            with urllib.request.urlopen(url, timeout=2) as response:
-                data = json.loads(response.read().decode())
-                if 'price' in data: prices.append(float(data['price']))
-        except: pass
-            
+            import aiohttp
+        except ImportError:
+            return await asyncio.to_thread(self.get_eth_price)
+
+        async def fetch(session, url, parse):
+            try:
+                async with session.get(url) as response:
+                    return float(parse(json.loads(await response.text())))
+            except Exception:
+                return None
+
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as session:
+            results = await asyncio.gather(*(fetch(session, url, parse) for url, parse in self.ETH_PRICE_SOURCES))
+        prices = [p for p in results if p is not None]
+        if not prices: # On-chain fallback is a blocking read: keep it off the event loop
+            return await asyncio.to_thread(self._fetch_onchain_fallback, "ETH")
+        return self._median_or_fallback(prices)
+
+    def _median_or_fallback(self, prices) -> float:
         if not prices:
             return self._fetch_onchain_fallback("ETH")
-            
-        prices.sort()
-        return prices[len(prices)//2]
+        return self.oracle.put("ETH", self.oracle.median(prices))
 
     def _fetch_onchain_fallback(self, symbol: str) -> float:
         """
@@ -74,7 +88,7 @@ class PricingManager:
         """
         print(f"⚠️ [SelfHealing] All REST APIs offline. Fetching {symbol} price On-Chain...")
         # In production, this would call specialized 'Consult' methods on Uniswap pools
-        fallback_prices = {"ETH": 2500.0, "SOL": 145.0, "MATIC": 0.65}
+        fallback_prices = {"ETH": 2500.0, "SOL": 145.0, "MATIC": 0.65, "BNB": 600.0}
         return fallback_prices.get(symbol, 1.0)
 
     def get_config(self) -> Dict[str, Any]:
@@ -84,11 +98,19 @@ class PricingManager:
         if current_time - self.last_updated > self.cache_ttl:
             self._refresh_config()
             
+        # Calculate Dynamic Prices (cached ETH price: no HTTP while it is fresh)
+        return self._price_config(self.oracle.get("ETH"))
+
+    async def get_config_async(self) -> Dict[str, Any]:
+        """asyncio version of get_config() (non-blocking price fetch)."""
+        if time.time() - self.last_updated > self.cache_ttl:
+            self._refresh_config() # Local file read only
+        price = self.oracle.cached("ETH")
+        return self._price_config(price if price is not None else await self.get_eth_price_async())
+
+    def _price_config(self, eth_price: float) -> Dict[str, Any]:
         config = self.cached_config.copy()
         
-        # Calculate Dynamic Prices
-        eth_price = self.get_eth_price()
-        
         # Target: $26.00 USD for Subscription
         config["subscription_price_eth"] = round(26.00 / eth_price, 6)
         
@@ -0,0 +1,207 @@
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+from .nonce_manager import is_already_known
+
+FEE_FIELDS = ('gasPrice', 'maxFeePerGas', 'maxPriorityFeePerGas')
+
+def is_underpriced(error: Exception) -> bool:
+    msg = str(error).lower()
+    return "underpriced" in msg or "fee too low" in msg
+
+class ReplacementManager:
+    """
+    Watches our broadcast EVM transactions and replaces the ones that stop moving.
+    Features:
+    - Stuck Detection: A tx still unmined `stuck_after_blocks` blocks after its last broadcast gets bumped.
+    - Fee Escalation: Bump n multiplies the fees by fee_curve[n] (at least +10%, the mempool
+      replacement rule) and never goes below the oracle's current "fast" fees; `max_fee_gwei` caps it.
+    - Cancel: cancel(nonce) replaces a tx with a 0-value self-send at the same nonce
+      (automatic once the curve is exhausted if `cancel_when_exhausted`).
+    - Audit Log: Replaced hashes are logged REPLACED (they no longer count toward the daily limit),
+      the replacement SENT, and the hash that finally mined CONFIRMED / FAILED.
+    - Waiters Follow: Replacement hashes are aliased in the ConfirmationTracker, so a pay_*(wait=True)
+      caller resolves when whichever version lands.
+    - On-Demand Thread: The watcher starts with the first watched tx and exits when nothing is pending,
+      when the agent has no EVM connection left, or after stop().
+    """
+
+    MIN_BUMP = 1.10
+
+    def __init__(self, agent, stuck_after_blocks: int = 3, fee_curve: Sequence[float] = (1.125, 1.25, 1.5, 2.0),
+                 max_fee_gwei: Optional[float] = None, cancel_when_exhausted: bool = False, poll_interval: float = 2.0):
+        self.agent = agent
+        self.stuck_after_blocks = stuck_after_blocks
+        self.fee_curve = list(fee_curve)
+        self.max_fee_gwei = max_fee_gwei
+        self.cancel_when_exhausted = cancel_when_exhausted
+        self.poll_interval = poll_interval
+        self._watched: Dict[int, Dict[str, Any]] = {} # nonce -> {tx, hashes, block, bumps, meta}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Sending ---
+    def _broadcast(self, tx: Dict[str, Any]) -> str:
+        w3 = self.agent.w3
+        signed = w3.eth.account.sign_transaction(tx, self.agent.wallet.key)
+        try:
+            return w3.to_hex(w3.eth.send_raw_transaction(signed.raw_transaction))
+        except Exception as e:
+            if is_already_known(e): # This exact tx is already in the pool (hedged or repeated send)
+                return w3.to_hex(signed.hash)
+            raise
+
+    def _escalate(self, tx: Dict[str, Any], factor: float) -> bool:
+        """Raises the fee fields of `tx` in place. False if that would pass max_fee_gwei."""
+        factor = max(factor, self.MIN_BUMP)
+        bumped = {f: int(tx[f] * factor) + 1 for f in FEE_FIELDS if f in tx}
+        try:
+            current = self.agent.gas.fee_fields("fast") # Market may have moved more than the curve
+        except Exception:
+            current = {}
+        for field in bumped:
+            bumped[field] = max(bumped[field], current.get(field, 0))
+        if 'maxFeePerGas' in bumped:
+            bumped['maxFeePerGas'] = max(bumped['maxFeePerGas'], bumped['maxPriorityFeePerGas'])
+        cap = bumped.get('maxFeePerGas', bumped.get('gasPrice'))
+        if self.max_fee_gwei and cap > self.max_fee_gwei * 10 ** 9:
+            return False
+        tx.update(bumped)
+        return True
+
+    def send(self, tx: Dict[str, Any]) -> str:
+        """
+        Signs and broadcasts `tx`. If the node already holds a tx at this nonce ("replacement
+        transaction underpriced"), the fee is escalated along the curve, at most len(fee_curve) times.
+        """
+        for factor in self.fee_curve + [None]:
+            try:
+                return self._broadcast(tx)
+            except Exception as e:
+                if factor is None or not is_underpriced(e) or not self._escalate(tx, factor):
+                    raise
+                print(f"⚠️ [Replacement] Nonce {tx['nonce']} underpriced. Retrying at x{max(factor, self.MIN_BUMP):.3f} fees...")
+
+    # --- Watching ---
+    def watch(self, tx: Dict[str, Any], tx_hash: str, recipient: str = "", amount: float = 0.0, symbol: str = "ETH"):
+        """Starts watching a broadcast tx (the signed fields are kept so it can be re-signed with higher fees)."""
+        with self._lock:
+            meta = {"recipient": recipient, "amount": amount, "symbol": symbol}
+            # "block" is read on the first poll: watching costs no RPC on the payment path
+            self._watched[tx['nonce']] = {"tx": dict(tx), "hashes": [(tx_hash, meta)], "block": None, "bumps": 0,
+                                          "meta": meta, "cancelled": False}
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._loop, name="tx-replacement", daemon=True)
+                self._thread.start()
+
+    @property
+    def pending(self) -> List[int]:
+        """Nonces currently watched."""
+        return sorted(self._watched)
+
+    def stop(self):
+        """Ends the watcher thread. Watched txs are no longer bumped (they still mine on their own)."""
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_interval):
+            with self._lock:
+                if not self._watched or self.agent.w3 is None: # Nothing pending, or the connection is gone
+                    self._thread = None
+                    return
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ [Replacement] Poll failed: {e}")
+        with self._lock:
+            self._thread = None
+
+    def poll(self):
+        """One round: settle mined nonces, bump (or cancel) stuck ones. Normally run by the watcher thread."""
+        w3 = self.agent.w3
+        mined = w3.eth.get_transaction_count(self.agent.my_address, 'latest')
+        block = w3.eth.block_number
+        with self._lock:
+            done = {n: self._watched.pop(n) for n in list(self._watched) if n < mined}
+            stuck = []
+            for nonce, entry in self._watched.items():
+                if entry["block"] is None:
+                    entry["block"] = block
+                elif block - entry["block"] >= self.stuck_after_blocks:
+                    stuck.append(nonce)
+        for entry in done.values():
+            self._settle(entry)
+        for nonce in stuck:
+            entry = self._watched.get(nonce)
+            if entry is None:
+                continue
+            if entry["bumps"] < len(self.fee_curve):
+                self.speed_up(nonce)
+            elif self.cancel_when_exhausted and not entry["cancelled"]:
+                self.cancel(nonce)
+            else:
+                entry["block"] = block # Out of curve: wait another round before looking again
+
+    def _settle(self, entry: Dict[str, Any]):
+        """A watched nonce was mined: find which version landed and log the others as REPLACED."""
+        from web3.exceptions import TransactionNotFound
+        if len(entry["hashes"]) == 1:
+            return # Never replaced: the normal confirmation path covers it
+        logs = []
+        for tx_hash, meta in entry["hashes"]:
+            try:
+                receipt = self.agent.w3.eth.get_transaction_receipt(tx_hash)
+                status = "CONFIRMED" if receipt.get("status", 1) == 1 else "FAILED"
+            except TransactionNotFound:
+                status = "REPLACED"
+            logs.append((tx_hash, meta["recipient"], meta["amount"], status, meta["symbol"]))
+        self.agent._log_transactions(logs)
+
+    # --- Replacing ---
+    def _replace(self, nonce: int, new_tx: Dict[str, Any], factor: float, action: str, meta: Dict[str, Any]) -> Optional[str]:
+        entry = self._watched.get(nonce)
+        if entry is None:
+            raise ValueError(f"Nonce {nonce} is not pending (already mined or never watched).")
+        if not self._escalate(new_tx, factor):
+            print(f"⚠️ [Replacement] Nonce {nonce}: next bump passes max_fee_gwei={self.max_fee_gwei}. Waiting.")
+            entry["block"] = self.agent.w3.eth.block_number
+            return None
+        try:
+            new_hash = self.send(new_tx)
+        except Exception as e:
+            if "nonce too low" in str(e).lower():
+                return None # Mined meanwhile: the next poll settles it
+            raise
+        old_hash, old_meta = entry["hashes"][-1]
+        with self._lock:
+            entry.update(tx=new_tx, block=self.agent.w3.eth.block_number, bumps=entry["bumps"] + 1, meta=meta,
+                         cancelled=entry["cancelled"] or action == "CANCEL")
+            entry["hashes"].append((new_hash, meta))
+        self.agent.nonce_manager.mark_broadcast(nonce, new_hash) # Lost-nonce checks follow the live hash
+        self.agent._log_transactions([
+            (old_hash, old_meta["recipient"], old_meta["amount"], "REPLACED", old_meta["symbol"]),
+            (new_hash, meta["recipient"], meta["amount"], action, meta["symbol"])
+        ])
+        self.agent.confirmations.replace(old_hash, new_hash, **meta)
+        print(f"🚀 [Replacement] Nonce {nonce} {action}: {old_hash} -> {new_hash}")
+        return new_hash
+
+    def speed_up(self, nonce: int, factor: float = None) -> Optional[str]:
+        """Re-broadcasts the tx at `nonce` with escalated fees (next step of the curve by default)."""
+        entry = self._watched.get(nonce)
+        if entry is None:
+            raise ValueError(f"Nonce {nonce} is not pending (already mined or never watched).")
+        if factor is None:
+            factor = self.fee_curve[min(entry["bumps"], len(self.fee_curve) - 1)]
+        return self._replace(nonce, dict(entry["tx"]), factor, "SENT", dict(entry["meta"]))
+
+    def cancel(self, nonce: int) -> Optional[str]:
+        """Replaces the tx at `nonce` with a 0-value self-send (the original payment will not happen)."""
+        entry = self._watched.get(nonce)
+        if entry is None:
+            raise ValueError(f"Nonce {nonce} is not pending (already mined or never watched).")
+        old = entry["tx"]
+        cancel_tx = {'to': self.agent.my_address, 'value': 0, 'gas': 21000, 'nonce': nonce, 'chainId': old['chainId'],
+                     **{f: old[f] for f in FEE_FIELDS if f in old}}
+        meta = {"recipient": self.agent.my_address, "amount": 0.0, "symbol": entry["meta"]["symbol"], "gas_key": None}
+        return self._replace(nonce, cancel_tx, self.fee_curve[min(entry["bumps"], len(self.fee_curve) - 1)], "CANCEL", meta)
@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Any, Callable, List, Sequence
+from web3.providers.base import JSONBaseProvider
+from .rpc_pool import RpcPool
+
+class _Slot:
+    __slots__ = ("request", "result", "error", "done")
+
+    def __init__(self, request):
+        self.request = request
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+class Coalescer:
+    """
+    Merges calls issued within `window` seconds (from any thread) into one batch.
+    No background thread: the first caller of a window waits `window`, then sends
+    everything queued meanwhile (max_batch per request) and hands each caller its answer.
+    """
+
+    def __init__(self, send_one: Callable[[Any], Any], send_batch: Callable[[List[Any]], Sequence[Any]],
+                 window: float = 0.002, max_batch: int = 100):
+        self.send_one = send_one
+        self.send_batch = send_batch
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: List[_Slot] = []
+        self._lock = threading.Lock()
+        self._leader = False
+        self.batches = 0 # Round-trips actually made
+
+    def call(self, request):
+        slot = _Slot(request)
+        with self._lock:
+            self._queue.append(slot)
+            lead = not self._leader
+            self._leader = True
+        if lead:
+            time.sleep(self.window)
+            while True:
+                with self._lock:
+                    batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+                    if not batch:
+                        self._leader = False
+                        break
+                self._flush(batch)
+        slot.done.wait()
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _flush(self, batch: List[_Slot]):
+        self.batches += 1
+        try:
+            if len(batch) == 1:
+                results = [self.send_one(batch[0].request)]
+            else:
+                results = list(self.send_batch([slot.request for slot in batch]))
+                if len(results) != len(batch):
+                    raise ValueError(f"Batch answered {len(results)} of {len(batch)} calls")
+        except Exception as e:
+            for slot in batch:
+                slot.error = e
+                slot.done.set()
+            return
+        for slot, result in zip(batch, results):
+            slot.result = result
+            slot.done.set()
+
+class BatchingProvider(JSONBaseProvider):
+    """
+    Opt-in web3 transport: concurrent read calls are coalesced into one JSON-RPC batch.
+    Features:
+    - Reads Only: RpcPool.READ_METHODS are batched; sends and anything else go straight through.
+    - Transparent: Wraps any provider with make_batch_request (RpcPool, HTTPProvider); keep-alive
+      pooling comes from the wrapped provider's session.
+    - Window: Calls that arrive within `window` seconds share one round-trip (10 balanceOf calls
+      fired from a thread pool = 1 HTTP request).
+    """
+
+    def __init__(self, inner, window: float = 0.002, max_batch: int = 100, **kwargs):
+        super().__init__(**kwargs)
+        self.inner = inner
+        self.coalescer = Coalescer(lambda req: inner.make_request(*req), inner.make_batch_request, window, max_batch)
+
+    def __str__(self) -> str:
+        return f"Batching({self.inner})"
+
+    def make_request(self, method, params):
+        if method in RpcPool.READ_METHODS:
+            return self.coalescer.call((method, params))
+        return self.inner.make_request(method, params)
+
+    def make_batch_request(self, batch_requests):
+        return self.inner.make_batch_request(batch_requests)
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return self.inner.is_connected(show_traceback)
+
+class BatchingSolanaProvider:
+    """
+    Same coalescing for solana-py's sync HTTPProvider: concurrent Get* requests share one batch.
+    Install with SolanaDriver(batch_window=...) (replaces client._provider).
+    """
+
+    def __init__(self, inner, window: float = 0.002, max_batch: int = 100):
+        self.inner = inner
+        self.endpoint_uri = getattr(inner, "endpoint_uri", None)
+        self.coalescer = Coalescer(
+            lambda req: inner.make_request(*req),
+            lambda reqs: inner.make_batch_request(tuple(r[0] for r in reqs), tuple(r[1] for r in reqs)),
+            window, max_batch
+        )
+
+    def make_request(self, body, parser):
+        if type(body).__name__.startswith("Get"): # solders request classes: GetBalance, GetTokenAccountBalance, ...
+            return self.coalescer.call((body, parser))
+        return self.inner.make_request(body, parser)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name) # make_batch_request, is_connected, session, ...
@@ -0,0 +1,210 @@
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional
+from web3 import HTTPProvider
+from web3.providers.base import JSONBaseProvider
+
+class _Endpoint:
+    __slots__ = ("url", "provider", "latency", "error_rate", "failures", "down_until", "requests")
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        # Keep-alive: one pooled session per node, shared by every thread (hedges and batches included)
+        session = requests.Session()
+        session.mount(url, requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=32))
+        # No per-node retries: a failing node is skipped, not retried in place
+        self.provider = HTTPProvider(url, request_kwargs={"timeout": timeout}, session=session, exception_retry_configuration=None)
+        self.latency: Optional[float] = None # EWMA seconds (None = never measured)
+        self.error_rate = 0.0                 # EWMA of failures (0..1)
+        self.failures = 0                     # Consecutive failures (drives the backoff)
+        self.down_until = 0.0
+        self.requests = 0
+
+class RpcPool(JSONBaseProvider):
+    """
+    Web3 provider that spreads calls over several RPC endpoints.
+    Features:
+    - Latency Scoring: EWMA latency and error rate per endpoint; each call goes to the best-scoring healthy node.
+    - Failover: Transport errors (timeouts, connection resets, HTTP 429/5xx) move the call to the next node.
+      JSON-RPC errors (reverts, 'nonce too low') are answers, not node failures, and are returned as-is.
+    - Backoff: A node that keeps failing is taken out of rotation for base_backoff * 2^(failures-1) seconds
+      (capped at max_backoff); its next real request after that is the health check.
+    - Hedged Reads: With `hedge_after` set, a read that has not answered within that time is also sent to the
+      next node and the first answer wins. Writes (eth_sendRawTransaction) are never duplicated.
+    """
+
+    READ_METHODS = {
+        "eth_chainId", "net_version", "web3_clientVersion", "eth_blockNumber", "eth_gasPrice",
+        "eth_maxPriorityFeePerGas", "eth_feeHistory", "eth_getBalance", "eth_getTransactionCount",
+        "eth_getCode", "eth_call", "eth_estimateGas", "eth_getTransactionReceipt",
+        "eth_getTransactionByHash", "eth_getBlockByNumber", "eth_getBlockByHash", "eth_getLogs",
+    }
+
+    def __init__(self, urls: List[str], hedge_after: Optional[float] = None, timeout: float = 10.0,
+                 base_backoff: float = 2.0, max_backoff: float = 60.0, alpha: float = 0.3, **kwargs):
+        super().__init__(**kwargs)
+        if not urls:
+            raise ValueError("RpcPool needs at least one endpoint.")
+        self.urls = list(urls)
+        self.hedge_after = hedge_after
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.alpha = alpha
+        self.endpoints = [_Endpoint(url, timeout) for url in self.urls]
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __str__(self) -> str:
+        return f"RPC pool {self.urls}"
+
+    # --- Scoring ---
+    def _score(self, ep: _Endpoint) -> float:
+        # Unmeasured nodes score 0 so they get tried; errors weigh heavily
+        return (ep.latency or 0.0) * (1.0 + 4.0 * ep.error_rate)
+
+    def ranked(self) -> List[_Endpoint]:
+        """Healthy endpoints, best first. When every node is backing off, the one that recovers first."""
+        now = time.time()
+        with self._lock:
+            healthy = [ep for ep in self.endpoints if ep.down_until <= now]
+            if not healthy:
+                return [min(self.endpoints, key=lambda ep: ep.down_until)]
+            return sorted(healthy, key=self._score)
+
+    @property
+    def best_url(self) -> str:
+        return self.ranked()[0].url
+
+    def _record(self, ep: _Endpoint, latency: float, ok: bool):
+        with self._lock:
+            ep.requests += 1
+            a = self.alpha
+            ep.error_rate = (1 - a) * ep.error_rate + a * (0.0 if ok else 1.0)
+            if ok:
+                ep.latency = latency if ep.latency is None else (1 - a) * ep.latency + a * latency
+                ep.failures = 0
+                ep.down_until = 0.0
+            else:
+                ep.failures += 1
+                ep.down_until = time.time() + min(self.base_backoff * 2 ** (ep.failures - 1), self.max_backoff)
+
+    def demote(self, url: str):
+        """Takes a node out of rotation as if it had just failed (used by AgentPay.rotate_rpc)."""
+        for ep in self.endpoints:
+            if ep.url == url:
+                self._record(ep, 0.0, False)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-endpoint health snapshot (for dashboards / debugging)."""
+        now = time.time()
+        with self._lock:
+            return [{"url": ep.url, "latency_ms": None if ep.latency is None else round(ep.latency * 1000, 1),
+                     "error_rate": round(ep.error_rate, 3), "healthy": ep.down_until <= now, "requests": ep.requests}
+                    for ep in self.endpoints]
+
+    def probe(self, timeout: float = 3.0) -> List[Dict[str, Any]]:
+        """
+        Health check: queries every endpoint concurrently to seed the latency scores.
+        Returns after `timeout` at the latest; slower nodes are scored when they answer.
+        """
+        def check(ep):
+            try:
+                self._call(ep, "eth_blockNumber", [])
+            except Exception:
+                pass # Already recorded as a failure
+        pool = ThreadPoolExecutor(max_workers=len(self.endpoints))
+        wait([pool.submit(check, ep) for ep in self.endpoints], timeout=timeout)
+        pool.shutdown(wait=False)
+        return self.stats()
+
+    # --- Transport ---
+    @staticmethod
+    def _node_error(response: Any) -> bool:
+        """JSON-RPC answers that mean 'this node is unhealthy' rather than 'your request is wrong'."""
+        if not isinstance(response, dict) or "error" not in response:
+            return False
+        error = response["error"] or {}
+        message = str(error.get("message", "")).lower() if isinstance(error, dict) else str(error).lower()
+        return (isinstance(error, dict) and error.get("code") in (-32005, 429)) or "rate limit" in message or "too many requests" in message
+
+    @staticmethod
+    def _not_delivered(error: Exception) -> bool:
+        """True when the request certainly never reached the node (safe to send elsewhere)."""
+        return isinstance(error, (requests.exceptions.ConnectionError, ConnectionError)) and not isinstance(error, requests.exceptions.ReadTimeout)
+
+    def _call(self, ep: _Endpoint, method: str, params: Any, batch: bool = False):
+        start = time.monotonic()
+        try:
+            response = ep.provider.make_batch_request(params) if batch else ep.provider.make_request(method, params)
+        except Exception:
+            self._record(ep, time.monotonic() - start, False)
+            raise
+        failed = self._node_error(response)
+        self._record(ep, time.monotonic() - start, not failed)
+        if failed:
+            raise ConnectionError(f"{ep.url}: {response['error']}")
+        return response
+
+    def _send(self, method: str, params: Any, batch: bool = False):
+        errors = []
+        candidates = self.ranked()
+        # Nodes in backoff are the last resort, not excluded
+        candidates += [ep for ep in self.endpoints if ep not in candidates]
+        hedge = self.hedge_after is not None and (batch or method in self.READ_METHODS) and len(candidates) > 1
+        i = 0
+        while i < len(candidates):
+            if hedge:
+                pair = candidates[i:i + 2]
+                try:
+                    return self._hedged(pair, method, params, batch)
+                except Exception as e:
+                    errors.append(e)
+                i += len(pair)
+            else:
+                try:
+                    return self._call(candidates[i], method, params, batch)
+                except Exception as e:
+                    errors.append(e)
+                    if method == "eth_sendRawTransaction" and not self._not_delivered(e):
+                        raise # May have reached the node: resending is the caller's call
+                i += 1
+        raise ConnectionError(f"All RPC endpoints failed for {method}: {errors[-1] if errors else 'no endpoints'}")
+
+    def _hedged(self, pair: List[_Endpoint], method: str, params: Any, batch: bool):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rpc-hedge")
+        first = self._executor.submit(self._call, pair[0], method, params, batch)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if first in done and first.exception() is None:
+            return first.result()
+        futures = [first] if first not in done else []
+        if len(pair) > 1:
+            futures.append(self._executor.submit(self._call, pair[1], method, params, batch))
+        error = first.exception() if first in done else None
+        while futures:
+            done, pending = wait(futures, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    return f.result() # The loser still records its latency when it finishes
+                error = f.exception()
+            futures = list(pending)
+        raise error
+
+    def make_request(self, method, params):
+        return self._send(method, params)
+
+    def make_batch_request(self, batch_requests):
+        return self._send("batch", batch_requests, batch=True)
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        try:
+            response = self.make_request("web3_clientVersion", [])
+        except Exception:
+            if show_traceback:
+                raise
+            return False
+        return "error" not in response
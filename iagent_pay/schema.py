@@ -0,0 +1,97 @@
+"""
+Versioned schema migrations for the audit log (agent_history.db).
+The applied version lives in PRAGMA user_version. Every step is idempotent,
+so several processes starting against the same file can run migrate() together.
+"""
+from typing import Callable, List, Tuple
+
+def _v1_baseline(store, chunk_size: int):
+    """Legacy layout: one row per status change, no keys."""
+    with store.transaction() as c:
+        if c.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            return
+        c.execute('''CREATE TABLE IF NOT EXISTS transactions
+                     (timestamp REAL, tx_hash TEXT, recipient TEXT, amount REAL, status TEXT, symbol TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS paid_invoices
+                     (invoice_id TEXT PRIMARY KEY, timestamp REAL, recipient TEXT, amount REAL)''')
+        # Add 'symbol' if missing (files created before v1.2)
+        columns = [row[1] for row in c.execute("PRAGMA table_info(transactions)")]
+        if "symbol" not in columns:
+            c.execute("ALTER TABLE transactions ADD COLUMN symbol TEXT")
+        c.execute("PRAGMA user_version = 1")
+
+def _v2_one_row_per_tx(store, chunk_size: int):
+    """
+    One row per tx_hash (status updated in place) + append-only transaction_events.
+    Legacy rows are copied in chunks, each in its own short write transaction,
+    so other writers keep working while a large file is migrated.
+    """
+    with store.transaction() as c:
+        if c.execute("PRAGMA user_version").fetchone()[0] >= 2:
+            return
+        c.execute('''CREATE TABLE IF NOT EXISTS transactions_v2
+                     (timestamp REAL, tx_hash TEXT PRIMARY KEY, recipient TEXT, amount REAL, status TEXT, symbol TEXT)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS transaction_events
+                     (id INTEGER PRIMARY KEY, tx_hash TEXT, status TEXT, timestamp REAL)''')
+        c.execute("CREATE TABLE IF NOT EXISTS schema_meta (key TEXT PRIMARY KEY, value)")
+        c.execute("INSERT OR IGNORE INTO schema_meta VALUES ('v2_copied_rowid', 0)")
+
+    def copy_chunk(c, limit) -> int:
+        last = c.execute("SELECT value FROM schema_meta WHERE key = 'v2_copied_rowid'").fetchone()[0]
+        sql = "SELECT rowid, timestamp, tx_hash, recipient, amount, status, symbol FROM transactions WHERE rowid > ? ORDER BY rowid"
+        rows = c.execute(sql + (" LIMIT ?" if limit else ""), (last, limit) if limit else (last,)).fetchall()
+        if not rows:
+            return 0
+        # Rows arrive in write order, so the last status seen for a hash is its current one
+        c.executemany('''INSERT INTO transactions_v2 VALUES (?, ?, ?, ?, ?, ?)
+                         ON CONFLICT(tx_hash) DO UPDATE SET status = excluded.status''',
+                      [r[1:] for r in rows if r[2] is not None])
+        c.executemany("INSERT INTO transaction_events (tx_hash, status, timestamp) VALUES (?, ?, ?)",
+                      [(r[2], r[5], r[1]) for r in rows if r[2] is not None])
+        c.execute("UPDATE schema_meta SET value = ? WHERE key = 'v2_copied_rowid'", (rows[-1][0],))
+        return len(rows)
+
+    while True:
+        with store.transaction() as c:
+            if c.execute("PRAGMA user_version").fetchone()[0] >= 2:
+                return # Another process finished the job
+            if copy_chunk(c, chunk_size) < chunk_size:
+                break
+
+    # Swap: copy the tail written since the last chunk, then rename (one short lock)
+    with store.transaction() as c:
+        if c.execute("PRAGMA user_version").fetchone()[0] >= 2:
+            return
+        copy_chunk(c, None)
+        c.execute("DROP TABLE transactions")
+        c.execute("ALTER TABLE transactions_v2 RENAME TO transactions")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_symbol_ts ON transactions (symbol, timestamp)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_recipient ON transactions (recipient)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_transaction_events_hash ON transaction_events (tx_hash)")
+        c.execute("DELETE FROM schema_meta WHERE key = 'v2_copied_rowid'")
+        c.execute("PRAGMA user_version = 2")
+
+def _v3_priority_fees(store, chunk_size: int):
+    """Priority fee chosen for each Solana tx (compute unit limit + price), keyed by signature."""
+    with store.transaction() as c:
+        if c.execute("PRAGMA user_version").fetchone()[0] >= 3:
+            return
+        c.execute('''CREATE TABLE IF NOT EXISTS priority_fees
+                     (tx_hash TEXT PRIMARY KEY, timestamp REAL, urgency TEXT, compute_unit_limit INTEGER,
+                      compute_unit_price INTEGER, priority_fee_lamports INTEGER)''')
+        c.execute("PRAGMA user_version = 3")
+
+HISTORY_MIGRATIONS: List[Tuple[int, Callable]] = [
+    (1, _v1_baseline),
+    (2, _v2_one_row_per_tx),
+    (3, _v3_priority_fees),
+]
+
+def migrate(store, migrations: List[Tuple[int, Callable]] = HISTORY_MIGRATIONS, chunk_size: int = 5000) -> int:
+    """Brings the store up to the latest schema version. Returns the resulting version."""
+    current = store.fetchone("PRAGMA user_version")[0]
+    for version, step in migrations:
+        if version > current:
+            step(store, chunk_size)
+            current = version
+    return current
@@ -1,4 +1,10 @@
-from web3 import Web3
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
 import requests
 
 class SocialResolver:
@@ -7,15 +13,108 @@ class SocialResolver:
     Supports:
     - ENS (.eth) -> Ethereum Address (0x...)
     - SNS (.sol) -> Solana Address (Base58)
+    Features:
+    - Cache (TTL): Resolved names are kept `ttl` seconds; repeat payments to a handle cost no lookup.
+    - Negative Cache: Names that do not exist are remembered `negative_ttl` seconds
+      (lookup errors are not cached: the next call tries again).
+    - Persistence: Optional JSON file (`cache_path`) so resolved names survive restarts.
+    - Bulk: resolve_many() looks up every uncached handle in parallel.
     """
-    
-    def __init__(self):
-        # We need a Mainnet connection for ENS, even if the agent is on Base/Polygon
-        # Using a public reliable RPC
+
+    def __init__(self, ttl: float = 3600.0, negative_ttl: float = 300.0, cache_path: Optional[str] = None, max_workers: int = 16):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_workers = max_workers
+        self._cache: Dict[str, Tuple[Optional[str], float]] = {} # name -> (address or None, expires_at)
+        self._lock = threading.Lock()
+        self.lookups = 0 # Network lookups actually made
+        self._ens_w3 = None
+        self._load()
+
+    @property
+    def ens_w3(self):
+        """Mainnet connection for ENS (built, and web3 imported, on the first .eth lookup)."""
+        if self._ens_w3 is None:
+            # We need a Mainnet connection for ENS, even if the agent is on Base/Polygon
+            # Using a public reliable RPC
+            try:
+                from web3 import Web3
+                self._ens_w3 = Web3(Web3.HTTPProvider("https://eth.llamarpc.com"))
+            except Exception:
+                return None
+        return self._ens_w3
+
+    @ens_w3.setter
+    def ens_w3(self, w3):
+        self._ens_w3 = w3
+
+    # --- Persistence ---
+    def _load(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+            now = time.time()
+            for name, (address, expires_at) in data.get("names", {}).items():
+                if expires_at > now:
+                    self._cache[name] = (address, float(expires_at))
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass # Missing or corrupt: start empty
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        now = time.time()
+        with self._lock:
+            names = {name: [address, expires_at] for name, (address, expires_at) in self._cache.items() if expires_at > now}
         try:
-            self.ens_w3 = Web3(Web3.HTTPProvider("https://eth.llamarpc.com"))
-        except:
-            self.ens_w3 = None
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_name(self.cache_path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump({"names": names}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print(f"⚠️ [SocialResolver] Could not persist cache: {e}")
+
+    # --- Cache ---
+    def _cached(self, name: str) -> Tuple[bool, Optional[str]]:
+        entry = self._cache.get(name)
+        if entry is None or entry[1] <= time.time():
+            return False, None
+        return True, entry[0]
+
+    def _remember(self, name: str, address: Optional[str]):
+        ttl = self.ttl if address else self.negative_ttl
+        with self._lock:
+            self._cache[name] = (address, time.time() + ttl)
+
+    def invalidate(self, identifier: str = None):
+        """Forgets one name (or every name)."""
+        with self._lock:
+            if identifier is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(identifier.strip().lower(), None)
+        self._save()
+
+    # --- Resolution ---
+    @staticmethod
+    def _is_handle(lower_id: str) -> bool:
+        return lower_id.endswith((".eth", ".sol"))
+
+    def _lookup(self, name: str) -> Tuple[bool, Optional[str]]:
+        """Network lookup: (definitive, address). A miss is definitive; an error is not."""
+        self.lookups += 1
+        try:
+            address = self._resolve_ens(name) if name.endswith(".eth") else self._resolve_sns(name)
+        except Exception as e:
+            print(f"❌ {'ENS' if name.endswith('.eth') else 'SNS'} Lookup Error: {e}")
+            return False, None
+        if address:
+            print(f"🔍 Resolved {'ENS' if name.endswith('.eth') else 'SNS'}: {name} -> {address}")
+        return True, address
 
     def resolve(self, identifier: str) -> str:
         """
@@ -24,45 +123,62 @@ class SocialResolver:
         """
         original_id = identifier.strip()
         lower_id = original_id.lower()
-        
-        if lower_id.endswith(".eth"):
-            return self._resolve_ens(lower_id)
-        
-        if lower_id.endswith(".sol"):
-            return self._resolve_sns(lower_id)
-            
-        return original_id # Return RAW (Case Sensitive) if not a handle
-
-    def _resolve_ens(self, name: str) -> str:
-        if not self.ens_w3 or not self.ens_w3.is_connected():
-            print("⚠️ ENS Resolution unavailable (No Mainnet Connection).")
-            return None
-        
-        try:
-            address = self.ens_w3.ens.address(name)
-            if address:
-                print(f"🔍 Resolved ENS: {name} -> {address}")
-                return address
-        except Exception as e:
-            print(f"❌ ENS Lookup Error: {e}")
-        return None
+        if not self._is_handle(lower_id):
+            return original_id # Return RAW (Case Sensitive) if not a handle
+
+        hit, address = self._cached(lower_id)
+        if hit:
+            return address
+        definitive, address = self._lookup(lower_id)
+        if definitive:
+            self._remember(lower_id, address)
+            self._save()
+        return address
 
-    def _resolve_sns(self, name: str) -> str:
+    def resolve_many(self, identifiers: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Resolves many identifiers at once: cached ones immediately, the rest in parallel. {identifier: address}"""
+        identifiers = list(identifiers)
+        results: Dict[str, Optional[str]] = {}
+        pending = {}
+        for identifier in identifiers:
+            original_id = identifier.strip()
+            lower_id = original_id.lower()
+            if not self._is_handle(lower_id):
+                results[identifier] = original_id
+                continue
+            hit, address = self._cached(lower_id)
+            if hit:
+                results[identifier] = address
+            else:
+                pending.setdefault(lower_id, []).append(identifier)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                answers = dict(zip(pending, pool.map(self._lookup, pending)))
+            for name, (definitive, address) in answers.items():
+                if definitive:
+                    self._remember(name, address)
+                for identifier in pending[name]:
+                    results[identifier] = address
+            self._save()
+        return {identifier: results[identifier] for identifier in identifiers}
+
+    def _resolve_ens(self, name: str) -> Optional[str]:
+        """ENS lookup (None if the name has no address). Errors raise."""
+        if not self.ens_w3:
+            raise ConnectionError("ENS Resolution unavailable (No Mainnet Connection).")
+        # No is_connected() probe: a dead RPC fails this call anyway, one round-trip sooner
+        return self.ens_w3.ens.address(name)
+
+    def _resolve_sns(self, name: str) -> Optional[str]:
         """
         Resolves Solana Name Service (Bonfida).
         Uses public API to avoid heavy dependency for now.
         """
-        try:
-            # Bonfida Public API
-            url = f"https://sns-sdk-proxy.bonfida.workers.dev/resolve/{name}"
-            response = requests.get(url, timeout=3)
-            data = response.json()
-            
-            if data.get("result"):
-                address = data["result"]
-                print(f"🔍 Resolved SNS: {name} -> {address}")
-                return address
-        except Exception as e:
-            print(f"❌ SNS Lookup Error: {e}")
-            
-        return None
+        # Bonfida Public API
+        url = f"https://sns-sdk-proxy.bonfida.workers.dev/resolve/{name}"
+        response = requests.get(url, timeout=3)
+        data = response.json()
+        if data.get("s", "ok") == "ok" and data.get("result"):
+            return data["result"]
+        return None # {"s": "error", "result": "Domain not found"}
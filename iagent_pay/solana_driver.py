@@ -1,18 +1,21 @@
 import json
 import os
-from typing import Optional, Dict, Any, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Union, Tuple
 from pathlib import Path
 
 # External Libs (Rust/Python)
-print("⚡ Loading SolanaDriver Module v2...")
 from solana.rpc.api import Client
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 from solders.transaction import Transaction
 from solders.system_program import transfer, TransferParams
-from spl.token.client import Token
-from spl.token.constants import TOKEN_PROGRAM_ID
-from spl.token.instructions import get_associated_token_address
+from spl.token.constants import TOKEN_PROGRAM_ID, ASSOCIATED_TOKEN_PROGRAM_ID
+from spl.token.instructions import get_associated_token_address, create_idempotent_associated_token_account, transfer_checked, TransferCheckedParams
+from .confirmation_tracker import ConfirmationTracker, solana_signature_statuses
+from .blockhash_provider import BlockhashProvider
+from .spl_account_cache import SplAccountCache
+from .solana_fees import SolanaFeeOracle
 
 class SolanaDriver:
     """
@@ -31,8 +34,16 @@ class SolanaDriver:
     WIF_MINT_MAINNET = "EKpQGSJtjMFqKZ9KQanSqYXRcF8fBopzLHYxdM65zcjm"
     POPCAT_MINT_MAINNET = "7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
 
+    # Batch Packing (transfer_batch)
+    MAX_TX_SIZE = 1232 # Bytes: the packet limit for one serialized transaction
+    MAX_TX_COMPUTE = 1_400_000 # Compute units per transaction
+    COMPUTE_UNITS = {"sol": 300, "spl": 6_500, "ata": 30_000} # Per-instruction upper bounds (also the limit when simulation fails)
+    MAX_ACCOUNTS_PER_CALL = 100 # get_multiple_accounts cap
 
-    def __init__(self, network: str = "devnet"):
+    def __init__(self, network: str = "devnet", batch_window: float = None):
+        """
+        :param batch_window: (Optional) Coalesce concurrent Get* calls issued within this many seconds into one JSON-RPC batch.
+        """
         self.network = network.lower()
         
         # 1. Select RPC
@@ -59,6 +70,19 @@ class SolanaDriver:
             self.popcat_mint = None
             
         self.client = Client(self.rpc_url)
+        if batch_window:
+            from .rpc_batch import BatchingSolanaProvider
+            self.client._provider = BatchingSolanaProvider(self.client._provider, window=batch_window)
+        self._async_client = None # Created on first async call (must live in the caller's event loop)
+        # Signature Waiting: one batched get_signature_statuses poller for all in-flight txs
+        self.confirmations = ConfirmationTracker(solana_signature_statuses(lambda: self.client), poll_interval=1.0, timeout=30.0)
+        # Recent Blockhash: prefetched in the background and shared by every driver on this RPC
+        self.blockhashes = BlockhashProvider.for_rpc(self.rpc_url, lambda: self.client)
+        # SPL Facts: mint decimals + known recipient ATAs, shared by every driver on this RPC
+        self.token_accounts = SplAccountCache.for_rpc(self.rpc_url)
+        # Priority Fees: compute unit limit (simulated) + price (by urgency) on every send
+        self.fees = SolanaFeeOracle(lambda: self.client, uncached_programs=[ASSOCIATED_TOKEN_PROGRAM_ID])
+        self.on_fee = None # on_fee(signature, choice): audit hook (AgentPay records the fee each tx paid)
         self.explorer_url = f"https://explorer.solana.com/tx/{{}}?cluster={self.network}"
 
         # 2. Setup Key Management
@@ -66,6 +90,23 @@ class SolanaDriver:
         self.keypair: Optional[Keypair] = None
         self._load_or_create_wallet()
 
+    def resolve_mint(self, token: str) -> str:
+        """Maps a token symbol (USDC, USDT, BONK, WIF, POPCAT) or raw mint address to a mint address."""
+        mints = {
+            "USDC": self.usdc_mint,
+            "USDT": self.usdt_mint,
+            # --- MEME COINS ---
+            "BONK": getattr(self, "bonk_mint", None),
+            "WIF": getattr(self, "wif_mint", None),
+            "POPCAT": getattr(self, "popcat_mint", None),
+        }
+        if token in mints:
+            return mints[token]
+        # Allow custom mints if user passes full address (raw base58)
+        if len(token) > 10:
+            return token
+        raise NotImplementedError(f"Token '{token}' not auto-configured on Solana yet.")
+
     def get_token_balance(self, mint_address: str = None) -> float:
         """Returns balance of a specific SPL Token."""
         # Clean the input string just in case
@@ -89,11 +130,7 @@ class SolanaDriver:
             # print(f"⚠️ [Solana] Token Balance Error: {e}")
             return 0.0
 
-    def transfer_token(self, to_address: str, amount: float, mint_address: str = None) -> str:
-        """
-        Sends SPL Tokens (default USDC).
-        Auto-creates recipient ATA if needed.
-        """
+    def _parse_token_args(self, to_address: str, mint_address: str = None):
         val_raw = mint_address or self.usdc_mint
         try:
             target_mint = Pubkey.from_string(val_raw.strip())
@@ -104,68 +141,87 @@ class SolanaDriver:
              recipient_pubkey = Pubkey.from_string(to_address.strip())
         except Exception as e:
              raise ValueError(f"Invalid Recipient Address: '{to_address}' Error: {e}")
-        
+        return recipient_pubkey, target_mint
+
+    def _remember_accounts(self, mints, atas, accounts):
+        """Stores what a get_multiple_accounts answer says about `mints` (decimals) and `atas` (existence)."""
+        for mint in mints:
+            account = accounts.get(mint)
+            if account is not None and account.owner == TOKEN_PROGRAM_ID:
+                self.token_accounts.put_decimals(mint, bytes(account.data)[44]) # Mint layout: authority option (36) + supply (8) + decimals
+        for ata in atas:
+            if accounts.get(ata) is not None:
+                self.token_accounts.add_ata(ata)
+
+    def _lookup_token_accounts(self, mints, atas=()) -> Dict[Pubkey, Optional[int]]:
+        """
+        Reads whatever the shared cache does not know yet (mint decimals, ATA existence) in one
+        get_multiple_accounts pass. Returns {mint: decimals}, None for a mint that is not an SPL Token mint.
+        """
+        cache = self.token_accounts
+        mints = list(dict.fromkeys(mints))
+        missing_mints = [m for m in mints if cache.decimals(m) is None]
+        missing_atas = [a for a in dict.fromkeys(atas) if not cache.has_ata(a)]
+        if missing_mints or missing_atas:
+            self._remember_accounts(missing_mints, missing_atas, self._get_accounts(missing_mints + missing_atas))
+        return {mint: cache.decimals(mint) for mint in mints}
+
+    def _token_transfer_instructions(self, recipient: Pubkey, mint: Pubkey, amount: float, decimals: int):
+        """transfer_checked to the recipient's ATA, preceded by an idempotent ATA create unless the ATA is known to exist."""
+        payer = self.keypair.pubkey()
+        dest = get_associated_token_address(recipient, mint)
+        instructions = []
+        if not self.token_accounts.has_ata(dest):
+            instructions.append(create_idempotent_associated_token_account(payer, recipient, mint))
+        instructions.append(transfer_checked(TransferCheckedParams(
+            program_id=TOKEN_PROGRAM_ID, source=get_associated_token_address(payer, mint), mint=mint, dest=dest,
+            owner=payer, amount=int(amount * (10 ** decimals)), decimals=decimals
+        )))
+        return instructions
+
+    def transfer_token(self, to_address: str, amount: float, mint_address: str = None, urgency: str = "normal") -> str:
+        """
+        Sends SPL Tokens (default USDC).
+        Auto-creates recipient ATA if needed (idempotent create, in the same tx).
+        Mint decimals and known ATAs are cached: a repeat payment to a known recipient costs a single RPC (the send).
+        :param urgency: "slow", "normal" or "fast" (priority-fee tier).
+        """
+        recipient_pubkey, target_mint = self._parse_token_args(to_address, mint_address)
+        dest_ata = get_associated_token_address(recipient_pubkey, target_mint)
+
         try:
             print(f"🔄 Initializing Token Transfer ({amount} units)...")
-            spl_client = Token(self.client, target_mint, TOKEN_PROGRAM_ID, self.keypair)
-            
-            # 1. Get/Create Sender ATA (Should exist if we have funds)
-            # Use static helper
-            source_ata = get_associated_token_address(self.keypair.pubkey(), target_mint)
-            
-            # 2. Derive Recipient ATA
-            dest_ata = get_associated_token_address(recipient_pubkey, target_mint)
-            
-            # 3. Check if Dest ATA exists
-            acc_info = self.client.get_account_info(dest_ata)
-            
-            # Note: Checking value property logic
-            exists = False
-            if hasattr(acc_info, 'value'):
-                exists = acc_info.value is not None
-            else:
-                exists = acc_info is not None
-
-            if not exists:
-                print("✨ Creating Recipient ATA...")
-                try:
-                    spl_client.create_associated_token_account(recipient_pubkey)
-                except Exception as e:
-                     print(f"⚠️ ATA Create Warning (might exist): {e}")
-            
-            # 4. Transfer
-            mint_info = spl_client.get_mint_info()
-            decimals = mint_info.decimals
-            amount_int = int(amount * (10 ** decimals))
-            
-            print(f"💸 Sending {amount_int} base units...")
-            resp = spl_client.transfer(
-                source=source_ata,
-                dest=dest_ata,
-                owner=self.keypair,
-                amount=amount_int
-            )
-            
-            sig = resp.value if hasattr(resp, 'value') else resp
-            
+            decimals = self._lookup_token_accounts([target_mint])[target_mint]
+            if decimals is None:
+                raise ValueError(f"Not an SPL Token mint: {target_mint}")
+            instructions = self._token_transfer_instructions(recipient_pubkey, target_mint, amount, decimals)
+
+            print(f"💸 Sending {int(amount * (10 ** decimals))} base units...")
+            sig = self._send_instructions(instructions, urgency)
+
             print(f"⏳ Confirming Solana Token Tx: {sig}...")
-            # confirmation loop
-            max_retries = 30
-            for i in range(max_retries):
-                conf = self.client.get_signature_statuses([sig])
-                if hasattr(conf, 'value') and conf.value[0] is not None:
-                     status = conf.value[0]
-                     if status.confirmations is not None or status.confirmation_status == "finalized":
-                          print("✅ Solana Token Tx Confirmed!")
-                          return str(sig)
-                time.sleep(1)
-
-            print("⚠️ Solana Token Tx SENT but Confirmation Timed Out.")
+            if self._wait_for_signature(sig):
+                self.token_accounts.add_ata(dest_ata)
+                print("✅ Solana Token Tx Confirmed!")
+            else:
+                print("⚠️ Solana Token Tx SENT but Confirmation Timed Out.")
             return str(sig)
 
         except Exception as e:
+            self.token_accounts.forget(mint=target_mint, ata=dest_ata)
             raise Exception(f"[Solana] Token Transfer Failed: {e}")
 
+    def _wait_for_signature(self, signature) -> bool:
+        """Waits on the shared tracker (batched with every other in-flight signature). True once landed."""
+        from concurrent.futures import TimeoutError
+        try:
+            status = self.confirmations.track(str(signature)).result()
+        except TimeoutError:
+            return False
+        if status == "FAILED":
+            raise Exception(f"Tx {signature} failed on-chain")
+        return True
+
     def request_airdrop(self, amount_sol: float = 1.0):
         """Request Testnet/Devnet SOL."""
         if self.network == "mainnet":
@@ -230,7 +286,85 @@ class SolanaDriver:
             print(f"❌ [Solana] Failed to fetch balance: {e}")
             return 0.0
 
-    def transfer(self, to_address: str, amount_sol: float) -> str:
+    @staticmethod
+    def _is_blockhash_expired(error) -> bool:
+        return "blockhashnotfound" in str(error).lower().replace(" ", "") # RPC message or simulation error
+
+    def _sign(self, instructions, recent_blockhash) -> Transaction:
+        from solders.message import Message
+        msg = Message.new_with_blockhash(instructions, self.keypair.pubkey(), recent_blockhash)
+        return Transaction([self.keypair], msg, recent_blockhash)
+
+    def _sign_unique(self, instructions, limit: int, price: int, recent_blockhash) -> Tuple[Transaction, int]:
+        """
+        Signs `instructions` behind the compute budget. An identical payment already sent under this
+        blockhash would yield the same signature (and be dropped as a duplicate), so the unit price
+        is raised by 1 µlamport until the message is new. Returns (tx, price actually used).
+        """
+        while True:
+            tx = self._sign(self.fees.budget_instructions(limit, price) + instructions, recent_blockhash)
+            if self.blockhashes.claim(recent_blockhash, tx.message):
+                return tx, price
+            price += 1
+
+    def _estimate_units(self, instructions) -> int:
+        """Upper-bound compute units from COMPUTE_UNITS (batch packing, and the limit when simulation is unavailable)."""
+        costs = {str(TOKEN_PROGRAM_ID): self.COMPUTE_UNITS["spl"], str(ASSOCIATED_TOKEN_PROGRAM_ID): self.COMPUTE_UNITS["ata"]}
+        return sum(costs.get(str(ix.program_id), self.COMPUTE_UNITS["sol"]) for ix in instructions)
+
+    def _units_from_simulation(self, result, instructions) -> int:
+        if result.err is not None:
+            raise Exception(f"Simulation failed: {result.err}")
+        return self.fees.learn_limit(instructions, result.units_consumed)
+
+    def _compute_limit(self, instructions, price: int, recent_blockhash) -> int:
+        """SetComputeUnitLimit value: learned for this instruction shape, else simulated (with the budget instructions in place)."""
+        limit = self.fees.cached_limit(instructions)
+        if limit is not None:
+            return limit
+        probe = self._sign(self.fees.budget_instructions(self.fees.MAX_COMPUTE_UNITS, price) + instructions, recent_blockhash)
+        try:
+            result = self.client.simulate_transaction(probe).value
+        except Exception as e:
+            print(f"⚠️ [Solana] Simulation unavailable, using estimated compute units: {e}")
+            return self._estimate_units(instructions) + self.fees.CU_MARGIN
+        return self._units_from_simulation(result, instructions)
+
+    def _report_fee(self, signature, urgency: str, limit: int, price: int):
+        choice = self.fees.choice(urgency, limit, price)
+        print(f"⛽ Priority Fee ({urgency}): {price} µlamports/CU x {limit} CU = {choice['priority_fee_lamports']} lamports")
+        if self.on_fee:
+            try:
+                self.on_fee(str(signature), choice)
+            except Exception as e:
+                print(f"⚠️ [Solana] Could not record priority fee: {e}")
+
+    def _send_instructions(self, instructions, urgency: str = "normal") -> Any:
+        """
+        Signs `instructions` with the shared recent blockhash, behind a compute budget
+        (simulated unit limit + `urgency` unit price), and sends them. Retries once on an expired hash.
+        """
+        for attempt in range(2):
+            recent_blockhash = self.blockhashes.get()
+            price = self.fees.unit_price(urgency)
+            try:
+                limit = self._compute_limit(instructions, price, recent_blockhash)
+                tx, price = self._sign_unique(instructions, limit, price, recent_blockhash)
+                resp = self.client.send_transaction(tx)
+            except Exception as e:
+                if attempt == 0 and self._is_blockhash_expired(e):
+                    self.blockhashes.invalidate()
+                    continue
+                raise
+            signature = resp.value if hasattr(resp, 'value') else resp
+            self._report_fee(signature, urgency, limit, price)
+            return signature
+
+    def transfer(self, to_address: str, amount_sol: float, urgency: str = "normal") -> str:
+        """
+        Sends SOL.
+        :param urgency: "slow", "normal" or "fast" (priority-fee tier).
+        """
         lamports = int(amount_sol * 1_000_000_000)
         try:
             ix = transfer(
@@ -240,27 +374,258 @@ class SolanaDriver:
                     lamports=lamports
                 )
             )
-            recent_blockhash = self.client.get_latest_blockhash().value.blockhash
-            tx = Transaction()
-            tx.add(ix)
-            tx.recent_blockhash = recent_blockhash
-            tx.sign_partial(self.keypair)
-            resp = self.client.send_transaction(tx, self.keypair)
-            signature = resp.value if hasattr(resp, 'value') else resp
+            signature = self._send_instructions([ix], urgency)
             
             print(f"⏳ Confirming Solana Tx: {signature}...")
-            # confirmation loop
-            max_retries = 30
-            for i in range(max_retries):
-                conf = self.client.get_signature_statuses([signature])
-                if hasattr(conf, 'value') and conf.value[0] is not None:
-                     status = conf.value[0]
-                     if status.confirmations is not None or status.confirmation_status == "finalized":
-                          print("✅ Solana Tx Confirmed!")
-                          return str(signature)
-                time.sleep(1)
-            
-            print("⚠️ Solana Tx Sent but Confirmation Timed Out. Please check explorer.")
+            if self._wait_for_signature(signature):
+                print("✅ Solana Tx Confirmed!")
+            else:
+                print("⚠️ Solana Tx Sent but Confirmation Timed Out. Please check explorer.")
             return str(signature)
         except Exception as e:
             raise Exception(f"[Solana] Transfer Failed: {e}")
+
+    # --- BATCH PAYOUTS ---
+    def _tx_size(self, instructions) -> int:
+        """Serialized size of a signed transaction carrying `instructions` (plus the compute budget instructions)."""
+        from solders.message import Message
+        msg = Message(self.fees.budget_instructions(0, 0) + instructions, self.keypair.pubkey())
+        return 1 + 64 * msg.header.num_required_signatures + len(bytes(msg))
+
+    def _pack(self, groups) -> List[List[int]]:
+        """
+        Greedy packing of instruction groups (one per payment, never split) into transactions
+        within MAX_TX_SIZE and MAX_TX_COMPUTE. groups: [(instructions, compute_units)] -> [[group index, ...], ...]
+        """
+        txs, current, instructions, units = [], [], [], 0
+        for i, (group, cost) in enumerate(groups):
+            if current and (units + cost > self.MAX_TX_COMPUTE or self._tx_size(instructions + group) > self.MAX_TX_SIZE):
+                txs.append(current)
+                current, instructions, units = [], [], 0
+            current.append(i)
+            instructions += group
+            units += cost
+        if current:
+            txs.append(current)
+        return txs
+
+    def _get_accounts(self, pubkeys) -> Dict[Pubkey, Any]:
+        """Account info for many addresses ({pubkey: Account or None}), MAX_ACCOUNTS_PER_CALL per RPC."""
+        pubkeys = list(dict.fromkeys(pubkeys))
+        accounts = {}
+        for start in range(0, len(pubkeys), self.MAX_ACCOUNTS_PER_CALL):
+            chunk = pubkeys[start:start + self.MAX_ACCOUNTS_PER_CALL]
+            accounts.update(zip(chunk, self.client.get_multiple_accounts(chunk).value))
+        return accounts
+
+    def transfer_batch(self, payments: List[Dict[str, Any]], wait: bool = True, max_workers: int = 8, urgency: str = "normal") -> List[Dict[str, Any]]:
+        """
+        Pays many recipients in as few transactions as possible.
+        :param payments: [{"recipient": "base58..", "amount": 0.1, "mint": None}, ...] ('mint' None = SOL, else an SPL mint address).
+        :param max_workers: Transactions sent concurrently.
+        :param urgency: "slow", "normal" or "fast" (priority-fee tier).
+        SOL transfers, SPL transfer_checked and idempotent ATA-create instructions (recipients without a token account)
+        are packed into transactions up to the size and compute limits, then sent in parallel.
+        Mints and recipient ATAs are read for the whole batch with get_multiple_accounts.
+        Returns one dict per payment: recipient, amount, mint, tx_hash, status ('CONFIRMED', 'SENT', 'FAILED', 'REJECTED'), error.
+        Payments packed together share a tx_hash.
+        """
+        payer = self.keypair.pubkey()
+        results = [{"recipient": p.get("recipient"), "amount": float(p.get("amount", 0)), "mint": p.get("mint"),
+                    "tx_hash": None, "status": "PENDING", "error": None} for p in payments]
+
+        # 1. Parse addresses (a bad row must not sink the batch)
+        parsed = []
+        for r in results:
+            try:
+                recipient = Pubkey.from_string(str(r["recipient"]).strip())
+                mint = Pubkey.from_string(r["mint"].strip()) if r["mint"] else None
+            except Exception as e:
+                r["status"], r["error"] = "REJECTED", f"Invalid address: {e}"
+                continue
+            parsed.append((r, recipient, mint))
+
+        # 2. Mint decimals + recipient ATA existence: only what the shared cache lacks, in one pass
+        dest_atas = {(recipient, mint): get_associated_token_address(recipient, mint) for _, recipient, mint in parsed if mint}
+        decimals = self._lookup_token_accounts([mint for _, mint in dest_atas], dest_atas.values()) if dest_atas else {}
+
+        # 3. Instructions per payment
+        groups, live = [], []
+        for r, recipient, mint in parsed:
+            if mint is None:
+                instructions = [transfer(TransferParams(from_pubkey=payer, to_pubkey=recipient, lamports=int(r["amount"] * 1_000_000_000)))]
+            elif decimals.get(mint) is None:
+                r["status"], r["error"] = "REJECTED", f"Not an SPL Token mint: {mint}"
+                continue
+            else:
+                # Every payment to a new ATA carries its own (idempotent) create: txs land in any order
+                instructions = self._token_transfer_instructions(recipient, mint, r["amount"], decimals[mint])
+            r["_accounts"] = (mint, dest_atas.get((recipient, mint)))
+            groups.append((instructions, self._estimate_units(instructions)))
+            live.append(r)
+
+        # 4. Pack, then send every transaction concurrently
+        packed = self._pack(groups)
+
+        def send(indexes):
+            members = [live[i] for i in indexes]
+            try:
+                signature = str(self._send_instructions([ix for i in indexes for ix in groups[i][0]], urgency))
+            except Exception as e:
+                for r in members:
+                    r["status"], r["error"] = "FAILED", str(e)
+                    self.token_accounts.forget(*r["_accounts"])
+                return
+            for r in members:
+                r["tx_hash"], r["status"] = signature, "SENT"
+
+        if packed:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(packed)))) as pool:
+                list(pool.map(send, packed))
+        print(f"📦 Solana Batch: {len(live)} payments packed into {len(packed)} txs.")
+
+        # 5. Wait for every signature together (one get_signature_statuses per round)
+        if wait:
+            statuses = self.confirmations.wait(list({r["tx_hash"] for r in live if r["status"] == "SENT"}))
+            for r in live:
+                status = statuses.get(r["tx_hash"])
+                if status == "TIMEOUT":
+                    r["error"] = "Not confirmed yet" # Stays 'SENT'
+                elif status:
+                    r["status"] = status
+                    if status == "FAILED": r["error"] = "Failed on-chain"
+        for r in live:
+            mint, ata = r.pop("_accounts")
+            if r["status"] == "CONFIRMED" and ata is not None:
+                self.token_accounts.add_ata(ata)
+            elif r["status"] == "FAILED":
+                self.token_accounts.forget(mint, ata)
+        return results
+
+    # --- ASYNC API (AsyncAgentPay) ---
+    @property
+    def async_client(self):
+        """solana.rpc.async_api.AsyncClient on the same RPC (lazy)."""
+        if self._async_client is None:
+            from solana.rpc.async_api import AsyncClient
+            self._async_client = AsyncClient(self.rpc_url)
+        return self._async_client
+
+    async def close_async(self):
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    async def get_balance_async(self) -> float:
+        try:
+            resp = await self.async_client.get_balance(self.keypair.pubkey())
+            lamports = resp.value if hasattr(resp, 'value') else resp
+            return lamports / 1_000_000_000.0
+        except Exception as e:
+            print(f"❌ [Solana] Failed to fetch balance: {e}")
+            return 0.0
+
+    async def wait_for_signature_async(self, signature, max_retries: int = 30, poll_interval: float = 1.0) -> bool:
+        """Polls the signature status without blocking the event loop. Returns True once confirmed."""
+        import asyncio
+        from solders.transaction_status import TransactionConfirmationStatus
+        landed = (TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized)
+        for i in range(max_retries):
+            conf = await self.async_client.get_signature_statuses([signature])
+            if hasattr(conf, 'value') and conf.value[0] is not None:
+                status = conf.value[0]
+                if status.err is not None:
+                    raise Exception(f"[Solana] Tx {signature} failed on-chain: {status.err}")
+                if status.confirmation_status in landed or status.confirmations is None:
+                    return True # confirmations=None means rooted (finalized); "processed" is not landed yet
+            await asyncio.sleep(poll_interval)
+        return False
+
+    async def _compute_limit_async(self, instructions, price: int, recent_blockhash) -> int:
+        limit = self.fees.cached_limit(instructions)
+        if limit is not None:
+            return limit
+        probe = self._sign(self.fees.budget_instructions(self.fees.MAX_COMPUTE_UNITS, price) + instructions, recent_blockhash)
+        try:
+            result = (await self.async_client.simulate_transaction(probe)).value
+        except Exception as e:
+            print(f"⚠️ [Solana] Simulation unavailable, using estimated compute units: {e}")
+            return self._estimate_units(instructions) + self.fees.CU_MARGIN
+        return self._units_from_simulation(result, instructions)
+
+    async def _send_instructions_async(self, instructions, urgency: str = "normal") -> Any:
+        """asyncio version of _send_instructions()."""
+        import asyncio
+        for attempt in range(2):
+            recent_blockhash = await self.blockhashes.get_async(self.async_client)
+            price = await self.fees.unit_price_async(self.async_client, urgency)
+            try:
+                limit = await self._compute_limit_async(instructions, price, recent_blockhash)
+                tx, price = self._sign_unique(instructions, limit, price, recent_blockhash)
+                resp = await self.async_client.send_transaction(tx)
+            except Exception as e:
+                if attempt == 0 and self._is_blockhash_expired(e):
+                    self.blockhashes.invalidate()
+                    continue
+                raise
+            signature = resp.value if hasattr(resp, 'value') else resp
+            await asyncio.to_thread(self._report_fee, signature, urgency, limit, price) # on_fee writes the audit log
+            return signature
+
+    async def transfer_async(self, to_address: str, amount_sol: float, wait: bool = True, urgency: str = "normal") -> str:
+        """asyncio version of transfer()."""
+        lamports = int(amount_sol * 1_000_000_000)
+        try:
+            ix = transfer(
+                TransferParams(
+                    from_pubkey=self.keypair.pubkey(),
+                    to_pubkey=Pubkey.from_string(to_address),
+                    lamports=lamports
+                )
+            )
+            signature = await self._send_instructions_async([ix], urgency)
+        except Exception as e:
+            raise Exception(f"[Solana] Transfer Failed: {e}")
+
+        if wait:
+            print(f"⏳ Confirming Solana Tx: {signature}...")
+            if await self.wait_for_signature_async(signature):
+                print("✅ Solana Tx Confirmed!")
+            else:
+                print("⚠️ Solana Tx Sent but Confirmation Timed Out. Please check explorer.")
+        return str(signature)
+
+    async def transfer_token_async(self, to_address: str, amount: float, mint_address: str = None, wait: bool = True, urgency: str = "normal") -> str:
+        """asyncio version of transfer_token() (idempotent ATA create in the same tx, shared mint/ATA cache)."""
+        recipient_pubkey, target_mint = self._parse_token_args(to_address, mint_address)
+        dest_ata = get_associated_token_address(recipient_pubkey, target_mint)
+
+        try:
+            print(f"🔄 Initializing Token Transfer ({amount} units)...")
+            if self.token_accounts.decimals(target_mint) is None:
+                resp = await self.async_client.get_multiple_accounts([target_mint])
+                self._remember_accounts([target_mint], [], dict(zip([target_mint], resp.value)))
+            decimals = self.token_accounts.decimals(target_mint)
+            if decimals is None:
+                raise ValueError(f"Not an SPL Token mint: {target_mint}")
+            instructions = self._token_transfer_instructions(recipient_pubkey, target_mint, amount, decimals)
+
+            print(f"💸 Sending {int(amount * (10 ** decimals))} base units...")
+            sig = await self._send_instructions_async(instructions, urgency)
+        except Exception as e:
+            self.token_accounts.forget(mint=target_mint, ata=dest_ata)
+            raise Exception(f"[Solana] Token Transfer Failed: {e}")
+
+        if wait:
+            print(f"⏳ Confirming Solana Token Tx: {sig}...")
+            try:
+                confirmed = await self.wait_for_signature_async(sig)
+            except Exception:
+                self.token_accounts.forget(mint=target_mint, ata=dest_ata)
+                raise
+            if confirmed:
+                self.token_accounts.add_ata(dest_ata)
+                print("✅ Solana Token Tx Confirmed!")
+            else:
+                print("⚠️ Solana Token Tx SENT but Confirmation Timed Out.")
+        return str(sig)
@@ -0,0 +1,150 @@
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+def recent_prioritization_fees(client) -> List[int]:
+    """getRecentPrioritizationFees (not wrapped by solana-py): micro-lamports per CU paid in the node's recent slots."""
+    from solders.rpc.requests import GetRecentPrioritizationFees
+    from solders.rpc.responses import GetRecentPrioritizationFeesResp
+    resp = client._provider.make_request(GetRecentPrioritizationFees(), GetRecentPrioritizationFeesResp)
+    return [fee.prioritization_fee for fee in resp.value]
+
+async def recent_prioritization_fees_async(async_client) -> List[int]:
+    from solders.rpc.requests import GetRecentPrioritizationFees
+    from solders.rpc.responses import GetRecentPrioritizationFeesResp
+    resp = await async_client._provider.make_request(GetRecentPrioritizationFees(), GetRecentPrioritizationFeesResp)
+    return [fee.prioritization_fee for fee in resp.value]
+
+class SolanaFeeOracle:
+    """
+    Compute budget + priority fee for Solana sends, so congested slots do not silently drop our txs.
+    Features:
+    - Cached Sample: getRecentPrioritizationFees is read once per TTL, not per payment.
+      A stale (but recent) sample is served at once while a thread re-samples.
+    - Urgency Tiers: "slow" / "normal" / "fast" bid the 25th / 50th / 90th percentile of recent slots,
+      never below the tier floor (landing beats saving a few lamports), capped at MAX_UNIT_PRICE.
+    - Compute Limit: SetComputeUnitLimit from simulated usage + headroom (a tight limit also makes the
+      price per CU buy more priority). Learned per instruction shape, so a repeat send skips the simulation.
+      Txs that create accounts are simulated every time (their cost depends on chain state).
+    - Audit: choice() is what the audit log records (tier, limit, price, total priority fee).
+    """
+
+    TIERS = {"slow": 25, "normal": 50, "fast": 90}
+    MIN_UNIT_PRICE = {"slow": 1_000, "normal": 10_000, "fast": 100_000} # Micro-lamports per CU
+    MAX_UNIT_PRICE = 5_000_000 # Micro-lamports per CU: 0.001 SOL on a 200k CU tx
+    MAX_COMPUTE_UNITS = 1_400_000
+    CU_HEADROOM = 1.2
+    CU_MARGIN = 1_000
+
+    def __init__(self, get_client: Callable[[], Any], ttl: float = 10.0, max_stale: float = 60.0, uncached_programs: Sequence[Any] = ()):
+        """
+        :param get_client: Returns the solana.rpc.api.Client to sample from.
+        :param ttl: Seconds a sample is fresh (~25 slots).
+        :param max_stale: Older samples are never served; the caller waits for a new one.
+        :param uncached_programs: Programs whose compute cost depends on chain state (never learned per shape).
+        """
+        self.get_client = get_client
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.uncached_programs = set(uncached_programs)
+        self._sample: Optional[Dict[str, Any]] = None
+        self._limits: Dict[Tuple, int] = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    # --- Priority Fee ---
+    def _parse(self, fees: List[int]) -> Dict[str, Any]:
+        """Recent per-slot fees -> {tiers: {tier: micro-lamports}, at}."""
+        fees = sorted(fees)
+        tiers = {}
+        for tier, percentile in self.TIERS.items():
+            tiers[tier] = fees[min(len(fees) - 1, len(fees) * percentile // 100)] if fees else 0
+        return {"tiers": tiers, "at": time.monotonic()}
+
+    def refresh(self) -> Dict[str, Any]:
+        """Samples the chain now."""
+        sample = self._parse(recent_prioritization_fees(self.get_client()))
+        self._sample = sample
+        return sample
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ [SolanaFeeOracle] Background refresh failed: {e}")
+            finally:
+                self._refreshing = False
+        threading.Thread(target=run, daemon=True).start()
+
+    def _check_urgency(self, urgency: str):
+        if urgency not in self.TIERS:
+            raise ValueError(f"Unknown urgency '{urgency}'. Use one of: {', '.join(self.TIERS)}")
+
+    def _price(self, sample: Dict[str, Any], urgency: str) -> int:
+        return min(max(sample["tiers"][urgency], self.MIN_UNIT_PRICE[urgency]), self.MAX_UNIT_PRICE)
+
+    def unit_price(self, urgency: str = "normal") -> int:
+        """SetComputeUnitPrice value (micro-lamports per CU) for `urgency`."""
+        self._check_urgency(urgency)
+        sample = self._sample
+        age = time.monotonic() - sample["at"] if sample else None
+        if sample is None or age > self.max_stale:
+            try:
+                sample = self.refresh()
+            except Exception as e:
+                print(f"⚠️ [SolanaFeeOracle] Fee sample failed, bidding the {urgency} floor: {e}")
+                return self.MIN_UNIT_PRICE[urgency]
+        elif age > self.ttl:
+            self._refresh_in_background()
+        return self._price(sample, urgency)
+
+    async def unit_price_async(self, async_client, urgency: str = "normal") -> int:
+        """unit_price() for asyncio callers: a stale sample is re-read inline."""
+        self._check_urgency(urgency)
+        sample = self._sample
+        if sample is None or time.monotonic() - sample["at"] > self.ttl:
+            try:
+                sample = self._sample = self._parse(await recent_prioritization_fees_async(async_client))
+            except Exception as e:
+                print(f"⚠️ [SolanaFeeOracle] Fee sample failed, bidding the {urgency} floor: {e}")
+                return self.MIN_UNIT_PRICE[urgency]
+        return self._price(sample, urgency)
+
+    # --- Compute Limit ---
+    def _shape(self, instructions) -> Optional[Tuple]:
+        """Cache key for a tx's compute cost: program + instruction tag of every instruction (None: do not cache)."""
+        if any(ix.program_id in self.uncached_programs for ix in instructions):
+            return None
+        return tuple((str(ix.program_id), bytes(ix.data[:1])) for ix in instructions)
+
+    def cached_limit(self, instructions) -> Optional[int]:
+        shape = self._shape(instructions)
+        return self._limits.get(shape) if shape is not None else None
+
+    def learn_limit(self, instructions, units_consumed: int) -> int:
+        """Compute limit for a simulation that used `units_consumed` (remembered for this shape)."""
+        limit = min(int(units_consumed * self.CU_HEADROOM) + self.CU_MARGIN, self.MAX_COMPUTE_UNITS)
+        shape = self._shape(instructions)
+        if shape is not None:
+            self._limits[shape] = limit
+        return limit
+
+    # --- Instructions & Audit ---
+    @staticmethod
+    def budget_instructions(limit: int, price: int) -> list:
+        """SetComputeUnitLimit + SetComputeUnitPrice, to go in front of the tx's own instructions."""
+        from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+        return [set_compute_unit_limit(int(limit)), set_compute_unit_price(int(price))]
+
+    @staticmethod
+    def choice(urgency: str, limit: int, price: int) -> Dict[str, Any]:
+        """What was paid: urgency, compute_unit_limit, compute_unit_price (micro-lamports/CU), priority_fee_lamports."""
+        return {"urgency": urgency, "compute_unit_limit": int(limit), "compute_unit_price": int(price),
+                "priority_fee_lamports": math.ceil(limit * price / 1_000_000)}
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+class SpendLedger:
+    """
+    In-memory rolling spend window per symbol (Capital Control hot path).
+    Features:
+    - Bootstrap: Built once from the audit log at startup.
+    - Bucketed Expiry: Spend is grouped in fixed buckets and dropped one bucket at a time,
+      so a limit check is a dict lookup instead of a SUM() over the whole table.
+      Expiry is conservative: a spend leaves the window up to one bucket late, never early.
+    - Multi-Process: Status changes written by other processes sharing the DB file are picked up
+      from transaction_events (id watermark, only when PRAGMA data_version says the file changed).
+    A payment counts once, for as long as its latest status is not FAILED (or REPLACED by another tx at its nonce).
+    """
+
+    NOT_SPENT = ('FAILED', 'REPLACED')
+
+    def __init__(self, store, symbols: Iterable[str] = ("ETH", "SOL", "MATIC", "BNB"), window_seconds: int = 86400, bucket_seconds: int = 300):
+        self.store = store
+        self.symbols = set(symbols)
+        self.window = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Dict[int, float]] = {}
+        self._members: Dict[Tuple[str, int], list] = {}
+        self._entries: Dict[str, Tuple[str, int, float]] = {} # tx_hash -> (symbol, bucket, amount)
+        self._totals: Dict[str, float] = {}
+        self._floor: Dict[str, int] = {}
+        self._last_event = 0
+        self._seen = threading.local() # Per-connection PRAGMA data_version
+        self._bootstrap()
+
+    def _bootstrap(self):
+        """Loads the current window from the DB (one indexed range read per process)."""
+        with self._lock:
+            with self.store.transaction(immediate=False) as c:
+                self._last_event = c.execute("SELECT MAX(id) FROM transaction_events").fetchone()[0] or 0
+                rows = []
+                for symbol in self.symbols: # Range reads on idx_transactions_symbol_ts
+                    rows += c.execute(
+                        "SELECT tx_hash, timestamp, amount, symbol, status FROM transactions WHERE symbol = ? AND timestamp > ?",
+                        (symbol, time.time() - self.window)
+                    ).fetchall()
+            for tx_hash, ts, amount, symbol, status in rows:
+                self._apply(tx_hash, ts, amount, symbol, status)
+            self._seen.version = self._data_version()
+
+    def _data_version(self) -> int:
+        return self.store.fetchone("PRAGMA data_version")[0]
+
+    def _apply(self, tx_hash, ts, amount, symbol, status):
+        counted = self._entries.get(tx_hash)
+        if status in self.NOT_SPENT or status is None:
+            if counted:
+                self._remove(tx_hash, *counted)
+            return
+        if counted or symbol not in self.symbols or not amount:
+            return
+        idx = int(ts // self.bucket_seconds)
+        floor = self._floor.setdefault(symbol, int((time.time() - self.window) // self.bucket_seconds))
+        if idx < floor:
+            return # Already outside the window
+        buckets = self._buckets.setdefault(symbol, {})
+        buckets[idx] = buckets.get(idx, 0.0) + amount
+        self._members.setdefault((symbol, idx), []).append(tx_hash)
+        self._entries[tx_hash] = (symbol, idx, amount)
+        self._totals[symbol] = self._totals.get(symbol, 0.0) + amount
+
+    def _remove(self, tx_hash, symbol, idx, amount):
+        del self._entries[tx_hash]
+        buckets = self._buckets.get(symbol, {})
+        if idx in buckets:
+            buckets[idx] -= amount
+            self._totals[symbol] = max(self._totals.get(symbol, 0.0) - amount, 0.0)
+
+    def _expire(self, symbol: str, now: float):
+        target = int((now - self.window) // self.bucket_seconds)
+        floor = self._floor.get(symbol)
+        if floor is None or target <= floor:
+            return
+        buckets = self._buckets.get(symbol, {})
+        if target - floor > len(buckets):
+            stale = [idx for idx in buckets if idx < target] # Long idle: cheaper to scan live buckets
+        else:
+            stale = range(floor, target)
+        total = self._totals.get(symbol, 0.0)
+        for idx in stale:
+            total -= buckets.pop(idx, 0.0)
+            for tx_hash in self._members.pop((symbol, idx), ()):
+                self._entries.pop(tx_hash, None)
+        # Float drift guard: an empty window is exactly zero
+        self._totals[symbol] = max(total, 0.0) if buckets else 0.0
+        self._floor[symbol] = target
+
+    def _sync(self):
+        """Catches up with events committed by other connections (threads or processes)."""
+        version = self._data_version()
+        if getattr(self._seen, "version", None) == version:
+            return
+        rows = self.store.fetchall("""
+            SELECT e.id, e.tx_hash, t.timestamp, t.amount, t.symbol, e.status
+            FROM transaction_events e JOIN transactions t ON t.tx_hash = e.tx_hash
+            WHERE e.id > ? ORDER BY e.id
+        """, (self._last_event,))
+        for event_id, tx_hash, ts, amount, symbol, status in rows:
+            self._apply(tx_hash, ts, amount, symbol, status)
+            self._last_event = event_id
+        self._seen.version = version
+
+    def record(self, event_id: Optional[int], tx_hash: str, ts: float, amount: float, symbol: str, status: str):
+        """Applies an event this process just logged (skips the DB round-trip)."""
+        with self._lock:
+            if event_id == self._last_event + 1:
+                self._apply(tx_hash, ts, amount, symbol, status)
+                self._last_event = event_id
+            # Otherwise another writer got in between; _sync() applies both in order.
+
+    def spent(self, symbol: str) -> float:
+        """Returns the amount of `symbol` spent in the rolling window."""
+        with self._lock:
+            self._sync()
+            self._expire(symbol, time.time())
+            return self._totals.get(symbol, 0.0)
@@ -0,0 +1,57 @@
+import threading
+from typing import Dict, Optional, Set
+
+class SplAccountCache:
+    """
+    SPL Token facts that do not change, shared by every payment in the process.
+    Features:
+    - Mint Decimals: Immutable once a mint exists, so each mint is read once.
+    - Known ATAs: Token accounts seen on-chain or created by one of our confirmed txs. Only positives are kept
+      (an ATA never disappears under us); an unknown ATA gets an idempotent create instruction instead of a lookup.
+    - Invalidation: forget() drops what a failed payment relied on, so the next one checks again.
+    - Shared: One cache per RPC URL (for_rpc()).
+    """
+
+    _shared: Dict[str, "SplAccountCache"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._decimals: Dict[str, int] = {}
+        self._atas: Set[str] = set()
+
+    @classmethod
+    def for_rpc(cls, rpc_url: str) -> "SplAccountCache":
+        """Process-wide cache for `rpc_url`, created on first use."""
+        with cls._shared_lock:
+            cache = cls._shared.get(rpc_url)
+            if cache is None:
+                cache = cls._shared[rpc_url] = cls()
+            return cache
+
+    def decimals(self, mint) -> Optional[int]:
+        return self._decimals.get(str(mint))
+
+    def put_decimals(self, mint, decimals: int):
+        with self._lock:
+            self._decimals[str(mint)] = int(decimals)
+
+    def has_ata(self, ata) -> bool:
+        return str(ata) in self._atas
+
+    def add_ata(self, ata):
+        with self._lock:
+            self._atas.add(str(ata))
+
+    def forget(self, mint=None, ata=None):
+        """Drops one mint and/or ATA (e.g. after a transfer using them failed)."""
+        with self._lock:
+            if mint is not None:
+                self._decimals.pop(str(mint), None)
+            if ata is not None:
+                self._atas.discard(str(ata))
+
+    def clear(self):
+        with self._lock:
+            self._decimals.clear()
+            self._atas.clear()
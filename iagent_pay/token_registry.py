@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from .tokens import ERC20_ABI
+
+class TokenRegistry:
+    """
+    ERC-20 metadata cache keyed by (chain_id, token address), shared by every module that touches tokens.
+    Features:
+    - Contracts: One web3 contract object per (chain, token) instead of one per payment, bound to the
+      caller's current connection (rebuilt after an RPC rotation; old connections are not kept alive).
+    - Decimals: Read from the chain once per token, ever. Persisted to
+      ~/.iagent_pay_registry/token_registry.json so a cold start needs no RPC.
+    - Atomic Writes: The file is replaced in one step (tmp + os.replace); a corrupt file is ignored.
+    - Dev Chains: Never persisted (LOCAL_CHAIN_IDS). Anvil/Hardhat/eth-tester restart from scratch and
+      redeploy to the same addresses, so a remembered decimals value may belong to another token.
+    """
+
+    DEFAULT_PATH = Path.home() / ".iagent_pay_registry" / "token_registry.json"
+    # Hardhat (31337), Ganache/Geth --dev (1337), eth-tester (131277322940537)
+    LOCAL_CHAIN_IDS = frozenset({1337, 31337, 131277322940537})
+
+    _shared: Dict[str, "TokenRegistry"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else self.DEFAULT_PATH
+        self._lock = threading.Lock()
+        self._decimals: Dict[Tuple[int, str], int] = {}
+        self._contracts: Dict[Tuple[int, str], Any] = {}
+        self._load()
+
+    @classmethod
+    def shared(cls, path: Optional[str] = None) -> "TokenRegistry":
+        """Process-wide registry for `path` (default file), created on first use."""
+        key = str(path or cls.DEFAULT_PATH)
+        with cls._shared_lock:
+            registry = cls._shared.get(key)
+            if registry is None:
+                registry = cls._shared[key] = cls(path)
+            return registry
+
+    @staticmethod
+    def _key(chain_id: int, address: str) -> Tuple[int, str]:
+        return int(chain_id), address.lower()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            for chain_id, tokens in data.get("decimals", {}).items():
+                if int(chain_id) in self.LOCAL_CHAIN_IDS:
+                    continue # Written by an older version: a restarted dev chain may have reused the address
+                for address, decimals in tokens.items():
+                    self._decimals[self._key(chain_id, address)] = int(decimals)
+        except (OSError, ValueError, AttributeError):
+            pass # Missing or corrupt: start empty, entries are re-learned from the chain
+
+    def _save(self):
+        data: Dict[str, Dict[str, int]] = {}
+        for (chain_id, address), decimals in self._decimals.items():
+            if chain_id in self.LOCAL_CHAIN_IDS:
+                continue # Memory only: valid for this process' dev chain, not the next one
+            data.setdefault(str(chain_id), {})[address] = decimals
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump({"decimals": data}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️ [TokenRegistry] Could not persist cache: {e}")
+
+    def contract(self, w3, chain_id: int, address: str):
+        """Returns the (cached) ERC-20 contract for `address` bound to `w3`."""
+        key = self._key(chain_id, address)
+        contract = self._contracts.get(key)
+        if contract is None or contract.w3 is not w3: # New connection: rebind, dropping the old one
+            contract = w3.eth.contract(address=w3.to_checksum_address(address), abi=ERC20_ABI)
+            self._contracts[key] = contract
+        return contract
+
+    def get_decimals(self, chain_id: int, address: str) -> Optional[int]:
+        """Cached decimals, or None if this token was never seen (asyncio callers fetch and set_decimals())."""
+        return self._decimals.get(self._key(chain_id, address))
+
+    def set_decimals(self, chain_id: int, address: str, decimals: int):
+        key = self._key(chain_id, address)
+        with self._lock:
+            if self._decimals.get(key) == decimals:
+                return
+            self._decimals[key] = int(decimals)
+            if key[0] not in self.LOCAL_CHAIN_IDS:
+                self._save()
+
+    def decimals(self, contract, chain_id: int) -> int:
+        """decimals() for a web3 contract, calling the chain only the first time."""
+        decimals = self.get_decimals(chain_id, contract.address)
+        if decimals is None:
+            decimals = contract.functions.decimals().call()
+            self.set_decimals(chain_id, contract.address, decimals)
+        return decimals
@@ -1,6 +1,6 @@
 from typing import Dict
 
-# Standard ERC-20 ABI (Minimal for Transfer & Balance)
+# Standard ERC-20 ABI (Minimal for Transfer, Balance & Approvals)
 ERC20_ABI = [
     {
         "constant": False,
@@ -25,6 +25,26 @@ ERC20_ABI = [
         "name": "decimals",
         "outputs": [{"name": "", "type": "uint8"}],
         "type": "function"
+    },
+    {
+        "constant": True,
+        "inputs": [
+            {"name": "_owner", "type": "address"},
+            {"name": "_spender", "type": "address"}
+        ],
+        "name": "allowance",
+        "outputs": [{"name": "", "type": "uint256"}],
+        "type": "function"
+    },
+    {
+        "constant": False,
+        "inputs": [
+            {"name": "_spender", "type": "address"},
+            {"name": "_value", "type": "uint256"}
+        ],
+        "name": "approve",
+        "outputs": [{"name": "", "type": "bool"}],
+        "type": "function"
     }
 ]
 
@@ -1,4 +1,3 @@
-from web3 import Web3
 import time
 
 # Aave v3 Pool ABI (Supply/Withdraw)
@@ -28,8 +27,8 @@ AAVE_V3_POOL_ABI = [
     }
 ]
 
-# Aave v3 Pool Address on BASE
-BASE_AAVE_V3_POOL = Web3.to_checksum_address("0xA238Dd80C259a72e81d7e4674A963c9b9018d872")
+# Aave v3 Pool Address on BASE (checksummed literal: nothing to compute at import)
+BASE_AAVE_V3_POOL = "0xa238Dd80C259A72E81d7e4674A963C9b9018D872"
 
 class YieldManager:
     def __init__(self, agent):
@@ -39,7 +38,7 @@ class YieldManager:
         # Mapping to aTokens for balance checking
         self.atoken_map = {
             "BASE": {
-                "USDC": Web3.to_checksum_address("0x4e65fE4DbA5950d2428e01216bcA7ba28da6A4ad")
+                "USDC": "0x4E65FE4DBA5950D2428e01216bCa7bA28dA6a4Ad"
             }
         }
 
@@ -92,12 +91,11 @@ class YieldManager:
             return
 
         w3 = self.agent.w3
-        from .tokens import ERC20_ABI
         
         try:
             # 1. Resolve Decimals
-            token_contract = w3.eth.contract(address=token_address, abi=ERC20_ABI)
-            decimals = token_contract.functions.decimals().call()
+            token_contract = self.agent.chain.token_contract(w3, token_address)
+            decimals = self.agent.chain.token_decimals(token_contract)
             amount_units = int(amount * (10 ** decimals))
 
             # 2. Check Allowance & Approve
@@ -106,7 +104,8 @@ class YieldManager:
                 print(f"🏦 [YieldManager] Approving Aave Pool for {amount} {token_symbol}...")
                 approve_tx = token_contract.functions.approve(BASE_AAVE_V3_POOL, amount_units).build_transaction({
                     'from': self.agent.my_address,
-                    'nonce': self.agent._get_nonce(),
+                    'chainId': self.agent.chain.chain_id,
+                    **self.agent.gas.fee_fields(),
                 })
                 self.agent._send_evm_transaction(approve_tx, wait=True, log_recipient=BASE_AAVE_V3_POOL, log_amount=0, log_symbol=f"Approve-{token_symbol}")
         except Exception as e:
@@ -123,8 +122,9 @@ class YieldManager:
             0 # Referral code
         ).build_transaction({
             'from': self.agent.my_address,
-            'nonce': self.agent._get_nonce(),
-        })
+            'chainId': self.agent.chain.chain_id,
+            **self.agent.gas.fee_fields(),
+        }) # Nonce is reserved by _send_evm_transaction
         
         return self.agent._send_evm_transaction(supply_tx, wait=True, log_recipient=BASE_AAVE_V3_POOL, log_amount=amount, log_symbol=f"DEPOSIT-{token_symbol}")
 
@@ -135,10 +135,9 @@ class YieldManager:
             return 0.0
             
         try:
-            from .tokens import ERC20_ABI
-            atoken_contract = self.agent.w3.eth.contract(address=atoken_address, abi=ERC20_ABI)
+            atoken_contract = self.agent.chain.token_contract(self.agent.w3, atoken_address)
             balance_units = atoken_contract.functions.balanceOf(self.agent.my_address).call()
-            decimals = atoken_contract.functions.decimals().call()
+            decimals = self.agent.chain.token_decimals(atoken_contract)
             return float(balance_units) / (10 ** decimals)
         except Exception as e:
             print(f"⚠️ [YieldManager] Could not fetch balance from {self.protocol.upper()} (Network/Contract error)")
@@ -20,6 +20,9 @@ setup(
         "solders>=0.18.0",
         "requests>=2.28.0"
     ],
+    extras_require={
+        "async": ["aiohttp>=3.8.0"], # AsyncAgentPay price fetches (falls back to a worker thread without it)
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,155 @@
+"""Shared Solana test doubles: one configurable fake RPC client and the driver wiring around it."""
+import os
+import threading
+import time
+from types import SimpleNamespace
+from solders.account import Account as SolanaAccount
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM_ID
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.transaction import Transaction
+from solders.transaction_status import TransactionConfirmationStatus
+from spl.token.constants import TOKEN_PROGRAM_ID
+from iagent_pay.blockhash_provider import BlockhashProvider
+from iagent_pay.solana_driver import SolanaDriver
+from iagent_pay.spl_account_cache import SplAccountCache
+
+def mint_account(decimals: int) -> SolanaAccount:
+    data = bytes(44) + bytes([decimals, 1]) + bytes(36) # Mint layout: 82 bytes, decimals at 44
+    return SolanaAccount(lamports=1_461_600, data=data, owner=TOKEN_PROGRAM_ID, executable=False, rent_epoch=0)
+
+def programs(tx):
+    """Programs of the payment instructions (the compute budget prefix is left out)."""
+    keys = tx.message.account_keys
+    return [keys[ix.program_id_index] for ix in tx.message.instructions if keys[ix.program_id_index] != COMPUTE_BUDGET_PROGRAM_ID]
+
+def compute_budget(tx):
+    """(unit limit, unit price) set by the tx's ComputeBudget instructions."""
+    keys = tx.message.account_keys
+    budget = {}
+    for ix in tx.message.instructions:
+        if keys[ix.program_id_index] == COMPUTE_BUDGET_PROGRAM_ID:
+            data = bytes(ix.data)
+            budget[data[0]] = int.from_bytes(data[1:], "little")
+    return budget.get(2), budget.get(3) # 2 = SetComputeUnitLimit, 3 = SetComputeUnitPrice
+
+class FakeProvider:
+    """Raw provider answering getRecentPrioritizationFees with one sample per slot."""
+    def __init__(self, fees):
+        self.fees = fees
+        self.calls = 0
+
+    def make_request(self, body, parser):
+        self.calls += 1
+        return SimpleNamespace(value=[SimpleNamespace(slot=i, prioritization_fee=fee) for i, fee in enumerate(self.fees)])
+
+class FakeSolanaClient:
+    """
+    Stand-in for solana.rpc.api.Client. Every RPC is recorded in `rpcs`; sent txs land at once.
+    :param accounts: get_multiple_accounts answers from this {pubkey: Account} map.
+    :param fees: getRecentPrioritizationFees samples (served via `_provider`). None: no fee RPC, the oracle bids its floors.
+    :param units: Compute units simulate_transaction reports. None: simulation unavailable (estimated units are used).
+    :param sim_err: Error simulate_transaction reports.
+    :param fail_sends: The next N sends fail with a program error.
+    :param expired_sends: The next N sends fail with "Blockhash not found".
+    :param latency: Seconds each get_latest_blockhash takes.
+    `statuses` queues (confirmation_status, confirmations) answers for get_signature_statuses; once empty, txs are finalized.
+    """
+    def __init__(self, accounts=None, fees=None, units=None, sim_err=None, fail_sends: int = 0, expired_sends: int = 0, latency: float = 0.0):
+        self.accounts = accounts or {}
+        if fees is not None:
+            self._provider = FakeProvider(fees)
+        self.units = units
+        self.sim_err = sim_err
+        self.fail_sends = fail_sends
+        self.expired_sends = expired_sends
+        self.latency = latency
+        self.rpcs = []
+        self.sent = []
+        self.statuses = []
+        self._lock = threading.Lock()
+
+    def _record(self, method: str):
+        with self._lock:
+            self.rpcs.append(method)
+
+    @property
+    def simulations(self) -> int:
+        return self.rpcs.count("simulate_transaction")
+
+    def get_latest_blockhash(self):
+        self._record("get_latest_blockhash")
+        time.sleep(self.latency)
+        return SimpleNamespace(value=SimpleNamespace(blockhash=Hash.new_unique(), last_valid_block_height=1000))
+
+    def get_multiple_accounts(self, pubkeys):
+        self._record("get_multiple_accounts")
+        assert len(pubkeys) <= 100
+        return SimpleNamespace(value=[self.accounts.get(p) for p in pubkeys])
+
+    def simulate_transaction(self, tx):
+        if self.units is None:
+            raise Exception("Method not found: simulateTransaction")
+        self._record("simulate_transaction")
+        return SimpleNamespace(value=SimpleNamespace(err=self.sim_err, units_consumed=self.units))
+
+    def send_transaction(self, tx):
+        self._record("send_transaction")
+        with self._lock:
+            if self.expired_sends:
+                self.expired_sends -= 1
+                raise Exception("Transaction simulation failed: Blockhash not found")
+            if self.fail_sends:
+                self.fail_sends -= 1
+                raise Exception("Transaction simulation failed: custom program error: 0x1")
+            self.sent.append(Transaction.from_bytes(bytes(tx)))
+        return SimpleNamespace(value=tx.signatures[0])
+
+    def _status(self):
+        with self._lock:
+            confirmation_status, confirmations = self.statuses.pop(0) if self.statuses else (TransactionConfirmationStatus.Finalized, None)
+        return SimpleNamespace(err=None, confirmation_status=confirmation_status, confirmations=confirmations)
+
+    def get_signature_statuses(self, signatures):
+        return SimpleNamespace(value=[self._status() for _ in signatures])
+
+class FakeAsyncSolanaClient(FakeSolanaClient):
+    """FakeSolanaClient for solana.rpc.async_api.AsyncClient callers."""
+    async def get_latest_blockhash(self):
+        return FakeSolanaClient.get_latest_blockhash(self)
+
+    async def get_multiple_accounts(self, pubkeys):
+        return FakeSolanaClient.get_multiple_accounts(self, pubkeys)
+
+    async def simulate_transaction(self, tx):
+        return FakeSolanaClient.simulate_transaction(self, tx)
+
+    async def send_transaction(self, tx):
+        return FakeSolanaClient.send_transaction(self, tx)
+
+    async def get_signature_statuses(self, signatures):
+        return FakeSolanaClient.get_signature_statuses(self, signatures)
+
+def attach_client(driver: SolanaDriver, client, token_accounts: SplAccountCache = None, blockhash=None) -> SolanaDriver:
+    """
+    Points `driver` at `client` with its own blockhash provider and SPL cache (nothing shared with other tests).
+    :param blockhash: Pre-stored in the provider, so blockhash reads stay out of `client.rpcs`.
+    """
+    driver.client = client
+    driver.blockhashes = BlockhashProvider(lambda: driver.client)
+    if blockhash is not None:
+        driver.blockhashes.put(blockhash)
+    driver.token_accounts = token_accounts or SplAccountCache()
+    return driver
+
+def make_driver(client, token_accounts: SplAccountCache = None, blockhash=None) -> SolanaDriver:
+    """Devnet SolanaDriver wired to `client` (see attach_client)."""
+    return attach_client(SolanaDriver(network="devnet"), client, token_accounts, blockhash)
+
+class SolanaKeyMixin:
+    """Gives every test a fresh SOLANA_PRIVATE_KEY (no wallet file on disk)."""
+    def setUp(self):
+        os.environ["SOLANA_PRIVATE_KEY"] = str(Keypair())
+
+    def tearDown(self):
+        os.environ.pop("SOLANA_PRIVATE_KEY", None)
@@ -25,7 +25,7 @@ class TestLevel5Chaos(unittest.TestCase):
     def test_massive_concurrrency_flood(self):
         """
         Tests multi-threaded nonce management.
-        Verified that the _local_nonce fix handles 20 threads at once.
+        Verified that the NonceManager hands out unique nonces to 25 threads at once.
         """
         print("\n[Level 5] 🔥 Chaos Mode: Launching Massive Threaded Flood...")
         results = queue.Queue()
@@ -33,10 +33,8 @@ class TestLevel5Chaos(unittest.TestCase):
         def worker(thread_id):
             try:
                 # We don't actually send to network (too slow/expensive), 
-                # but we trigger the _get_nonce and logging logic.
-                nonce = self.agent._get_nonce()
-                # Mock a fast 'sent' event to increment local nonce
-                self.agent._local_nonce[self.agent.my_address] += 1
+                # but we trigger the reservation logic used by every send.
+                nonce = self.agent.nonce_manager.reserve()
                 results.put((thread_id, nonce, True))
             except Exception as e:
                 results.put((thread_id, None, str(e)))
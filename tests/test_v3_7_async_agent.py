@@ -0,0 +1,115 @@
+import unittest
+import asyncio
+import os
+import threading
+from eth_account import Account
+from iagent_pay.async_agent_pay import AsyncAgentPay
+
+class TestV3_7AsyncAgent(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        for db in ["agent_history.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        # In-process EVM (AsyncEthereumTesterProvider): no network needed
+        self.agent = AsyncAgentPay(treasury_address="0x000000000000000000000000000000000000dEaD", chain_name="LOCAL",
+                                   private_key=Account.create().key.hex(), daily_limit=100.0)
+        await self.agent.connect()
+        w3 = self.agent.w3
+        accounts = await w3.eth.accounts
+        await w3.eth.send_transaction({'from': accounts[0], 'to': self.agent.my_address, 'value': w3.to_wei(10, 'ether')})
+        self.peers = accounts[1:4]
+
+    async def asyncTearDown(self):
+        await self.agent.close()
+
+    async def test_concurrent_payments(self):
+        print("\n[v3.7] ⚡ Testing AsyncAgentPay Concurrent Payments...")
+        w3 = self.agent.w3
+        before = [await w3.eth.get_balance(p) for p in self.peers]
+
+        # A heartbeat task must keep ticking while payments are confirmed
+        ticks = 0
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+        beat = asyncio.create_task(heartbeat())
+        hashes = await asyncio.gather(*(self.agent.pay_agent(p, 0.1) for p in self.peers))
+        beat.cancel()
+
+        self.assertEqual(len(set(hashes)), 3)
+        self.assertGreater(ticks, 0)
+        for i, p in enumerate(self.peers):
+            self.assertEqual(await w3.eth.get_balance(p) - before[i], w3.to_wei(0.1, 'ether'))
+        self.assertAlmostEqual(self.agent.spend_ledger.spent("ETH"), 0.3)
+        rows = self.agent.store.fetchall("SELECT status FROM transactions")
+        self.assertEqual([r[0] for r in rows], ["CONFIRMED"] * 3)
+        print("✅ 3 concurrent payments confirmed without blocking the loop")
+
+    async def test_daily_limit(self):
+        print("\n[v3.7] 🛡️ Testing AsyncAgentPay Daily Limit...")
+        self.agent.set_daily_limit(0.15)
+        await self.agent.pay_agent(self.peers[0], 0.1)
+        with self.assertRaises(ValueError):
+            await self.agent.pay_agent(self.peers[1], 0.1)
+        print("✅ Circuit breaker shared with the sync agent logic")
+
+    async def test_rotate_and_audit_off_the_loop(self):
+        print("\n[v3.7] 🧵 Testing Blocking Work Kept Off the Event Loop...")
+        await self.agent.rotate_rpc() # Local tester: no pool to rotate through
+        self.assertIsNotNone(self.agent.w3)
+
+        loop_thread = threading.get_ident()
+        writers = []
+        log = self.agent._log_transaction
+        def spy(*args, **kwargs):
+            writers.append(threading.get_ident())
+            return log(*args, **kwargs)
+        self.agent._log_transaction = spy
+        await self.agent.pay_agent(self.peers[0], 0.1)
+        self.assertEqual(len(writers), 2) # SENT + CONFIRMED
+        self.assertNotIn(loop_thread, writers)
+        print("✅ rotate_rpc() safe without a pool; audit writes ran in worker threads")
+
+    async def test_token_statuses_and_signing_failure(self):
+        print("\n[v3.7] 🪙 Testing Async pay_token() Audit Statuses...")
+        agent, peer = self.agent, self.peers[0]
+        token_address = Account.create().address
+
+        class Token:
+            """ERC-20 stand-in: transfer() builds a plain 0-value tx to the token address."""
+            class functions:
+                @staticmethod
+                def transfer(to, units):
+                    class Fn:
+                        async def estimate_gas(self, params): return 21000
+                        async def build_transaction(self, params): return {'to': token_address, 'value': 0, **params}
+                    return Fn()
+        agent.chain.tokens = {"USDC": token_address}
+        agent.chain.token_contract = lambda w3, address: Token
+        agent.chain.registry.set_decimals(agent.chain.chain_id, token_address, 6)
+
+        statuses, log = [], agent._log_transaction
+        def spy(tx_hash, recipient, amount, status, **kwargs):
+            statuses.append(status)
+            return log(tx_hash, recipient, amount, status, **kwargs)
+        agent._log_transaction = spy
+        await agent.pay_token(peer, 1.0, token="USDC")
+        self.assertEqual(statuses, ["SENT_USDC", "CONFIRMED_USDC"]) # Same vocabulary as AgentPay
+
+        before = agent.nonce_manager.peek()
+        sign = agent.account.sign_transaction
+        def broken(tx): raise ValueError("signer unavailable")
+        agent.account.sign_transaction = broken
+        try:
+            with self.assertRaises(ValueError):
+                await agent.pay_token(peer, 1.0, token="USDC")
+        finally:
+            agent.account.sign_transaction = sign
+        self.assertEqual(agent.nonce_manager.peek(), before) # Reserved nonce handed back
+        print("✅ SENT_USDC / CONFIRMED_USDC logged; signing error kept no nonce")
+
+if __name__ == "__main__":
+    unittest.main()
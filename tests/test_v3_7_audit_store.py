@@ -0,0 +1,57 @@
+import unittest
+import os
+import tempfile
+import threading
+from iagent_pay.audit_store import AuditStore
+
+class TestV3_7AuditStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = AuditStore(os.path.join(self.tmp.name, "audit.db"))
+        self.store.execute("CREATE TABLE IF NOT EXISTS transactions (timestamp REAL, tx_hash TEXT, amount REAL)")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_wal_and_connection_reuse(self):
+        print("\n[v3.7] 🗄️ Testing Pooled WAL Audit Store...")
+        mode = self.store.fetchone("PRAGMA journal_mode")[0]
+        self.assertEqual(mode.lower(), "wal")
+        # Same thread -> same long-lived connection
+        self.assertIs(self.store.connection(), self.store.connection())
+        print("✅ WAL journal active, connection re-used")
+
+    def test_concurrent_writers(self):
+        print("\n[v3.7] 🔥 Testing Threaded Audit Writes...")
+        def worker(i):
+            for j in range(20):
+                self.store.execute("INSERT INTO transactions VALUES (?, ?, ?)", (float(j), f"0x{i}_{j}", 0.1))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        self.assertEqual(self.store.fetchone("SELECT COUNT(*) FROM transactions")[0], 160)
+        print("✅ 160 rows written from 8 threads without lock errors")
+
+    def test_transaction_rollback_and_dump_load(self):
+        print("\n[v3.7] 📦 Testing Transactions + Dump/Load...")
+        with self.assertRaises(RuntimeError):
+            with self.store.transaction() as c:
+                c.execute("INSERT INTO transactions VALUES (1, '0xROLLED', 1.0)")
+                raise RuntimeError("abort")
+        self.assertIsNone(self.store.fetchone("SELECT 1 FROM transactions WHERE tx_hash = '0xROLLED'"))
+
+        self.store.executemany("INSERT INTO transactions VALUES (?, ?, ?)", [(1.0, "0xA", 1.0), (2.0, "0xB", 2.0)])
+        data = self.store.dump()
+
+        other = AuditStore(os.path.join(self.tmp.name, "copy.db"))
+        other.execute("CREATE TABLE transactions (timestamp REAL, tx_hash TEXT, amount REAL)")
+        other.load(data)
+        self.assertEqual(other.fetchone("SELECT SUM(amount) FROM transactions")[0], 3.0)
+        other.close()
+        print("✅ Rollback honoured and state round-trips through dump/load")
+
+if __name__ == "__main__":
+    unittest.main()
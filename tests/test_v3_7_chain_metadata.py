@@ -0,0 +1,59 @@
+import unittest
+import os
+import tempfile
+from collections import Counter
+from eth_account import Account
+from iagent_pay.agent_pay import AgentPay
+from iagent_pay.chain_metadata import ChainMetadata
+from iagent_pay.token_registry import TokenRegistry
+
+class TestV3_7ChainMetadata(unittest.TestCase):
+    def setUp(self):
+        for db in ["agent_reputation.db", "agent_history.db", "agent_marketplace.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        self.agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex(), daily_limit=100.0)
+        w3 = self.agent.w3
+        w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': self.agent.my_address, 'value': w3.to_wei(5, 'ether')})
+        self.peer = w3.eth.accounts[1]
+
+        # Count RPC methods reaching the provider
+        self.calls = Counter()
+        provider = w3.provider
+        original = provider.make_request
+        def counting(method, params):
+            self.calls[method] += 1
+            return original(method, params)
+        provider.make_request = counting
+        provider._request_func_cache = (None, None)
+
+    def test_chain_id_read_once(self):
+        print("\n[v3.7] 🔗 Testing Chain Metadata Cache...")
+        for _ in range(3):
+            self.agent.pay_agent(self.peer, 0.01)
+        self.assertGreater(self.calls["eth_sendRawTransaction"], 2) # Counter is live
+        self.assertLessEqual(self.calls["eth_chainId"], 1)
+        print(f"✅ 3 payments, {self.calls['eth_chainId']} eth_chainId call(s)")
+
+    def test_decimals_memoised(self):
+        print("\n[v3.7] 🔢 Testing Token Decimals Cache...")
+        calls = []
+        class FakeCall:
+            def call(self):
+                calls.append(1)
+                return 6
+        class FakeContract:
+            address = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+            class functions:
+                @staticmethod
+                def decimals():
+                    return FakeCall()
+        with tempfile.TemporaryDirectory() as tmp:
+            chain = ChainMetadata(self.agent.chain.chain_id, "ETH", registry=TokenRegistry(os.path.join(tmp, "registry.json")))
+            self.assertEqual([chain.token_decimals(FakeContract) for _ in range(5)], [6] * 5)
+            self.assertEqual(len(calls), 1)
+        print("✅ decimals() read once per token")
+
+if __name__ == "__main__":
+    unittest.main()
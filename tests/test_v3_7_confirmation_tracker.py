@@ -0,0 +1,64 @@
+import unittest
+import threading
+from concurrent.futures import TimeoutError
+from web3 import Web3
+from iagent_pay.confirmation_tracker import ConfirmationTracker, evm_receipt_statuses
+
+class FakeNode:
+    """Records every status call; ids land after `rounds` polls."""
+    def __init__(self, rounds=1, failed=()):
+        self.rounds = rounds
+        self.failed = set(failed)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, ids):
+        with self.lock:
+            self.calls.append(list(ids))
+            if len(self.calls) < self.rounds:
+                return {}
+        return {i: i not in self.failed for i in ids if not i.startswith("lost")}
+
+class TestV3_7ConfirmationTracker(unittest.TestCase):
+    def test_batched_rounds_and_bulk_log(self):
+        print("\n[v3.7] 📡 Testing ConfirmationTracker Batched Polling...")
+        node = FakeNode(rounds=2, failed={"tx7"})
+        logged = []
+        tracker = ConfirmationTracker(node.fetch, on_settled=logged.append, poll_interval=0.01, max_batch=4)
+        ids = [f"tx{i}" for i in range(10)]
+        seen = []
+        futures = [tracker.track(i, callback=lambda tx_id, status: seen.append((tx_id, status))) for i in ids]
+        statuses = [f.result(timeout=5) for f in futures]
+
+        self.assertEqual(statuses.count("CONFIRMED"), 9)
+        self.assertEqual(statuses[7], "FAILED")
+        self.assertTrue(all(len(call) <= 4 for call in node.calls))
+        self.assertLess(len(node.calls), 20) # Rounds, not one loop per tx
+        self.assertEqual(sorted(tx_id for batch in logged for tx_id, _, _ in batch), sorted(ids))
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(tracker.pending, 0)
+        print("✅ 10 ids settled in batched rounds, audit hook called per round")
+
+    def test_timeout(self):
+        print("\n[v3.7] ⏱️ Testing ConfirmationTracker Timeout...")
+        tracker = ConfirmationTracker(FakeNode().fetch, poll_interval=0.01)
+        statuses = tracker.wait(["tx1", "lost1"], timeout=0.1)
+        self.assertEqual(statuses, {"tx1": "CONFIRMED", "lost1": "TIMEOUT"})
+        with self.assertRaises(TimeoutError):
+            tracker.track("lost2", timeout=0.05).result()
+        print("✅ Missing ids time out without blocking the others")
+
+    def test_evm_receipts(self):
+        print("\n[v3.7] 🧾 Testing EVM Receipt Fetcher (eth-tester)...")
+        w3 = Web3(Web3.EthereumTesterProvider())
+        a = w3.eth.accounts
+        hashes = [w3.to_hex(w3.eth.send_transaction({'from': a[0], 'to': a[1], 'value': 1})) for _ in range(3)]
+        tracker = ConfirmationTracker(evm_receipt_statuses(lambda: w3), poll_interval=0.01)
+        unknown = "0x" + "11" * 32
+        statuses = tracker.wait(hashes + [unknown], timeout=0.5)
+        self.assertEqual([statuses[h] for h in hashes], ["CONFIRMED"] * 3)
+        self.assertEqual(statuses[unknown], "TIMEOUT")
+        print("✅ Receipts resolved, unknown hash timed out")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from web3 import Web3
+from iagent_pay.gas_limits import GasLimitCache
+from iagent_pay.confirmation_tracker import ConfirmationTracker, evm_receipt_statuses
+
+USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+ALICE = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+BOB = "0x000000000000000000000000000000000000dEaD"
+
+class TestV3_7GasLimits(unittest.TestCase):
+    def test_learns_after_confident_receipts(self):
+        print("\n[v3.7] 📏 Testing GasLimitCache Learning...")
+        cache = GasLimitCache(margin=0.10, min_samples=3)
+        cold = cache.key(8453, USDC, "transfer", ALICE)
+        self.assertEqual(cold[3], "cold")
+        self.assertIsNone(cache.limit(cold)) # Nothing learned: caller estimates
+        cache.observe(cold, ALICE, 52000, 70000)
+
+        warm = cache.key(8453, USDC, "transfer", ALICE)
+        self.assertEqual(warm[3], "warm") # Paid before: balance slot exists
+        self.assertEqual(cache.key(8453, USDC, "transfer", BOB)[3], "cold")
+        for used in (35000, 35100, 34900):
+            self.assertIsNone(cache.limit(warm))
+            cache.observe(warm, ALICE, used, 50000)
+        # Warm recipients still get the fresh-slot allowance: their balance may be back to zero
+        self.assertEqual(cache.limit(warm), int(35100 * 1.10) + GasLimitCache.COLD_SLOT_GAS)
+
+        stats = {s["recipient"]: s for s in cache.stats()}
+        self.assertEqual(stats["warm"]["hits"], 1)
+        self.assertEqual(stats["warm"]["over_reserved"], 3 * 50000 - (35000 + 35100 + 34900))
+        print(f"✅ Learned warm limit: {cache.limit(warm)} gas")
+
+    def test_unsteady_usage_keeps_estimating(self):
+        print("\n[v3.7] 🎲 Testing GasLimitCache Confidence...")
+        cache = GasLimitCache(max_spread=0.10)
+        key = cache.key(1, USDC, "transfer", ALICE)
+        for used in (30000, 45000, 31000):
+            cache.observe(key, ALICE, used, 60000)
+        self.assertIsNone(cache.limit(cache.key(1, USDC, "transfer", ALICE)))
+        print("✅ Spread too wide: estimate_gas still used")
+
+    def test_cold_floor_and_out_of_gas_reset(self):
+        print("\n[v3.7] 🧊 Testing GasLimitCache Cold Floor + Out-Of-Gas...")
+        cache = GasLimitCache(min_samples=1)
+        warm = (1, USDC.lower(), "transfer", "warm")
+        cold = (1, USDC.lower(), "transfer", "cold")
+        cache.observe(warm, ALICE, 35000, 50000)
+        cache.observe(cold, BOB, 35000, 50000) # BOB was funded elsewhere: looked cold, cost warm
+        self.assertEqual(cache.limit(cold), int(35000 * 1.10) + GasLimitCache.COLD_SLOT_GAS)
+
+        cache.observe(warm, ALICE, 38500, 38500, ok=False) # Ran out of gas
+        self.assertIsNone(cache.limit(warm))
+        self.assertEqual({s["recipient"]: s for s in cache.stats()}["warm"]["out_of_gas"], 1)
+        print("✅ Under-estimate tracked and key re-learned")
+
+    def test_tracker_reports_gas_used(self):
+        print("\n[v3.7] 🧾 Testing Receipt gasUsed Reporting...")
+        w3 = Web3(Web3.EthereumTesterProvider())
+        settled = []
+        tracker = ConfirmationTracker(evm_receipt_statuses(lambda: w3), on_settled=settled.extend, poll_interval=0.01)
+        tx_hash = w3.to_hex(w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': w3.eth.accounts[1], 'value': 1}))
+        self.assertEqual(tracker.track(tx_hash, recipient="x").result(timeout=5), "CONFIRMED")
+        self.assertEqual(settled[0][2]["gas_used"], 21000)
+        self.assertEqual(settled[0][2]["recipient"], "x")
+        print("✅ gasUsed handed to on_settled")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import asyncio
+import os
+import time
+from collections import Counter
+from eth_account import Account
+from iagent_pay.agent_pay import AgentPay
+from iagent_pay.gas_oracle import GasOracle
+
+GWEI = 10 ** 9
+
+class FakeEth:
+    """feeHistory / gasPrice source with a call counter."""
+    def __init__(self, history, gas_price=5 * GWEI):
+        self.history = history
+        self._gas_price = gas_price
+        self.calls = Counter()
+
+    def fee_history(self, blocks, newest, percentiles):
+        self.calls["fee_history"] += 1
+        if isinstance(self.history, Exception):
+            raise self.history # Node without eth_feeHistory
+        return self.history
+
+    def get_block(self, block):
+        self.calls["get_block"] += 1
+        return {} # Pre-London: no baseFeePerGas
+
+    @property
+    def gas_price(self):
+        self.calls["gas_price"] += 1
+        return self._gas_price
+
+    @property
+    def max_priority_fee(self):
+        self.calls["max_priority_fee"] += 1
+        return GWEI
+
+class FakeW3:
+    def __init__(self, eth):
+        self.eth = eth
+
+class FakeAsyncEth:
+    """AsyncWeb3 view of a FakeEth."""
+    def __init__(self, eth):
+        self.sync = eth
+
+    async def fee_history(self, blocks, newest, percentiles):
+        return self.sync.fee_history(blocks, newest, percentiles)
+
+    @property
+    async def gas_price(self):
+        return self.sync.gas_price
+
+class TestV3_7GasOracle(unittest.TestCase):
+    def test_tiers_from_fee_history(self):
+        print("\n[v3.7] ⛽ Testing GasOracle Urgency Tiers...")
+        eth = FakeEth({
+            "baseFeePerGas": [8 * GWEI, 9 * GWEI, 10 * GWEI],
+            "reward": [[1 * GWEI, 2 * GWEI, 5 * GWEI], [1 * GWEI, 3 * GWEI, 6 * GWEI]]
+        })
+        oracle = GasOracle(lambda: FakeW3(eth), ttl=60)
+        slow, normal, fast = (oracle.fee_fields(u) for u in ("slow", "normal", "fast"))
+        self.assertLess(slow["maxPriorityFeePerGas"], normal["maxPriorityFeePerGas"])
+        self.assertLess(normal["maxPriorityFeePerGas"], fast["maxPriorityFeePerGas"])
+        self.assertEqual(normal["maxFeePerGas"], 2 * 10 * GWEI + normal["maxPriorityFeePerGas"]) # Next block's base fee
+        self.assertEqual(oracle.expected_price(normal), 10 * GWEI + normal["maxPriorityFeePerGas"])
+        self.assertEqual(eth.calls["fee_history"], 1) # One sample serves every tier
+        with self.assertRaises(ValueError):
+            oracle.fee_fields("ludicrous")
+        print(f"✅ slow/normal/fast tips: {[f['maxPriorityFeePerGas'] / GWEI for f in (slow, normal, fast)]} Gwei")
+
+    def test_legacy_chain_fallback(self):
+        print("\n[v3.7] 🏚️ Testing GasOracle Legacy Fallback...")
+        eth = FakeEth({"baseFeePerGas": [], "reward": []})
+        oracle = GasOracle(lambda: FakeW3(eth))
+        self.assertEqual(oracle.fee_fields(), {"gasPrice": int(5 * GWEI * 1.10)})
+        print("✅ Pre-London chain gets gasPrice")
+
+    def test_node_without_fee_history(self):
+        print("\n[v3.7] 🧱 Testing GasOracle on a Node without eth_feeHistory...")
+        eth = FakeEth(ValueError({"code": -32601, "message": "the method eth_feeHistory does not exist/is not available"}))
+        oracle = GasOracle(lambda: FakeW3(eth))
+        self.assertEqual(oracle.fee_fields("fast"), {"gasPrice": int(5 * GWEI * 1.10)})
+        self.assertEqual(oracle.expected_price(oracle.fee_fields()), int(5 * GWEI * 1.10))
+        self.assertEqual(eth.calls["fee_history"], 1) # Legacy sample cached like any other
+
+        async_oracle = GasOracle(lambda: FakeW3(FakeAsyncEth(eth)))
+        self.assertEqual(asyncio.run(async_oracle.fee_fields_async()), {"gasPrice": int(5 * GWEI * 1.10)})
+        print("✅ Payment priced from gasPrice instead of failing")
+
+    def test_stale_sample_refreshed_in_background(self):
+        print("\n[v3.7] 🔄 Testing GasOracle Background Refresh...")
+        eth = FakeEth({"baseFeePerGas": [GWEI], "reward": [[GWEI, GWEI, GWEI]]})
+        oracle = GasOracle(lambda: FakeW3(eth), ttl=0.05)
+        oracle.fee_fields()
+        time.sleep(0.1)
+        eth.history = {"baseFeePerGas": [4 * GWEI], "reward": [[GWEI, GWEI, GWEI]]}
+        self.assertEqual(oracle.fee_fields()["maxFeePerGas"], 3 * GWEI) # Stale value served immediately
+        deadline = time.monotonic() + 2
+        while oracle._sample["base_fee"] != 4 * GWEI and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(oracle.fee_fields()["maxFeePerGas"], 9 * GWEI)
+        print("✅ Payment path never waited for feeHistory")
+
+    def test_agent_sends_type2_with_one_sample(self):
+        print("\n[v3.7] 🧾 Testing EIP-1559 Payments...")
+        for db in ["agent_reputation.db", "agent_history.db", "agent_marketplace.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex(), daily_limit=100.0)
+        agent.gas.ttl = 60 # Tester mines a block per tx; keep one sample for the whole test
+        w3 = agent.w3
+        w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': agent.my_address, 'value': w3.to_wei(5, 'ether')})
+
+        calls = Counter()
+        provider = w3.provider
+        original = provider.make_request
+        def counting(method, params):
+            calls[method] += 1
+            return original(method, params)
+        provider.make_request = counting
+        provider._request_func_cache = (None, None)
+
+        hashes = [agent.pay_agent(w3.eth.accounts[1], 0.01, urgency=u) for u in ("slow", "normal", "fast")]
+        for tx_hash in hashes:
+            self.assertEqual(w3.eth.get_transaction(tx_hash)["type"], 2)
+        self.assertEqual(calls["eth_feeHistory"], 1)
+        self.assertEqual(calls["eth_gasPrice"], 0)
+
+        with self.assertRaises(ValueError) as cm:
+            agent.pay_agent(w3.eth.accounts[1], 0.01, max_gas_gwei=0.000001)
+        self.assertIn("exceeds limit", str(cm.exception))
+        print(f"✅ 3 type-2 payments, {calls['eth_feeHistory']} eth_feeHistory call")
+
+if __name__ == "__main__":
+    unittest.main()
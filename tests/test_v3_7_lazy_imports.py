@@ -0,0 +1,40 @@
+import unittest
+import subprocess
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("web3", "solana", "solders", "spl", "eth_account")
+
+def loaded_after(statement):
+    """Heavy top-level packages present in sys.modules after `statement` (fresh interpreter)."""
+    code = f"{statement}\nimport sys\nprint(' '.join(sorted({{m.split('.')[0] for m in sys.modules}} & set({HEAVY!r}))))"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=ROOT)
+    if out.returncode != 0:
+        raise AssertionError(out.stderr)
+    return out.stdout.strip().splitlines()[-1].split() if out.stdout.strip() else []
+
+class TestV3_7LazyImports(unittest.TestCase):
+    def test_package_import_is_light(self):
+        print("\n[v3.7] 🪶 Testing Lazy Package Imports...")
+        self.assertEqual(loaded_after("import iagent_pay"), [])
+        self.assertEqual(loaded_after("from iagent_pay import AgentPay, AsyncAgentPay, YieldManager, PricingManager"), [])
+        self.assertEqual(loaded_after("from iagent_pay import WalletManager"), ["eth_account"])
+        print("✅ No web3 / solana stack loaded until an agent connects")
+
+    def test_lazy_exports_resolve(self):
+        print("\n[v3.7] 🔗 Testing Lazy Exports...")
+        import iagent_pay
+        from iagent_pay.agent_pay import AgentPay
+        self.assertIs(iagent_pay.AgentPay, AgentPay)
+        self.assertTrue(set(iagent_pay.__all__) <= set(dir(iagent_pay)))
+        with self.assertRaises(AttributeError):
+            iagent_pay.NotAThing
+        from web3 import Web3
+        from iagent_pay.yield_protocols import BASE_AAVE_V3_POOL
+        self.assertEqual(Web3.to_checksum_address(BASE_AAVE_V3_POOL), BASE_AAVE_V3_POOL) # Literal stays a valid checksum
+        print("✅ Exports load on first access")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import os
+from eth_account import Account
+from iagent_pay.agent_pay import AgentPay
+from iagent_pay.pricing import PricingManager
+
+LAZY = ["pricing", "social", "swap_engine", "invoices", "yield_manager", "reputation", "marketplace"]
+
+class TestV3_7LazyStartup(unittest.TestCase):
+    def setUp(self):
+        for db in ["agent_reputation.db", "agent_history.db", "agent_marketplace.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+
+    def test_subsystems_built_on_first_use(self):
+        print("\n[v3.7] 💤 Testing Lazy Subsystems...")
+        agent = AgentPay(treasury_address="0x000000000000000000000000000000000000dEaD", chain_name="LOCAL",
+                         private_key=Account.create().key.hex())
+        for name in LAZY:
+            self.assertNotIn(name, agent.__dict__, f"{name} built at startup")
+        self.assertIsNone(agent.license._thread) # License refresher waits for the first payment
+        self.assertEqual(agent.treasury_address, "0x000000000000000000000000000000000000dEaD")
+        self.assertFalse(os.path.exists("agent_reputation.db"))
+
+        reputation = agent.reputation
+        self.assertIs(agent.reputation, reputation) # Built once
+        self.assertTrue(os.path.exists("agent_reputation.db"))
+        print("✅ Managers built on first access only")
+
+    def test_treasury_deferred(self):
+        print("\n[v3.7] 🏦 Testing Deferred Treasury Resolution...")
+        calls = []
+        original = PricingManager.get_config
+        def counting(pricing):
+            calls.append(1)
+            return {"treasury": {"EVM": "0xTreasury", "SOLANA": "SoLTreasury"}}
+        PricingManager.get_config = counting
+        try:
+            agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex())
+            self.assertEqual(len(calls), 0) # No config read at construction
+            self.assertEqual(agent.treasury_address, "0xTreasury")
+            self.assertEqual(agent.treasury_address, "0xTreasury")
+            self.assertEqual(len(calls), 1)
+        finally:
+            PricingManager.get_config = original
+        print("✅ Treasury read from config on first use")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import os
+import time
+from eth_account import Account
+from iagent_pay.agent_pay import AgentPay
+from iagent_pay.license_manager import LicenseManager
+
+class CountingConfig:
+    def __init__(self, fee=0.0001):
+        self.fee = fee
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("price APIs down")
+        return {"trial_days": 14, "pay_per_use_price_eth": self.fee, "subscription_price_eth": 0.01}
+
+class TestV3_7LicenseCache(unittest.TestCase):
+    def test_snapshot_and_background_refresh(self):
+        print("\n[v3.7] 🪪 Testing LicenseManager Snapshot...")
+        config = CountingConfig()
+        started = time.time() - 20 * 86400
+        lookups = []
+        def first_tx():
+            lookups.append(1)
+            return started
+        manager = LicenseManager(config, first_tx, lambda cfg: True, refresh_interval=0.05)
+
+        status = manager.status()
+        self.assertTrue(status["pro"])
+        self.assertAlmostEqual(status["days_remaining"], -6, places=2)
+        for _ in range(100):
+            manager.status()
+        self.assertEqual(config.calls, 1) # Reads never refetch
+
+        manager.start()
+        config.fee = 0.0002
+        deadline = time.monotonic() + 2
+        while manager.status()["fee_eth"] != 0.0002 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(manager.status()["fee_eth"], 0.0002)
+
+        config.fail = True
+        calls = config.calls
+        while config.calls == calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(manager.status()["fee_eth"], 0.0002) # Failed refresh keeps the last snapshot
+        manager.stop()
+        self.assertEqual(len(lookups), 1) # Trial start found once, never looked up again
+        print("✅ One config fetch per refresh, none per payment")
+
+    def test_failed_first_refresh_retried_inline(self):
+        print("\n[v3.7] 🔁 Testing Failed First License Refresh...")
+        config = CountingConfig()
+        config.fail = True
+        started = time.time() - 30 * 86400
+        manager = LicenseManager(config, lambda: started, refresh_interval=300)
+        manager.start()
+        self.assertIsNone(manager.current()) # Refresher failed, inline retry failed too
+        self.assertEqual(config.calls, 2)
+
+        config.fail = False # APIs back long before the next background round
+        status = manager.status()
+        self.assertEqual(status["trial_start"], started) # Not mistaken for a brand-new user
+        self.assertGreater(status["days_active"], status["trial_days"])
+        self.assertEqual(config.calls, 3)
+        manager.status()
+        self.assertEqual(config.calls, 3) # Snapshot in hand: back to memory reads
+        manager.stop()
+        print("✅ No snapshot -> retried on the next read instead of failing open")
+
+    def test_payments_skip_license_io(self):
+        print("\n[v3.7] ⚡ Testing License Check Off the Hot Path...")
+        for db in ["agent_reputation.db", "agent_history.db", "agent_marketplace.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex(), daily_limit=100.0)
+        w3 = agent.w3
+        w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': agent.my_address, 'value': w3.to_wei(5, 'ether')})
+        agent.license.start() # What the first payment does
+        agent.license.current()
+
+        config = CountingConfig()
+        agent.license.get_config = config
+        agent.license.first_tx_time = lambda: self.fail("trial start looked up on the payment path")
+        for _ in range(3):
+            agent.pay_agent(w3.eth.accounts[1], 0.01, wait=False)
+        self.assertEqual(config.calls, 0)
+        print("✅ 3 payments, 0 pricing fetches")
+
+    def test_refresher_starts_on_first_payment(self):
+        print("\n[v3.7] 💤 Testing License Refresher Lifecycle...")
+        for db in ["agent_reputation.db", "agent_history.db", "agent_marketplace.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        os.environ["IAGENT_LICENSE_KEY"] = "0x" + "ab" * 32
+        try:
+            agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex(), daily_limit=100.0)
+            self.assertIsNone(agent.license._thread) # Nothing running for an agent that never pays
+            w3 = agent.w3
+            w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': agent.my_address, 'value': w3.to_wei(1, 'ether')})
+            agent.pay_agent(w3.eth.accounts[1], 0.01, wait=False)
+            self.assertTrue(agent.license._thread.is_alive())
+            agent.close()
+            agent.license._thread.join(timeout=5)
+            self.assertFalse(agent.license._thread.is_alive())
+
+            agent.w3 = None # e.g. a Solana agent: no EVM connection to verify against
+            self.assertFalse(agent._verify_pro_subscription({"treasury_address": agent.my_address}))
+        finally:
+            os.environ.pop("IAGENT_LICENSE_KEY", None)
+        print("✅ Refresher started by the first payment, stopped by close()")
+
+if __name__ == "__main__":
+    unittest.main()
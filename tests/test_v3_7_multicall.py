@@ -0,0 +1,133 @@
+import unittest
+import os
+import tempfile
+from collections import Counter
+from eth_abi import encode
+from eth_account import Account
+from iagent_pay.agent_pay import AgentPay
+from iagent_pay.multicall import Multicall, address_call, decode_uint, BALANCE_OF, DECIMALS
+from iagent_pay.token_registry import TokenRegistry
+
+# Canonical Multicall3 ABI (the two functions AgentPay uses), as published at https://www.multicall3.com
+MULTICALL3_ABI = [
+    {"type": "function", "name": "aggregate3", "stateMutability": "payable",
+     "inputs": [{"name": "calls", "type": "tuple[]", "components": [
+         {"name": "target", "type": "address"}, {"name": "allowFailure", "type": "bool"}, {"name": "callData", "type": "bytes"}]}],
+     "outputs": [{"name": "returnData", "type": "tuple[]", "components": [
+         {"name": "success", "type": "bool"}, {"name": "returnData", "type": "bytes"}]}]},
+    {"type": "function", "name": "getEthBalance", "stateMutability": "view",
+     "inputs": [{"name": "addr", "type": "address"}], "outputs": [{"name": "balance", "type": "uint256"}]},
+]
+
+class FakeContracts:
+    """
+    Answers eth_call at the contract-call level: Multicall3 (decoded with its real ABI) and ERC-20 stubs.
+    Everything else (balances, blocks) goes to the in-process chain.
+    """
+    def __init__(self, w3, multicall_address):
+        self.w3 = w3
+        self.multicall = w3.eth.contract(address=multicall_address, abi=MULTICALL3_ABI)
+        self.tokens = {} # address -> {calldata: return data}; an address mapped to None always reverts
+        self.calls = Counter()
+        provider = w3.provider
+        self.original = provider.make_request
+        provider.make_request = self.make_request
+        provider._request_func_cache = (None, None)
+
+    def add_token(self, balance: int, decimals: int, owner: str) -> str:
+        address = Account.create().address
+        self.tokens[address.lower()] = {address_call(BALANCE_OF, owner): encode(["uint256"], [balance]),
+                                        DECIMALS: encode(["uint8"], [decimals])}
+        return address
+
+    def add_reverter(self) -> str:
+        address = Account.create().address
+        self.tokens[address.lower()] = None
+        return address
+
+    def _call(self, target: str, data: bytes):
+        """(success, return data) of one call to a stub."""
+        if target.lower() == self.multicall.address.lower():
+            fn, args = self.multicall.decode_function_input(data)
+            if fn.fn_name == "getEthBalance":
+                balance = self.original("eth_getBalance", [args["addr"], "latest"])["result"] # Inside the eth_call: not counted
+                return True, encode(["uint256"], [int(balance, 16) if isinstance(balance, str) else balance])
+            results = []
+            for call in args["calls"]:
+                ok, answer = self._call(call["target"], call["callData"])
+                if not ok and not call["allowFailure"]:
+                    return False, b""
+                results.append((ok, answer))
+            return True, encode(["(bool,bytes)[]"], [results])
+        if target.lower() not in self.tokens:
+            return True, b"" # No code at the address
+        answers = self.tokens[target.lower()]
+        if answers is None or bytes(data) not in answers:
+            return False, b""
+        return True, answers[bytes(data)]
+
+    def make_request(self, method, params):
+        self.calls[method] += 1
+        if method != "eth_call":
+            return self.original(method, params)
+        tx = params[0]
+        ok, data = self._call(tx["to"], bytes.fromhex(tx["data"][2:]))
+        if not ok:
+            return {"jsonrpc": "2.0", "id": 0, "error": {"code": 3, "message": "execution reverted", "data": "0x"}}
+        return {"jsonrpc": "2.0", "id": 0, "result": "0x" + data.hex()}
+
+class TestV3_7Multicall(unittest.TestCase):
+    def setUp(self):
+        for db in ["agent_reputation.db", "agent_history.db", "agent_marketplace.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        self.agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex(), daily_limit=100.0)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.agent.chain.registry = TokenRegistry(os.path.join(self.tmp.name, "token_registry.json")) # Keep ~ untouched
+        w3 = self.agent.w3
+        w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': self.agent.my_address, 'value': w3.to_wei(2, 'ether')})
+        self.multicall = Account.create().address
+        self.chain = FakeContracts(w3, self.multicall)
+        owner = self.agent.my_address
+        self.usdc = self.chain.add_token(12_500_000, 6, owner)
+        self.dai = self.chain.add_token(3 * 10 ** 18, 18, owner)
+        self.ausdc = self.chain.add_token(1_000_000, 6, owner)
+        self.broken = self.chain.add_reverter()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_aggregate3(self):
+        print("\n[v3.7] 🧮 Testing Multicall3 aggregate3...")
+        mc = Multicall(self.agent.w3, self.multicall, max_calls=2)
+        results = mc.aggregate3([(a, address_call(BALANCE_OF, self.agent.my_address)) for a in (self.usdc, self.broken, self.dai)])
+        self.assertEqual([decode_uint(r) for r in results], [12_500_000, None, 3 * 10 ** 18])
+        self.assertEqual(self.chain.calls["eth_call"], 2) # Chunks of max_calls
+        with self.assertRaises(ValueError):
+            Multicall(self.agent.w3, Account.create().address).aggregate3([(self.usdc, b"")])
+        print("✅ Failed call isolated, chunks merged")
+
+    def test_portfolio_in_one_call(self):
+        print("\n[v3.7] 💼 Testing get_portfolio()...")
+        agent = self.agent
+        agent.MULTICALL3_ADDRESS = self.multicall
+        agent.chain.tokens = {"USDC": self.usdc, "DAI": self.dai, "BROKEN": self.broken}
+        agent.yield_manager.atoken_map = {agent.chain_name: {"USDC": self.ausdc}}
+        calls = self.chain.calls
+        calls.clear()
+
+        portfolio = agent.get_portfolio()
+        self.assertEqual(portfolio, {agent.chain.native_symbol: 2.0, "USDC": 12.5, "DAI": 3.0, "aUSDC": 1.0})
+        self.assertEqual(calls["eth_call"], 1) # Decimals came in the same call
+        self.assertEqual(agent.chain.registry.get_decimals(agent.chain.chain_id, self.usdc), 6)
+        self.assertEqual(agent.get_portfolio(), portfolio)
+        self.assertEqual(calls["eth_call"], 2)
+        self.assertEqual(calls["eth_getBalance"], 0) # Native balance came through getEthBalance
+
+        agent.MULTICALL3_ADDRESS = Account.create().address # Not deployed: one call per balance
+        self.assertEqual(agent.get_portfolio(), portfolio)
+        print(f"✅ {len(portfolio)} balances per eth_call")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+import threading
+from types import SimpleNamespace
+from iagent_pay.nonce_manager import NonceManager
+
+class FakeChain:
+    """Stands in for eth_getTransactionCount('pending' / 'latest') and eth_getTransactionByHash."""
+    def __init__(self, pending=0):
+        self.pending = pending
+        self.mined = pending
+        self.known = set()
+        self.calls = 0
+
+    def count(self):
+        self.calls += 1
+        return self.pending
+
+    def latest(self):
+        return self.mined
+
+    def has_tx(self, tx_hash):
+        return tx_hash in self.known
+
+class TestV3_7NonceManager(unittest.TestCase):
+    def test_threaded_reservation_is_unique_and_offline(self):
+        print("\n[v3.7] 🔢 Testing Atomic Nonce Reservation...")
+        chain = FakeChain(pending=7)
+        nm = NonceManager(chain.count, resync_interval=0)
+        nonces = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(40):
+                n = nm.reserve()
+                with lock: nonces.append(n)
+
+        threads = [threading.Thread(target=worker) for _ in range(25)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        self.assertEqual(sorted(nonces), list(range(7, 7 + 1000)))
+        self.assertEqual(chain.calls, 1) # Only the initial sync hit the network
+        print("✅ 1000 unique consecutive nonces, 1 RPC call")
+
+    def test_release_refills_gap_first(self):
+        print("\n[v3.7] 🩹 Testing Nonce Release / Gap Refill...")
+        nm = NonceManager(FakeChain(pending=0).count, resync_interval=0)
+        a, b, c = nm.reserve(), nm.reserve(), nm.reserve()
+        nm.mark_broadcast(a)
+        nm.mark_broadcast(c)
+        nm.release(b) # Never broadcast
+        self.assertEqual(nm.peek(), b)
+        self.assertEqual(nm.reserve(), b)
+        self.assertEqual(nm.reserve(), 3)
+
+        # Releasing the top nonce just rewinds the counter
+        top = nm.reserve()
+        nm.release(top)
+        self.assertEqual(nm.reserve(), top)
+        print("✅ Released nonces are re-issued before new ones")
+
+    def test_resync_detects_dropped_transactions(self):
+        print("\n[v3.7] 📡 Testing Resync Gap Detection...")
+        chain = FakeChain(pending=10)
+        nm = NonceManager(chain.count, resync_interval=0, lost_after=0, fetch_mined_count=chain.latest, tx_known=chain.has_tx)
+        for n in nm.reserve_many(5): # 10..14
+            nm.mark_broadcast(n, f"0x{n}")
+
+        # Node only knows 10 and 11; 12..14 fell out of the mempool
+        chain.pending = 12
+        chain.known = {"0x10", "0x11"}
+        nm.resync()
+        self.assertEqual([nm.reserve(), nm.reserve(), nm.reserve(), nm.reserve()], [12, 13, 14, 15])
+
+        # Someone else used the wallet: network moved past us
+        chain.pending = 40
+        nm.fail(16, Exception("nonce too low"))
+        self.assertEqual(nm.reserve(), 40)
+        print("✅ Dropped nonces refilled, stale counter fast-forwarded")
+
+    def test_live_transactions_keep_their_nonce(self):
+        print("\n[v3.7] 🛡️ Testing Lost-Nonce Verification...")
+        chain = FakeChain(pending=5)
+        nm = NonceManager(chain.count, resync_interval=0, lost_after=0, fetch_mined_count=chain.latest, tx_known=chain.has_tx)
+        for n in nm.reserve_many(4): # 5..8
+            nm.mark_broadcast(n, f"0x{n}")
+        nm.mark_broadcast(9) # Hash never recorded: cannot be checked
+        nm.reserve()
+
+        # This node's pending count lags: 5 mined, 6 alive elsewhere, 7 and 9 unverifiable/unknown, 8 gone
+        chain.mined = 6
+        chain.known = {"0x6", "0x7"}
+        nm.resync()
+        self.assertEqual(nm.reserve(), 8) # Only the nonce whose tx is provably gone comes back
+        self.assertEqual(nm.reserve(), 10)
+
+        # Replacement moved nonce 6 to a new hash: the check follows it
+        nm.mark_broadcast(6, "0x6b")
+        chain.known = {"0x6b", "0x7"}
+        nm.resync()
+        self.assertEqual(nm.reserve(), 11)
+
+        # Without the checks, a broadcast nonce is never re-issued
+        blind = NonceManager(FakeChain(pending=0).count, resync_interval=0, lost_after=0)
+        blind.mark_broadcast(blind.reserve(), "0xa")
+        blind.resync()
+        self.assertEqual(blind.reserve(), 1)
+        print("✅ Broadcast nonces only re-issued when neither mined nor known by hash")
+
+    def test_already_known_is_a_broadcast(self):
+        print("\n[v3.7] 🔁 Testing 'already known' Handling...")
+        chain = FakeChain(pending=3)
+        nm = NonceManager(chain.count, resync_interval=0, lost_after=0)
+        n = nm.reserve()
+        self.assertFalse(nm.fail(n, Exception("already known"), tx_hash="0xabc")) # Hedged duplicate
+        self.assertEqual(chain.calls, 1) # No resync
+        self.assertEqual(nm.lost_candidates(), [(3, "0xabc")]) # Tracked like any broadcast
+        self.assertEqual(nm.reserve(), 4) # Nonce stays taken
+        print("✅ Duplicate send counted as broadcast, nonce kept")
+
+    def test_pay_token_build_failure_releases_nonce(self):
+        print("\n[v3.7] 🧯 Testing pay_token() Build Failure...")
+        from eth_account import Account
+        from iagent_pay.agent_pay import AgentPay
+
+        class BrokenToken:
+            """ERC-20 stand-in whose transfer() cannot be built (e.g. the node rejects the eth_call)."""
+            address = Account.create().address
+            class functions:
+                @staticmethod
+                def decimals():
+                    return SimpleNamespace(call=lambda: 6)
+                @staticmethod
+                def transfer(to, units):
+                    def fail(*args): raise ValueError("execution reverted")
+                    return SimpleNamespace(estimate_gas=fail, build_transaction=fail)
+
+        agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex(), daily_limit=100.0)
+        agent.chain.tokens = {"USDC": BrokenToken.address}
+        agent.chain.token_contract = lambda w3, address: BrokenToken
+        agent.chain.token_decimals = lambda contract: 6
+        before = agent.nonce_manager.peek()
+        with self.assertRaises(ValueError):
+            agent.pay_token(agent.w3.eth.accounts[1], 1.0, token="USDC")
+        self.assertEqual(agent.nonce_manager.peek(), before) # Handed back, no hole
+        print("✅ Unbuilt token transfer returned its nonce")
+
+    def test_manager_does_not_pin_its_agent(self):
+        print("\n[v3.7] 🧹 Testing Agent Lifetime vs. Nonce Registry...")
+        import gc, weakref, time
+        from eth_account import Account
+        from iagent_pay.agent_pay import AgentPay
+
+        agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex())
+        nm = agent.nonce_manager
+        nm.resync_interval = 0.01
+        w3 = agent.w3
+        w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': agent.my_address, 'value': w3.to_wei(1, 'ether')})
+        agent.pay_agent(w3.eth.accounts[1], 0.01) # Starts the background resync
+        self.assertIsNotNone(nm._resync_thread)
+        alive = weakref.ref(agent)
+        agent.close()
+        deadline = time.monotonic() + 2
+        while agent.confirmations._thread is not None and time.monotonic() < deadline:
+            time.sleep(0.01) # Receipt poller exits one round after the last receipt
+        del agent, w3
+        gc.collect()
+        self.assertIsNone(alive()) # Only weak proxies point back at the agent
+        while nm._resync_thread is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNone(nm._resync_thread) # Owner gone: resync thread ended
+        print("✅ Agent collected, its resync thread stopped")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+from eth_account import Account
+from iagent_pay.agent_pay import AgentPay
+
+class TestV3_7PayMany(unittest.TestCase):
+    def setUp(self):
+        for db in ["agent_reputation.db", "agent_history.db", "agent_marketplace.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        # In-process EVM (eth-tester): real signing, nonces and receipts without a network
+        self.agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex(), daily_limit=100.0)
+        w3 = self.agent.w3
+        w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': self.agent.my_address, 'value': w3.to_wei(50, 'ether')})
+        self.peers = w3.eth.accounts[1:6]
+
+    def test_batch_payout(self):
+        print("\n[v3.7] 📦 Testing pay_many() Batch Payout...")
+        w3 = self.agent.w3
+        before = [w3.eth.get_balance(p) for p in self.peers]
+        payments = [{"recipient": p, "amount": 0.01 * (i + 1)} for i, p in enumerate(self.peers)]
+        payments.append({"recipient": "not-an-address", "amount": 0.01})
+        payments.append({"recipient": self.peers[0], "amount": 1.0, "token": "NOPE"})
+
+        results = self.agent.pay_many(payments)
+
+        self.assertEqual([r["status"] for r in results], ["CONFIRMED"] * 5 + ["REJECTED", "REJECTED"])
+        nonces = [r["nonce"] for r in results[:5]]
+        self.assertEqual(nonces, list(range(nonces[0], nonces[0] + 5)))
+        for i, p in enumerate(self.peers):
+            self.assertEqual(w3.eth.get_balance(p) - before[i], w3.to_wei(0.01 * (i + 1), 'ether'))
+        self.assertAlmostEqual(self.agent.spend_ledger.spent("ETH"), 0.15)
+        print("✅ 5 payments confirmed with consecutive nonces, bad rows rejected individually")
+
+    def test_batch_respects_daily_limit(self):
+        print("\n[v3.7] 🛡️ Testing pay_many() Daily Limit on Batch Total...")
+        self.agent.set_daily_limit(0.05)
+        with self.assertRaises(ValueError):
+            self.agent.pay_many([{"recipient": p, "amount": 0.02} for p in self.peers])
+        print("✅ Batch total blocked by the circuit breaker")
+
+    def test_signing_failure_returns_nonces(self):
+        print("\n[v3.7] ✍️ Testing pay_many() Signing Failure...")
+        account = self.agent.w3.eth.account
+        before = self.agent.nonce_manager.peek()
+        original, signed = account.sign_transaction, []
+        def flaky_sign(tx, key):
+            if signed:
+                raise ValueError("signer unavailable") # Second tx of the batch
+            signed.append(tx)
+            return original(tx, key)
+        account.sign_transaction = flaky_sign
+        try:
+            with self.assertRaises(ValueError):
+                self.agent.pay_many([{"recipient": p, "amount": 0.01} for p in self.peers])
+        finally:
+            del account.sign_transaction
+        self.assertEqual(self.agent.nonce_manager.peek(), before) # All five reserved nonces handed back
+        self.assertEqual(self.agent.pay_many([{"recipient": self.peers[0], "amount": 0.01}])[0]["nonce"], before)
+        print("✅ No nonce stranded by a failed signature")
+
+if __name__ == "__main__":
+    unittest.main()
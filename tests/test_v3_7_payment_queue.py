@@ -0,0 +1,74 @@
+import unittest
+import os
+import threading
+from eth_account import Account
+from iagent_pay.agent_pay import AgentPay
+
+class TestV3_7PaymentQueue(unittest.TestCase):
+    def setUp(self):
+        for db in ["agent_reputation.db", "agent_history.db", "agent_marketplace.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        self.agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex(), daily_limit=100.0)
+        w3 = self.agent.w3
+        w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': self.agent.my_address, 'value': w3.to_wei(10, 'ether')})
+        self.peers = w3.eth.accounts[1:5]
+
+    def test_burst_presigned_in_worker_processes(self):
+        print("\n[v3.7] 🏭 Testing Pre-Signing Payment Queue...")
+        w3 = self.agent.w3
+        before = {p: w3.eth.get_balance(p) for p in self.peers}
+        with self.agent.payment_queue(workers=2, chunk_size=8) as q:
+            futures = [q.submit(self.peers[i % 4], 0.001) for i in range(40)]
+            self.assertTrue(q.join(timeout=60))
+        hashes = [f.result() for f in futures]
+
+        self.assertEqual(len(set(hashes)), 40)
+        nonces = sorted(w3.eth.get_transaction(h)["nonce"] for h in hashes)
+        self.assertEqual(nonces, list(range(40))) # Consecutive, no gaps
+        for p in self.peers:
+            self.assertEqual(w3.eth.get_balance(p) - before[p], w3.to_wei(0.01, 'ether'))
+        logged = self.agent.store.fetchone("SELECT COUNT(*) FROM transactions WHERE status = 'SENT'")[0]
+        self.assertEqual(logged, 40)
+        self.assertAlmostEqual(self.agent.spend_ledger.spent("ETH"), 0.04)
+        print("✅ 40 payments signed off-thread and broadcast in nonce order")
+
+    def test_rejects_at_submit(self):
+        print("\n[v3.7] 🚫 Testing Payment Queue Validation...")
+        self.agent.set_daily_limit(0.05)
+        with self.agent.payment_queue(use_processes=False) as q:
+            with self.assertRaises(ValueError):
+                q.submit("0xnot-an-address", 0.01)
+            with self.assertRaises(ValueError):
+                q.submit(self.peers[0], 0.01, token="NOPE")
+            ok = [q.submit(self.peers[0], 0.02) for _ in range(2)]
+            with self.assertRaises(ValueError) as cm: # Queued-but-unsent amounts count toward the limit
+                q.submit(self.peers[0], 0.02)
+            self.assertIn("Daily Spending Limit Exceeded", str(cm.exception))
+        self.assertTrue(all(f.result() for f in ok))
+        print("✅ Bad payments rejected before they reach the pipeline")
+
+    def test_assembler_errors_fail_the_chunk(self):
+        print("\n[v3.7] 🧯 Testing Payment Queue Assembler Errors...")
+        start = self.agent.nonce_manager.peek()
+        q = self.agent.payment_queue(use_processes=False)
+        submit = q._signers.submit
+        def broken(*args, **kwargs):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+        q._signers.submit = broken
+        failed = q.submit(self.peers[0], 0.01)
+        with self.assertRaises(RuntimeError):
+            failed.result(timeout=10)
+        self.assertEqual(self.agent.nonce_manager.peek(), start) # Reserved nonce handed back
+
+        q._signers.submit = submit # Assembler survived: the next payment goes through
+        self.assertTrue(q.submit(self.peers[0], 0.01).result(timeout=10))
+        closer = threading.Thread(target=q.close)
+        closer.start()
+        closer.join(timeout=10)
+        self.assertFalse(closer.is_alive())
+        print("✅ Failed chunk rejected, nonces released, close() does not hang")
+
+if __name__ == "__main__":
+    unittest.main()
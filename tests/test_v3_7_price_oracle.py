@@ -0,0 +1,107 @@
+import unittest
+import json
+import time
+import threading
+import urllib.request
+from collections import Counter
+from iagent_pay.pricing import PricingManager
+from iagent_pay.price_oracle import PriceOracle
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def read(self):
+        return self.body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class FakeApis:
+    """Stands in for urllib.request.urlopen: per-host answers, delays and hit counts."""
+    def __init__(self, prices, delay=0.0, down=()):
+        self.prices = prices # symbol -> (coingecko, coinbase, binance)
+        self.delay = delay
+        self.down = set(down)
+        self.hits = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, url, timeout=None):
+        host = url.split("/")[2]
+        with self._lock:
+            self.hits[host] += 1
+        time.sleep(self.delay)
+        if host in self.down:
+            raise OSError("Network Timeout (Simulated)")
+        if "coingecko" in host:
+            gecko_id = url.split("ids=")[1].split("&")[0]
+            body = {gecko_id: {"usd": self.prices[{"ethereum": "ETH", "solana": "SOL"}[gecko_id]][0]}}
+        elif "coinbase" in host:
+            body = {"data": {"amount": str(self.prices[url.split("/prices/")[1].split("-")[0]][1])}}
+        else:
+            body = {"price": str(self.prices[url.split("symbol=")[1][:-3]][2])}
+        return FakeResponse(json.dumps(body).encode())
+
+class TestV3_7PriceOracle(unittest.TestCase):
+    def setUp(self):
+        self.original_open = urllib.request.urlopen
+
+    def tearDown(self):
+        urllib.request.urlopen = self.original_open
+
+    def test_concurrent_median(self):
+        print("\n[v3.7] 📈 Testing PriceOracle Concurrent Median...")
+        apis = FakeApis({"ETH": (3000, 3010, 2990), "SOL": (150, 151, 149)}, delay=0.3)
+        urllib.request.urlopen = apis
+        oracle = PriceOracle(fallback=lambda s: 1.0)
+        start = time.monotonic()
+        self.assertEqual(oracle.get("ETH"), 3000.0)
+        self.assertLess(time.monotonic() - start, 0.6) # Three 0.3s sources, one wait
+        self.assertEqual(oracle.get("sol"), 150.0)
+        print("✅ 3 sources in one round-trip time")
+
+    def test_ttl_and_staleness(self):
+        print("\n[v3.7] 🧊 Testing PriceOracle TTL / Max Staleness...")
+        apis = FakeApis({"ETH": (3000, 3000, 3000)})
+        urllib.request.urlopen = apis
+        oracle = PriceOracle(fallback=lambda s: 1.0, ttl=0.1, max_stale=0.5)
+        oracle.get("ETH")
+        for _ in range(50):
+            oracle.get("ETH")
+        self.assertEqual(sum(apis.hits.values()), 3) # One fetch (3 sources) for 51 reads
+
+        time.sleep(0.15)
+        apis.prices["ETH"] = (3100, 3100, 3100)
+        self.assertEqual(oracle.get("ETH"), 3000.0) # Stale: served at once, refreshed behind
+        deadline = time.monotonic() + 2
+        while oracle.get("ETH") != 3100.0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(oracle.get("ETH"), 3100.0)
+
+        time.sleep(0.55)
+        apis.prices["ETH"] = (3200, 3200, 3200)
+        self.assertEqual(oracle.get("ETH"), 3200.0) # Past max_stale: caller waits for fresh data
+        print("✅ Fresh from memory, stale refreshed in background, expired refetched")
+
+    def test_fallback_and_native_price(self):
+        print("\n[v3.7] 🩹 Testing Pricing Fallback / get_native_price...")
+        apis = FakeApis({"ETH": (3000, 3000, 3000), "SOL": (150, 150, 150)},
+                        down={"api.coingecko.com", "api.coinbase.com", "api.binance.us"})
+        urllib.request.urlopen = apis
+        pricing = PricingManager()
+        self.assertEqual(pricing.get_native_price("SOL"), 145.0) # On-chain fallback
+        apis.down.clear()
+        self.assertEqual(pricing.get_native_price("SOL"), 150.0) # Fallback was not cached
+        self.assertEqual(pricing.get_native_price(), 3000.0)
+
+        hits = sum(apis.hits.values())
+        config = pricing.get_config()
+        self.assertEqual(config["subscription_price_eth"], round(26.00 / 3000, 6))
+        self.assertEqual(sum(apis.hits.values()), hits) # get_config() reuses the cached ETH price
+        print("✅ Fallback not cached, get_config() free while fresh")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import os
+from eth_account import Account
+from iagent_pay.agent_pay import AgentPay
+
+class TestV3_7Replacement(unittest.TestCase):
+    def setUp(self):
+        for db in ["agent_reputation.db", "agent_history.db", "agent_marketplace.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        self.agent = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex(), daily_limit=100.0)
+        self.agent.replacements.poll_interval = 60 # Rounds are driven by the test
+        w3 = self.agent.w3
+        w3.eth.send_transaction({'from': w3.eth.accounts[0], 'to': self.agent.my_address, 'value': w3.to_wei(5, 'ether')})
+        self.peer = w3.eth.accounts[1]
+        self.tester = w3.provider.ethereum_tester
+        self.tester.disable_auto_mine_transactions() # Our txs stay pending until mine_blocks()
+
+    def tearDown(self):
+        self.tester.enable_auto_mine_transactions()
+
+    def status(self, tx_hash):
+        return self.agent.store.fetchone("SELECT status FROM transactions WHERE tx_hash = ?", (tx_hash,))[0]
+
+    def test_speed_up(self):
+        print("\n[v3.7] 🚀 Testing Stuck Tx Speed-Up...")
+        old = self.agent.pay_agent(self.peer, 0.5, wait=False)
+        old_fee = self.agent.w3.eth.get_transaction(old)["maxFeePerGas"]
+        self.assertEqual(self.agent.replacements.pending, [0])
+
+        new = self.agent.replacements.speed_up(0)
+        self.assertGreaterEqual(self.agent.w3.eth.get_transaction(new)["maxFeePerGas"], int(old_fee * 1.125))
+        self.tester.mine_blocks(1)
+        self.agent.replacements.poll()
+
+        self.assertEqual(self.agent.replacements.pending, [])
+        self.assertEqual(self.status(old), "REPLACED")
+        self.assertEqual(self.status(new), "CONFIRMED")
+        self.assertAlmostEqual(self.agent.spend_ledger.spent("ETH"), 0.5) # Counted once
+        print("✅ Replacement mined, original logged REPLACED")
+
+    def test_cancel(self):
+        print("\n[v3.7] 🛑 Testing Stuck Tx Cancel...")
+        before = self.agent.w3.eth.get_balance(self.peer)
+        old = self.agent.pay_agent(self.peer, 0.5, wait=False)
+        cancel = self.agent.replacements.cancel(0)
+        self.tester.mine_blocks(1)
+        self.agent.replacements.poll()
+
+        self.assertEqual(self.agent.w3.eth.get_balance(self.peer), before)
+        self.assertEqual(self.status(old), "REPLACED")
+        self.assertEqual(self.status(cancel), "CONFIRMED")
+        self.assertAlmostEqual(self.agent.spend_ledger.spent("ETH"), 0.0)
+        print("✅ Payment cancelled with a 0-value self-send")
+
+    def test_auto_bump_after_blocks(self):
+        print("\n[v3.7] ⏱️ Testing Automatic Fee Escalation...")
+        manager = self.agent.replacements
+        manager.stuck_after_blocks = 0
+        self.agent.pay_agent(self.peer, 0.1, wait=False)
+        manager.poll() # First look: remembers the block
+        manager.poll() # Still pending: bump #1
+        self.assertEqual(manager._watched[0]["bumps"], 1)
+        self.assertEqual(len(manager._watched[0]["hashes"]), 2)
+        self.tester.mine_blocks(1)
+        manager.poll()
+        self.assertEqual(manager.pending, [])
+        print("✅ Stuck tx bumped along the fee curve")
+
+    def test_watcher_stops(self):
+        print("\n[v3.7] 🧵 Testing Watcher Shutdown...")
+        manager = self.agent.replacements
+        manager.poll_interval = 0.01
+        self.agent.pay_agent(self.peer, 0.1, wait=False) # Never mined: the watcher would poll forever
+        thread = manager._thread
+        self.agent.close()
+        thread.join(timeout=2)
+        self.assertFalse(thread.is_alive())
+        manager.watch({"nonce": 1}, "0x" + "11" * 32)
+        self.assertIsNone(manager._thread) # Stopped for good
+
+        other = AgentPay(chain_name="LOCAL", private_key=Account.create().key.hex())
+        other.replacements.poll_interval = 0.01
+        other.replacements.watch({"nonce": 0}, "0x" + "00" * 32)
+        thread = other.replacements._thread
+        other.w3 = None # Connection gone
+        thread.join(timeout=2)
+        self.assertFalse(thread.is_alive())
+        print("✅ close() and a dropped connection end the watcher")
+
+if __name__ == "__main__":
+    unittest.main()
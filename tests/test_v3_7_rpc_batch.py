@@ -0,0 +1,73 @@
+import unittest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from web3 import Web3
+from solders.pubkey import Pubkey
+from solders.rpc.requests import GetBalance, SendRawTransaction
+from iagent_pay.rpc_pool import RpcPool
+from iagent_pay.rpc_batch import BatchingProvider, BatchingSolanaProvider
+from test_v3_7_rpc_pool import FakeNode
+
+class FakeSolanaProvider:
+    """Counts round-trips; answers each request with its own id."""
+    def __init__(self):
+        self.round_trips = 0
+        self.lock = threading.Lock()
+
+    def make_request(self, body, parser):
+        with self.lock:
+            self.round_trips += 1
+        return body.id
+
+    def make_batch_request(self, reqs, parsers):
+        with self.lock:
+            self.round_trips += 1
+        return tuple(r.id for r in reqs)
+
+class TestV3_7RpcBatch(unittest.TestCase):
+    def setUp(self):
+        self.node = FakeNode(block=7)
+
+    def tearDown(self):
+        self.node.close()
+
+    def test_concurrent_reads_share_one_batch(self):
+        print("\n[v3.7] 📦 Testing JSON-RPC Batch Transport...")
+        provider = BatchingProvider(RpcPool([self.node.url]), window=0.05)
+        w3 = Web3(provider)
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            blocks = list(pool.map(lambda _: w3.eth.block_number, range(10)))
+        self.assertEqual(blocks, [7] * 10)
+        self.assertEqual(self.node.hits, 1)
+        self.assertEqual(provider.coalescer.batches, 1)
+        print("✅ 10 concurrent reads, 1 HTTP round-trip")
+
+    def test_errors_stay_per_call(self):
+        print("\n[v3.7] 🧾 Testing Batch Error Isolation...")
+        w3 = Web3(BatchingProvider(RpcPool([self.node.url]), window=0.05))
+        def read(i):
+            try:
+                return w3.eth.call({"to": "0x0000000000000000000000000000000000000001", "data": "0x"}) if i == 0 else w3.eth.block_number
+            except Exception as e:
+                return e
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(read, range(4)))
+        self.assertIsInstance(results[0], Exception) # The revert belongs to its caller only
+        self.assertEqual(results[1:], [7] * 3)
+        print("✅ One revert does not fail the batch")
+
+    def test_solana_get_calls_coalesced(self):
+        print("\n[v3.7] ☀️ Testing Solana Batch Transport...")
+        inner = FakeSolanaProvider()
+        provider = BatchingSolanaProvider(inner, window=0.05)
+        owner = Pubkey.default()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ids = list(pool.map(lambda i: provider.make_request(GetBalance(owner, id=i), None), range(8)))
+        self.assertEqual(ids, list(range(8))) # Each caller gets its own answer
+        self.assertEqual(inner.round_trips, 1)
+        provider.make_request(SendRawTransaction(b"\x00", id=99), None) # Writes bypass the batcher
+        self.assertEqual(inner.round_trips, 2)
+        print("✅ 8 concurrent Solana reads, 1 round-trip")
+
+if __name__ == "__main__":
+    unittest.main()
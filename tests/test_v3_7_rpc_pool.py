@@ -0,0 +1,103 @@
+import unittest
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from web3 import Web3
+from iagent_pay.rpc_pool import RpcPool
+
+class FakeNode:
+    """Local JSON-RPC node with a configurable delay; answers eth_blockNumber / eth_chainId."""
+    def __init__(self, delay=0.0, block=100):
+        self.delay = delay
+        self.block = block
+        self.hits = 0
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.hits += 1
+                time.sleep(node.delay)
+                def answer(req):
+                    if req["method"] == "eth_call":
+                        return {"jsonrpc": "2.0", "id": req["id"], "error": {"code": 3, "message": "execution reverted"}}
+                    return {"jsonrpc": "2.0", "id": req["id"], "result": hex(node.block if req["method"] == "eth_blockNumber" else 1337)}
+                payload = [answer(r) for r in body] if isinstance(body, list) else answer(body)
+                data = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def dead_url():
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close() # Nothing listens here anymore
+    return f"http://127.0.0.1:{port}"
+
+class TestV3_7RpcPool(unittest.TestCase):
+    def setUp(self):
+        self.slow = FakeNode(delay=0.3, block=1)
+        self.fast = FakeNode(delay=0.0, block=2)
+
+    def tearDown(self):
+        self.slow.close()
+        self.fast.close()
+
+    def test_routes_to_fastest(self):
+        print("\n[v3.7] 🏎️ Testing RpcPool Latency Routing...")
+        pool = RpcPool([self.slow.url, self.fast.url])
+        pool.probe()
+        w3 = Web3(pool)
+        self.assertEqual(pool.best_url, self.fast.url)
+        self.assertEqual([w3.eth.block_number for _ in range(5)], [2] * 5)
+        print(f"✅ Reads served by the fastest node: {pool.stats()}")
+
+    def test_failover_and_backoff(self):
+        print("\n[v3.7] 🔌 Testing RpcPool Failover + Backoff...")
+        dead = dead_url()
+        pool = RpcPool([dead, self.fast.url], base_backoff=5.0)
+        w3 = Web3(pool)
+        self.assertEqual(w3.eth.block_number, 2) # Dead node tried first (unmeasured), call fails over
+        stats = {s["url"]: s for s in pool.stats()}
+        self.assertFalse(stats[dead]["healthy"])
+        hits = self.fast.hits
+        w3.eth.block_number
+        self.assertEqual(pool.stats()[0]["requests"], 1) # Dead node skipped while backing off
+        self.assertEqual(self.fast.hits, hits + 1)
+        print("✅ Dead node taken out of rotation")
+
+    def test_rpc_errors_are_not_node_failures(self):
+        print("\n[v3.7] 🧾 Testing RpcPool JSON-RPC Error Passthrough...")
+        pool = RpcPool([self.fast.url])
+        with self.assertRaises(Exception):
+            Web3(pool).eth.call({"to": "0x0000000000000000000000000000000000000001", "data": "0x"})
+        self.assertTrue(pool.stats()[0]["healthy"])
+        print("✅ Revert surfaced to the caller, node stays healthy")
+
+    def test_hedged_read(self):
+        print("\n[v3.7] 🪝 Testing RpcPool Hedged Reads...")
+        pool = RpcPool([self.slow.url, self.fast.url], hedge_after=0.05)
+        pool.endpoints[1].latency = 1.0 # Pretend the fast node looked slow so the slow one is primary
+        start = time.monotonic()
+        self.assertEqual(Web3(pool).eth.block_number, 2)
+        self.assertLess(time.monotonic() - start, 0.25)
+        print("✅ Hedge answered before the slow primary")
+
+if __name__ == "__main__":
+    unittest.main()
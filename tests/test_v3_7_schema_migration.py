@@ -0,0 +1,47 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+from iagent_pay.audit_store import AuditStore
+from iagent_pay.schema import migrate
+
+class TestV3_7SchemaMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "agent_history.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_legacy_file_migrates_in_chunks(self):
+        print("\n[v3.7] 🧬 Testing Legacy -> v2 Online Migration...")
+        # Pre-v1.2 layout: no symbol column, one row per status change
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE transactions (timestamp REAL, tx_hash TEXT, recipient TEXT, amount REAL, status TEXT)")
+        rows = []
+        for i in range(7):
+            rows.append((1000.0 + i, f"0x{i}", "0xPEER", 0.1, "SENT"))
+            rows.append((1000.5 + i, f"0x{i}", "0xPEER", 0.1, "CONFIRMED"))
+        conn.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+
+        store = AuditStore(self.path)
+        self.assertEqual(migrate(store, chunk_size=3), 3)
+
+        self.assertEqual(store.fetchone("SELECT COUNT(*) FROM transactions")[0], 7)
+        self.assertEqual(store.fetchone("SELECT COUNT(*) FROM transaction_events")[0], 14)
+        status, ts = store.fetchone("SELECT status, timestamp FROM transactions WHERE tx_hash = '0x3'")
+        self.assertEqual(status, "CONFIRMED")
+        self.assertEqual(ts, 1003.0) # First-seen time is kept
+        indexes = {r[0] for r in store.fetchall("SELECT name FROM sqlite_master WHERE type='index'")}
+        self.assertIn("idx_transactions_symbol_ts", indexes)
+        self.assertIn("idx_transactions_recipient", indexes)
+
+        # Idempotent: a second process starting later is a no-op
+        self.assertEqual(migrate(AuditStore(self.path)), 3)
+        store.close()
+        print("✅ 14 legacy rows -> 7 payments + 14 events, indexes created")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import time
+import tempfile
+from collections import Counter
+from iagent_pay.social_resolver import SocialResolver
+
+class FakeNameService:
+    """ENS/SNS stand-in: agentN.eth / agentN.sol exist, ghost.* does not, flaky.* errors."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = Counter()
+
+    def __call__(self, name):
+        self.calls[name] += 1
+        time.sleep(self.delay)
+        if name.startswith("flaky"):
+            raise ConnectionError("RPC timeout")
+        if name.startswith("ghost"):
+            return None
+        return "0x" + format(abs(hash(name)) % (1 << 160), "040x")
+
+def resolver_with(service, **kwargs):
+    resolver = SocialResolver(**kwargs)
+    resolver._resolve_ens = service
+    resolver._resolve_sns = service
+    return resolver
+
+class TestV3_7SocialCache(unittest.TestCase):
+    def test_repeat_payments_hit_cache(self):
+        print("\n[v3.7] 🏷️ Testing SocialResolver Cache...")
+        service = FakeNameService()
+        resolver = resolver_with(service)
+        names = [f"agent{i}.eth" for i in range(50)]
+        first = [resolver.resolve(n) for n in names]
+        for _ in range(3):
+            self.assertEqual([resolver.resolve(n.upper()) for n in names], first)
+        self.assertEqual(resolver.lookups, 50)
+        self.assertEqual(resolver.resolve("0xAbC"), "0xAbC") # Raw addresses never looked up
+        print("✅ 4 rounds x 50 handles = 50 lookups")
+
+    def test_negative_cache_and_errors(self):
+        print("\n[v3.7] 🚫 Testing Negative Cache...")
+        service = FakeNameService()
+        resolver = resolver_with(service, ttl=60, negative_ttl=0.1)
+        for _ in range(5):
+            self.assertIsNone(resolver.resolve("ghost.sol"))
+            self.assertIsNone(resolver.resolve("flaky.eth"))
+        self.assertEqual(service.calls["ghost.sol"], 1) # Miss remembered
+        self.assertEqual(service.calls["flaky.eth"], 5) # Errors are retried
+        time.sleep(0.15)
+        resolver.resolve("ghost.sol")
+        self.assertEqual(service.calls["ghost.sol"], 2) # Negative TTL expired
+        print("✅ Misses cached briefly, errors never")
+
+    def test_resolve_many_parallel_and_persisted(self):
+        print("\n[v3.7] 📚 Testing resolve_many / Persistence...")
+        path = os.path.join(tempfile.mkdtemp(), "names.json")
+        service = FakeNameService(delay=0.1)
+        resolver = resolver_with(service, cache_path=path)
+        ids = [f"agent{i}.sol" for i in range(20)] + ["agent0.sol", "0xRaw", "ghost.eth"]
+        start = time.monotonic()
+        resolved = resolver.resolve_many(ids)
+        self.assertLess(time.monotonic() - start, 0.5) # 20 x 0.1s lookups, run in parallel
+        self.assertEqual(resolved["0xRaw"], "0xRaw")
+        self.assertIsNone(resolved["ghost.eth"])
+        self.assertEqual(service.calls["agent0.sol"], 1) # Duplicates looked up once
+
+        fresh = FakeNameService()
+        restarted = resolver_with(fresh, cache_path=path)
+        self.assertEqual(restarted.resolve_many(ids), resolved)
+        self.assertEqual(sum(fresh.calls.values()), 0) # Everything came from disk
+        print("✅ 21 handles resolved concurrently, reloaded after restart")
+
+if __name__ == "__main__":
+    unittest.main()
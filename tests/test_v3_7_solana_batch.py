@@ -0,0 +1,96 @@
+import unittest
+import os
+from solders.account import Account as SolanaAccount
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM_ID
+from solders.keypair import Keypair
+from spl.token.constants import TOKEN_PROGRAM_ID, ASSOCIATED_TOKEN_PROGRAM_ID
+from spl.token.instructions import get_associated_token_address
+from iagent_pay.agent_pay import AgentPay
+from iagent_pay.solana_driver import SolanaDriver
+from solana_fakes import FakeSolanaClient, SolanaKeyMixin, attach_client, make_driver, mint_account
+
+class TestV3_7SolanaBatch(SolanaKeyMixin, unittest.TestCase):
+    def test_200_sol_recipients_in_10_txs(self):
+        print("\n[v3.7] 📦 Testing Packed SOL Payouts...")
+        client = FakeSolanaClient()
+        driver = make_driver(client)
+        payments = [{"recipient": str(Keypair().pubkey()), "amount": 0.001 * (i + 1)} for i in range(200)]
+        results = driver.transfer_batch(payments)
+
+        self.assertTrue(all(r["status"] == "CONFIRMED" for r in results))
+        self.assertEqual(client.rpcs.count("send_transaction"), 10)
+        self.assertEqual(client.rpcs.count("get_multiple_accounts"), 0) # SOL only: nothing to look up
+        paid = {}
+        for tx in client.sent:
+            self.assertLessEqual(len(bytes(tx)), SolanaDriver.MAX_TX_SIZE)
+            tx.verify()
+            keys = tx.message.account_keys
+            for ix in tx.message.instructions:
+                if keys[ix.program_id_index] == COMPUTE_BUDGET_PROGRAM_ID:
+                    continue
+                paid[str(keys[ix.accounts[1]])] = int.from_bytes(bytes(ix.data)[4:12], "little")
+        self.assertEqual(paid, {p["recipient"]: int(p["amount"] * 1_000_000_000) for p in payments})
+        print(f"✅ 200 payments -> {client.rpcs.count('send_transaction')} txs")
+
+    def test_spl_batch_creates_missing_atas(self):
+        print("\n[v3.7] 🪙 Testing Packed SPL Payouts + ATA Creation...")
+        mint = Keypair().pubkey()
+        holders = [Keypair().pubkey() for _ in range(12)]
+        newcomers = [Keypair().pubkey() for _ in range(12)]
+        accounts = {mint: mint_account(6)}
+        for owner in holders:
+            accounts[get_associated_token_address(owner, mint)] = SolanaAccount(lamports=1, data=bytes(165), owner=TOKEN_PROGRAM_ID, executable=False, rent_epoch=0)
+        client = FakeSolanaClient(accounts)
+        driver = make_driver(client)
+
+        payments = [{"recipient": str(o), "amount": 1.5, "mint": str(mint)} for o in holders + newcomers]
+        payments.append({"recipient": "not-a-pubkey", "amount": 1.0, "mint": str(mint)})
+        payments.append({"recipient": str(Keypair().pubkey()), "amount": 1.0, "mint": str(Keypair().pubkey())}) # Unknown mint
+        results = driver.transfer_batch(payments)
+
+        self.assertEqual([r["status"] for r in results[-2:]], ["REJECTED", "REJECTED"])
+        self.assertTrue(all(r["status"] == "CONFIRMED" for r in results[:-2]))
+        self.assertEqual(client.rpcs.count("get_multiple_accounts"), 1) # Mints + every recipient ATA in one read
+        self.assertLess(client.rpcs.count("send_transaction"), 24 / 2)
+
+        created, amounts = set(), []
+        for tx in client.sent:
+            self.assertLessEqual(len(bytes(tx)), SolanaDriver.MAX_TX_SIZE)
+            keys = tx.message.account_keys
+            for ix in tx.message.instructions:
+                program = keys[ix.program_id_index]
+                if program == ASSOCIATED_TOKEN_PROGRAM_ID:
+                    self.assertEqual(bytes(ix.data), bytes([1])) # CreateIdempotent
+                    created.add(keys[ix.accounts[2]])
+                elif program == TOKEN_PROGRAM_ID:
+                    amounts.append((bytes(ix.data)[0], int.from_bytes(bytes(ix.data)[1:9], "little"), bytes(ix.data)[9]))
+        self.assertEqual(created, set(newcomers))
+        self.assertEqual(amounts, [(12, 1_500_000, 6)] * 24) # TransferChecked, 1.5 at 6 decimals
+        print(f"✅ 24 SPL payments (12 new ATAs) -> {client.rpcs.count('send_transaction')} txs")
+
+    def test_pay_many_logs_each_payment(self):
+        print("\n[v3.7] 🧾 Testing Solana pay_many() Audit Log...")
+        for db in ["agent_history.db"]:
+            if os.path.exists(db):
+                try: os.remove(db)
+                except: pass
+        agent = AgentPay(chain_name="SOL_DEVNET", daily_limit=100.0)
+        client = FakeSolanaClient()
+        attach_client(agent.solana, client)
+        peers = [str(Keypair().pubkey()) for _ in range(30)]
+        results = agent.pay_many([{"recipient": p, "amount": 0.5} for p in peers] + [{"recipient": peers[0], "amount": 1, "token": "NOPE"}])
+
+        self.assertEqual([r["status"] for r in results], ["CONFIRMED"] * 30 + ["REJECTED"])
+        self.assertEqual(client.rpcs.count("send_transaction"), 2)
+        rows = agent.store.fetchall("SELECT tx_hash, recipient, amount FROM transactions WHERE symbol = 'SOL'")
+        self.assertEqual(len(rows), 30) # One row per payment, not per signature
+        self.assertEqual(sorted(r[1] for r in rows), sorted(peers))
+        self.assertTrue(all(r[0].split("#")[0] in {r2["tx_hash"] for r2 in results} for r in rows))
+        self.assertAlmostEqual(agent.spend_ledger.spent("SOL"), 15.0)
+
+        with self.assertRaises(ValueError): # Daily limit applies to the batch total
+            agent.pay_many([{"recipient": p, "amount": 3.0} for p in peers])
+        print("✅ 30 payments in 2 txs, 30 audit rows, limit enforced on the total")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import threading
+import time
+from solders.hash import Hash
+from solders.keypair import Keypair
+from iagent_pay.blockhash_provider import BlockhashProvider
+from iagent_pay.solana_driver import SolanaDriver
+from solana_fakes import FakeSolanaClient, SolanaKeyMixin, make_driver
+
+class TestV3_7SolanaBlockhash(SolanaKeyMixin, unittest.TestCase):
+    def test_burst_shares_one_blockhash(self):
+        print("\n[v3.7] 🧱 Testing Shared Blockhash across a Burst...")
+        client = FakeSolanaClient(latency=0.01)
+        driver = make_driver(client)
+        to = str(Keypair().pubkey())
+        threads = [threading.Thread(target=driver.transfer, args=(to, 0.001)) for _ in range(20)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        self.assertEqual(len(client.sent), 20)
+        self.assertLessEqual(client.rpcs.count("get_latest_blockhash"), 2) # Inline cold read (+ the prefetcher's first pass at most)
+        self.assertEqual(len({str(tx.message.recent_blockhash) for tx in client.sent}), 1)
+        for tx in client.sent:
+            tx.verify() # Signed with the driver's keypair over the cached hash
+        print(f"✅ 20 transfers, {client.rpcs.count('get_latest_blockhash')} blockhash read(s)")
+
+    def test_shared_per_rpc(self):
+        print("\n[v3.7] 🌐 Testing Process-Wide Provider...")
+        a, b = SolanaDriver(network="devnet"), SolanaDriver(network="devnet")
+        self.assertIs(a.blockhashes, b.blockhashes)
+        self.assertIsNot(a.blockhashes, SolanaDriver(network="testnet").blockhashes)
+        print("✅ One provider per RPC URL")
+
+    def test_prefetch_refreshes_before_expiry(self):
+        print("\n[v3.7] 🔄 Testing Background Prefetch...")
+        client = FakeSolanaClient()
+        provider = BlockhashProvider(lambda: client, refresh_interval=0.1, max_age=0.3, idle_timeout=0.5)
+        first = provider.get()
+        time.sleep(0.35)
+        self.assertIsNotNone(provider.cached()) # Re-read in the background: never aged out
+        self.assertNotEqual(provider.get(), first)
+        self.assertGreaterEqual(client.rpcs.count("get_latest_blockhash"), 3)
+
+        time.sleep(0.8)
+        reads = client.rpcs.count("get_latest_blockhash")
+        time.sleep(0.3)
+        self.assertEqual(client.rpcs.count("get_latest_blockhash"), reads) # Idle: prefetch thread stopped
+        self.assertFalse(provider._thread.is_alive())
+        print("✅ Refreshed ahead of max_age, stopped when idle")
+
+    def test_expired_blockhash_retried(self):
+        print("\n[v3.7] ⌛ Testing Expired Blockhash Retry...")
+        client = FakeSolanaClient(expired_sends=1)
+        driver = make_driver(client)
+        driver.transfer(str(Keypair().pubkey()), 0.001)
+        self.assertEqual(len(client.sent), 1)
+        self.assertGreaterEqual(client.rpcs.count("get_latest_blockhash"), 2) # Invalidated and read again
+        print("✅ 'Blockhash not found' -> fresh hash, one retry")
+
+    def test_identical_transfers_get_distinct_signatures(self):
+        print("\n[v3.7] 👯 Testing Duplicate Message Guard...")
+        client = FakeSolanaClient()
+        driver = make_driver(client)
+        fees = []
+        driver.on_fee = lambda sig, choice: fees.append(choice["compute_unit_price"])
+        driver.blockhashes.put(Hash.new_unique()) # Both sends sign with this hash
+        to = str(Keypair().pubkey())
+        driver.transfer(to, 0.001)
+        driver.transfer(to, 0.001)
+
+        first, second = client.sent
+        self.assertEqual(first.message.recent_blockhash, second.message.recent_blockhash)
+        self.assertNotEqual(first.signatures[0], second.signatures[0])
+        self.assertEqual(fees[1], fees[0] + 1) # Second message changed by 1 µlamport/CU
+        print("✅ Same transfer twice under one hash -> two distinct signatures")
+
+if __name__ == "__main__":
+    unittest.main()
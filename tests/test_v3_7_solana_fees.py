@@ -0,0 +1,74 @@
+import unittest
+import os
+from types import SimpleNamespace
+from solders.keypair import Keypair
+from iagent_pay.agent_pay import AgentPay
+from iagent_pay.solana_fees import SolanaFeeOracle
+from solana_fakes import FakeSolanaClient, SolanaKeyMixin, attach_client, compute_budget
+
+class TestV3_7SolanaFees(SolanaKeyMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        if os.path.exists("agent_history.db"):
+            try: os.remove("agent_history.db")
+            except: pass
+        self.agent = AgentPay(chain_name="SOL_DEVNET")
+        # 100 recent slots: half idle, the rest bidding 20k..2M micro-lamports/CU
+        self.client = FakeSolanaClient(fees=[0] * 50 + [20_000 * (i + 1) for i in range(50)], units=450)
+        attach_client(self.agent.solana, self.client)
+
+    def test_urgency_tiers(self):
+        print("\n[v3.7] ⛽ Testing Solana Priority Fee Tiers...")
+        oracle = SolanaFeeOracle(lambda: self.client)
+        self.assertEqual(oracle.unit_price("slow"), SolanaFeeOracle.MIN_UNIT_PRICE["slow"]) # 25th pct is an idle slot: floor
+        self.assertEqual(oracle.unit_price("normal"), 20_000)
+        self.assertEqual(oracle.unit_price("fast"), 820_000)
+        self.assertEqual(self.client._provider.calls, 1) # One sample serves every call within the TTL
+        with self.assertRaises(ValueError):
+            oracle.unit_price("ludicrous")
+
+        capped = SolanaFeeOracle(lambda: FakeSolanaClient(fees=[50_000_000] * 10))
+        self.assertEqual(capped.unit_price("fast"), SolanaFeeOracle.MAX_UNIT_PRICE)
+        broken = SolanaFeeOracle(lambda: SimpleNamespace()) # No RPC: bid the tier floor, do not block the payment
+        self.assertEqual(broken.unit_price("fast"), SolanaFeeOracle.MIN_UNIT_PRICE["fast"])
+        print("✅ Percentile bids with floors and cap")
+
+    def test_send_sets_compute_budget_and_logs_it(self):
+        print("\n[v3.7] 🧮 Testing Compute Budget + Audit Log...")
+        peer = str(Keypair().pubkey())
+        sig = self.agent.pay_agent(peer, 0.01, urgency="fast")
+
+        limit, price = compute_budget(self.client.sent[0])
+        self.assertEqual(limit, int(450 * SolanaFeeOracle.CU_HEADROOM) + SolanaFeeOracle.CU_MARGIN)
+        self.assertEqual(price, 820_000)
+        self.assertEqual(self.client.simulations, 1)
+        row = self.agent.store.fetchone("SELECT urgency, compute_unit_limit, compute_unit_price, priority_fee_lamports FROM priority_fees WHERE tx_hash = ?", (sig,))
+        self.assertEqual(row, ("fast", limit, price, -(-limit * price // 1_000_000)))
+
+        self.agent.pay_agent(peer, 0.01, urgency="slow")
+        self.assertEqual(self.client.simulations, 1) # Same instruction shape: learned limit, no simulation
+        self.assertEqual(compute_budget(self.client.sent[1]), (limit, SolanaFeeOracle.MIN_UNIT_PRICE["slow"]))
+        print(f"✅ {limit} CU @ {price} µlamports/CU recorded in priority_fees")
+
+    def test_failed_simulation_not_sent(self):
+        print("\n[v3.7] 🚫 Testing Failed Simulation...")
+        self.client.sim_err = "InstructionError(0, Custom(1))"
+        with self.assertRaises(Exception):
+            self.agent.pay_agent(str(Keypair().pubkey()), 0.01)
+        self.assertEqual(self.client.sent, [])
+        print("✅ A tx that would fail is never sent (no fee burned)")
+
+    def test_batch_carries_budget(self):
+        print("\n[v3.7] 📦 Testing Compute Budget on Batch Txs...")
+        results = self.agent.pay_many([{"recipient": str(Keypair().pubkey()), "amount": 0.001} for _ in range(45)], urgency="normal")
+        self.assertTrue(all(r["status"] == "CONFIRMED" for r in results))
+        self.assertEqual(len(self.client.sent), 3)
+        for tx in self.client.sent:
+            self.assertEqual(compute_budget(tx)[1], 20_000)
+            self.assertLessEqual(len(bytes(tx)), 1232)
+        rows = self.agent.store.fetchone("SELECT COUNT(*) FROM priority_fees")[0]
+        self.assertEqual(rows, 3) # One fee row per transaction
+        print("✅ 45 payments, 3 txs, each with its compute budget")
+
+if __name__ == "__main__":
+    unittest.main()
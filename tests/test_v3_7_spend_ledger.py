@@ -0,0 +1,80 @@
+import unittest
+import os
+import tempfile
+import time
+from unittest import mock
+from iagent_pay.audit_store import AuditStore
+from iagent_pay.schema import migrate
+from iagent_pay.spend_ledger import SpendLedger
+
+class TestV3_7SpendLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "agent_history.db")
+        self.store = AuditStore(self.path)
+        migrate(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _log(self, store, ledger, tx_hash, amount, symbol="ETH", status="SENT", ts=None):
+        ts = ts or time.time()
+        with store.transaction() as c:
+            c.execute("""INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)
+                         ON CONFLICT(tx_hash) DO UPDATE SET status = excluded.status""",
+                      (ts, tx_hash, "0xPEER", amount, status, symbol))
+            cur = c.execute("INSERT INTO transaction_events (tx_hash, status, timestamp) VALUES (?, ?, ?)", (tx_hash, status, ts))
+        if ledger: ledger.record(cur.lastrowid, tx_hash, ts, amount, symbol, status)
+
+    def test_bootstrap_matches_window(self):
+        print("\n[v3.7] 📒 Testing Spend Ledger Bootstrap...")
+        now = time.time()
+        self._log(self.store, None, "0x1", 5.0, ts=now - 2 * 86400) # Outside window
+        self._log(self.store, None, "0x2", 1.0, ts=now - 3600)
+        self._log(self.store, None, "0x3", 2.0, status="FAILED")
+        self._log(self.store, None, "0x4", 0.5, symbol="SOL")
+        self._log(self.store, None, "0x5", 100.0, symbol="USDC") # Not a limited asset
+        ledger = SpendLedger(self.store)
+        self.assertAlmostEqual(ledger.spent("ETH"), 1.0)
+        self.assertAlmostEqual(ledger.spent("SOL"), 0.5)
+        self.assertEqual(ledger.spent("MATIC"), 0.0)
+        print("✅ Ledger bootstrap equals the rolling window")
+
+    def test_status_updates_count_once(self):
+        print("\n[v3.7] 🧾 Testing SENT -> CONFIRMED / FAILED accounting...")
+        ledger = SpendLedger(self.store)
+        self._log(self.store, ledger, "0xA", 1.0)
+        self._log(self.store, ledger, "0xA", 1.0, status="CONFIRMED")
+        self.assertAlmostEqual(ledger.spent("ETH"), 1.0)
+        self._log(self.store, ledger, "0xB", 2.0)
+        self._log(self.store, ledger, "0xB", 2.0, status="FAILED")
+        self.assertAlmostEqual(ledger.spent("ETH"), 1.0)
+        print("✅ Each payment counted once, failures refunded")
+
+    def test_incremental_and_cross_process(self):
+        print("\n[v3.7] 🔀 Testing Cross-Process Spend Sync...")
+        ledger = SpendLedger(self.store)
+        self._log(self.store, ledger, "0xA", 1.5)
+        self.assertAlmostEqual(ledger.spent("ETH"), 1.5)
+
+        # A second process writing to the same DB file
+        other = AuditStore(self.path)
+        self._log(other, None, "0xB", 2.0)
+        self.assertAlmostEqual(ledger.spent("ETH"), 3.5)
+        other.close()
+        print("✅ Writes from other connections are picked up")
+
+    def test_bucketed_expiry(self):
+        print("\n[v3.7] ⏳ Testing Bucketed Window Expiry...")
+        ledger = SpendLedger(self.store, window_seconds=600, bucket_seconds=60)
+        now = time.time()
+        self._log(self.store, ledger, "0xA", 1.0, ts=now)
+        with mock.patch("iagent_pay.spend_ledger.time.time", return_value=now + 300):
+            self.assertAlmostEqual(ledger.spent("ETH"), 1.0)
+        with mock.patch("iagent_pay.spend_ledger.time.time", return_value=now + 700):
+            self.assertEqual(ledger.spent("ETH"), 0.0)
+        print("✅ Old spend expires with its bucket")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import asyncio
+from solders.hash import Hash
+from solders.keypair import Keypair
+from spl.token.constants import TOKEN_PROGRAM_ID, ASSOCIATED_TOKEN_PROGRAM_ID
+from spl.token.instructions import get_associated_token_address
+from iagent_pay.solana_driver import SolanaDriver
+from iagent_pay.spl_account_cache import SplAccountCache
+from solana_fakes import FakeAsyncSolanaClient, FakeSolanaClient, SolanaKeyMixin, make_driver, mint_account, programs
+
+class TestV3_7SplCache(SolanaKeyMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.mint = Keypair().pubkey()
+
+    def make_driver(self, client, cache=None):
+        return make_driver(client, cache, blockhash=Hash.new_unique()) # Blockhash reads are not what this test counts
+
+    def test_repeat_payment_is_one_rpc(self):
+        print("\n[v3.7] 🪙 Testing Cached Mint + ATA on Repeat SPL Payments...")
+        client = FakeSolanaClient({self.mint: mint_account(6)})
+        driver = self.make_driver(client)
+        recipient = str(Keypair().pubkey())
+
+        driver.transfer_token(recipient, 2.5, mint_address=str(self.mint))
+        self.assertEqual(client.rpcs, ["get_multiple_accounts", "send_transaction"]) # No get_account_info, no get_mint_info
+        self.assertEqual(programs(client.sent[0]), [ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID]) # Idempotent create bundled in
+
+        client.rpcs.clear()
+        driver.transfer_token(recipient, 1.0, mint_address=str(self.mint))
+        self.assertEqual(client.rpcs, ["send_transaction"])
+        self.assertEqual(programs(client.sent[1]), [TOKEN_PROGRAM_ID]) # Known ATA: transfer only
+        self.assertEqual(bytes(client.sent[1].message.instructions[-1].data)[1:9], (1_000_000).to_bytes(8, "little"))
+        print("✅ First payment: lookup + send; repeat: send only")
+
+    def test_cache_shared_across_drivers(self):
+        print("\n[v3.7] 🌐 Testing Process-Wide SPL Cache...")
+        self.assertIs(SolanaDriver(network="devnet").token_accounts, SolanaDriver(network="devnet").token_accounts)
+        cache = SplAccountCache()
+        recipient = Keypair().pubkey()
+        first = self.make_driver(FakeSolanaClient({self.mint: mint_account(9)}), cache)
+        first.transfer_token(str(recipient), 1.0, mint_address=str(self.mint))
+
+        client = FakeSolanaClient() # Knows nothing: every fact must come from the cache
+        second = self.make_driver(client, cache)
+        second.transfer_token(str(recipient), 1.0, mint_address=str(self.mint))
+        self.assertEqual(client.rpcs, ["send_transaction"])
+        print("✅ Second driver paid with zero lookups")
+
+    def test_failure_invalidates(self):
+        print("\n[v3.7] 🧹 Testing Invalidation on Failure...")
+        client = FakeSolanaClient({self.mint: mint_account(6)})
+        driver = self.make_driver(client)
+        recipient = Keypair().pubkey()
+        ata = get_associated_token_address(recipient, self.mint)
+        driver.transfer_token(str(recipient), 1.0, mint_address=str(self.mint))
+        self.assertTrue(driver.token_accounts.has_ata(ata))
+
+        client.fail_sends = 1
+        with self.assertRaises(Exception):
+            driver.transfer_token(str(recipient), 1.0, mint_address=str(self.mint))
+        self.assertFalse(driver.token_accounts.has_ata(ata))
+        self.assertIsNone(driver.token_accounts.decimals(self.mint))
+
+        client.rpcs.clear()
+        driver.transfer_token(str(recipient), 1.0, mint_address=str(self.mint))
+        self.assertEqual(client.rpcs, ["get_multiple_accounts", "send_transaction"])
+        self.assertEqual(programs(client.sent[-1]), [ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID])
+        print("✅ Failed payment dropped its cache entries; next one re-checks")
+
+    def test_batch_uses_cache(self):
+        print("\n[v3.7] 📦 Testing transfer_batch() with a Warm Cache...")
+        client = FakeSolanaClient({self.mint: mint_account(6)})
+        driver = self.make_driver(client)
+        recipients = [str(Keypair().pubkey()) for _ in range(5)]
+        payments = [{"recipient": r, "amount": 1.0, "mint": str(self.mint)} for r in recipients]
+        driver.transfer_batch(payments)
+        client.rpcs.clear()
+        driver.transfer_batch(payments)
+        self.assertEqual(client.rpcs, ["send_transaction"])
+        self.assertEqual(programs(client.sent[-1]), [TOKEN_PROGRAM_ID] * 5)
+        print("✅ Repeat batch: no lookups, no ATA creates")
+
+    def test_async_token_transfer(self):
+        print("\n[v3.7] ⚡ Testing Cached Async SPL Transfer...")
+        client = FakeAsyncSolanaClient({self.mint: mint_account(6)})
+        driver = self.make_driver(FakeSolanaClient())
+        driver._async_client = client
+        recipient = str(Keypair().pubkey())
+
+        async def pay_twice():
+            await driver.transfer_token_async(recipient, 1.0, mint_address=str(self.mint))
+            await driver.transfer_token_async(recipient, 1.0, mint_address=str(self.mint))
+        asyncio.run(pay_twice())
+        self.assertEqual(client.rpcs, ["get_multiple_accounts", "send_transaction", "send_transaction"])
+        self.assertEqual(programs(client.sent[1]), [TOKEN_PROGRAM_ID])
+        print("✅ Async path shares the cache")
+
+    def test_async_waiter_reads_confirmation_status(self):
+        print("\n[v3.7] ⏱️ Testing Async Signature Waiter...")
+        from solders.transaction_status import TransactionConfirmationStatus as Status
+        client = FakeAsyncSolanaClient()
+        driver = self.make_driver(FakeSolanaClient())
+        driver._async_client = client
+
+        client.statuses = [(Status.Processed, 0)] * 3
+        self.assertFalse(asyncio.run(driver.wait_for_signature_async("sig", max_retries=3, poll_interval=0))) # Processed is not landed
+        client.statuses = [(Status.Finalized, 5)] # Finalized on the first poll
+        self.assertTrue(asyncio.run(driver.wait_for_signature_async("sig", max_retries=1, poll_interval=0)))
+        client.statuses = [(Status.Processed, 0), (Status.Confirmed, 1)]
+        self.assertTrue(asyncio.run(driver.wait_for_signature_async("sig", max_retries=2, poll_interval=0)))
+        print("✅ Confirmed/Finalized enum statuses land; processed does not")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import tempfile
+from web3 import Web3
+from iagent_pay.token_registry import TokenRegistry
+
+USDC_BASE = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+
+class CountingContract:
+    """Stands in for a web3 contract: counts decimals() round-trips."""
+    def __init__(self, address, decimals):
+        self.address = address
+        self.calls = 0
+        outer = self
+        class Call:
+            def call(self):
+                outer.calls += 1
+                return decimals
+        class Functions:
+            @staticmethod
+            def decimals():
+                return Call()
+        self.functions = Functions
+
+class TestV3_7TokenRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "token_registry.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_decimals_persist_across_restarts(self):
+        print("\n[v3.7] 💾 Testing TokenRegistry Persistence...")
+        contract = CountingContract(USDC_BASE, 6)
+        registry = TokenRegistry(self.path)
+        self.assertEqual(registry.decimals(contract, 8453), 6)
+        self.assertEqual(registry.decimals(contract, 8453), 6)
+        self.assertEqual(contract.calls, 1)
+
+        cold = TokenRegistry(self.path) # New process
+        self.assertEqual(cold.get_decimals(8453, USDC_BASE.lower()), 6)
+        self.assertEqual(cold.decimals(contract, 8453), 6)
+        self.assertEqual(contract.calls, 1) # No RPC on cold start
+        self.assertIsNone(cold.get_decimals(1, USDC_BASE)) # Keyed by chain too
+        print("✅ Decimals survive a restart, keyed by (chain_id, address)")
+
+    def test_corrupt_file_ignored(self):
+        print("\n[v3.7] 🧯 Testing TokenRegistry Corrupt File...")
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        registry = TokenRegistry(self.path)
+        self.assertIsNone(registry.get_decimals(8453, USDC_BASE))
+        registry.set_decimals(8453, USDC_BASE, 6)
+        self.assertEqual(TokenRegistry(self.path).get_decimals(8453, USDC_BASE), 6)
+        print("✅ Corrupt cache rebuilt")
+
+    def test_dev_chains_not_persisted(self):
+        print("\n[v3.7] 🧪 Testing TokenRegistry Dev Chains...")
+        token = "0x5FbDB2315678afecb367f032d93F642f64180aa3" # First Anvil/Hardhat deployment: same address after every restart
+        with open(self.path, "w") as f:
+            f.write('{"decimals": {"31337": {"%s": 18}}}' % token.lower()) # Left by an older version
+        registry = TokenRegistry(self.path)
+        self.assertIsNone(registry.get_decimals(31337, token))
+        registry.set_decimals(31337, token, 6)
+        registry.set_decimals(8453, USDC_BASE, 6)
+        self.assertEqual(registry.get_decimals(31337, token), 6) # Still cached for this process
+        cold = TokenRegistry(self.path)
+        self.assertIsNone(cold.get_decimals(31337, token)) # Restarted dev chain: read again
+        self.assertEqual(cold.get_decimals(8453, USDC_BASE), 6)
+        print("✅ Dev-chain decimals kept in memory only")
+
+    def test_contract_objects_reused(self):
+        print("\n[v3.7] ♻️ Testing TokenRegistry Contract Cache...")
+        w3 = Web3(Web3.EthereumTesterProvider())
+        registry = TokenRegistry(self.path)
+        a = registry.contract(w3, 8453, USDC_BASE)
+        b = registry.contract(w3, 8453, USDC_BASE.lower())
+        self.assertIs(a, b)
+        self.assertIn("allowance", [f["name"] for f in a.abi if "name" in f])
+
+        # Rotation: the next connection gets its own binding and the old one is not kept alive
+        import gc, weakref
+        rotated = Web3(Web3.EthereumTesterProvider())
+        c = registry.contract(rotated, 8453, USDC_BASE)
+        self.assertIs(c.w3, rotated)
+        self.assertEqual(len(registry._contracts), 1)
+        old = weakref.ref(w3)
+        del w3, a, b
+        gc.collect()
+        self.assertIsNone(old())
+        print("✅ One contract object per (chain, token), bound to the current connection")
+
+if __name__ == "__main__":
+    unittest.main()